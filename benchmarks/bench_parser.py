@@ -0,0 +1,150 @@
+"""
+Parser benchmarks on synthetic TAMU-style grids (runs offline, no real grid data needed)
+
+Times and memory-profiles parse_tamu_aux, read_aux_table, parse_tamu_m, parse_rts_csvs, and parse_tamu_load_csv,
+reports rows/s and peak RSS for each parser. Every measurement runs in a fresh process, so peak RSS is not
+polluted by earlier runs.
+
+e.g.
+    python bench_parser.py --buses 200 2000 10000 70000 --data-dir /tmp/synthetic-grids
+"""
+
+# System
+import os
+import sys
+import time
+import json
+import argparse
+import resource
+import multiprocessing
+import concurrent.futures
+
+# Externals
+import pandas as pd
+
+# Locals
+from powerscenarios.parser import Parser
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_grids import write_synthetic_grid
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser("bench_parser.py")
+    add_arg = parser.add_argument
+    add_arg("--buses", nargs="+", type=int, default=[200, 2000, 10000, 70000])
+    add_arg("--data-dir", default=os.path.join("/tmp", "powerscenarios-synthetic-grids"))
+    add_arg("--parsers", nargs="+", default=None, help="subset of parsers to run (default all)")
+    add_arg("--repeat", type=int, default=1, help="repeat each measurement, best time is reported")
+    # a year of hourly load for 70k buses is a ~5GB file, by default write four weeks of it and load one week
+    add_arg("--load-hours", type=int, default=24 * 28)
+    add_arg("--json", default=None, help="also save results to this .json file")
+    return parser.parse_args()
+
+
+def max_rss_mb():
+    """ peak resident set size of this process in MB (ru_maxrss is in kB on Linux, bytes on macOS) """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return max_rss / 2 ** 20
+    return max_rss / 2 ** 10
+
+
+def count_rows(result):
+    """ number of rows in whatever a parser returns (DataFrame or tuple of DataFrames) """
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    return sum(len(df) for df in result)
+
+
+# parsers to benchmark: name -> function(parser, files) -> (result, number of parsed rows or None to count result rows)
+PARSERS = {
+    "parse_tamu_aux": lambda parser, files: (parser.parse_tamu_aux(files["aux"]), None),
+    "read_aux_table": lambda parser, files: (
+        [parser.read_aux_table(files["aux"], table_name=name, branch_nr=nr) for name, nr in [("Bus", 1), ("Gen", 1), ("Branch", 2)]],
+        None,
+    ),
+    "parse_tamu_m": lambda parser, files: (parser.parse_tamu_m(files["case_m"], files["scenarios_m"]), None),
+    "parse_rts_csvs": lambda parser, files: (
+        parser.parse_rts_csvs(files["rts_bus_csv"], files["rts_gen_csv"], solar2wind=True)[:2],
+        None,
+    ),
+    # one week window out of the load .csv, rows are 5 min rows of the result
+    "parse_tamu_load_csv": lambda parser, files: (
+        parser.parse_tamu_load_csv(
+            files["load_csv"], start=pd.Timestamp("2016-01-08 00:00:00"), end=pd.Timestamp("2016-01-14 23:55:00")
+        ),
+        None,
+    ),
+}
+
+
+def run_one(parser_name, files):
+    """ runs in a fresh process: parses once and returns elapsed time, rows, and peak RSS (also RSS before parsing) """
+    parser = Parser()
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    result, rows = PARSERS[parser_name](parser, files)
+    elapsed = time.perf_counter() - start
+    if rows is None:
+        rows = count_rows(result)
+    return {
+        "elapsed_s": elapsed,
+        "rows": rows,
+        "peak_rss_mb": max_rss_mb(),
+        "base_rss_mb": rss_before,
+    }
+
+
+def measure(parser_name, files, repeat=1):
+    """ runs run_one in a fresh (spawned) process repeat times, keeps the fastest run """
+    context = multiprocessing.get_context("spawn")
+    best = None
+    for i in range(repeat):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_one, parser_name, files).result()
+        if best is None or result["elapsed_s"] < best["elapsed_s"]:
+            best = result
+    return best
+
+
+def main():
+    """ Main function """
+    args = parse_args()
+    parser_names = args.parsers or list(PARSERS)
+
+    results = []
+    for n_buses in args.buses:
+        print("writing synthetic grid with {} buses ...".format(n_buses))
+        files = write_synthetic_grid(args.data_dir, n_buses, load_hours=args.load_hours)
+        file_mb = {kind: os.path.getsize(file_name) / 2 ** 20 for kind, file_name in files.items()}
+        print("  file sizes [MB]: " + ", ".join("{}={:.1f}".format(kind, size) for kind, size in file_mb.items()))
+
+        for parser_name in parser_names:
+            result = measure(parser_name, files, repeat=args.repeat)
+            result.update({"buses": n_buses, "parser": parser_name})
+            result["rows_per_s"] = result["rows"] / result["elapsed_s"]
+            results.append(result)
+            print(
+                "  {:<20} {:>9.3f} s {:>10d} rows {:>12.0f} rows/s  peak RSS {:>8.1f} MB (base {:.1f} MB)".format(
+                    parser_name,
+                    result["elapsed_s"],
+                    result["rows"],
+                    result["rows_per_s"],
+                    result["peak_rss_mb"],
+                    result["base_rss_mb"],
+                )
+            )
+
+    results_df = pd.DataFrame(results).set_index(["buses", "parser"])
+    print()
+    print(results_df[["elapsed_s", "rows", "rows_per_s", "peak_rss_mb"]].to_string(float_format="{:.2f}".format))
+
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
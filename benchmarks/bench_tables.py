@@ -0,0 +1,146 @@
+"""
+Wind pipeline benchmarks on synthetic WIND Toolkit data (runs offline, no pywtk or WTK data needed)
+
+Times retrieve_wind_sites, make_tables, generate_wind_scenarios (one timestamp) and generate_wind_scenarios_batch
+(one day of timestamps) of a grid with synthetic wind generators,
+power comes from SyntheticSource (made up in memory) or, with --local-dir, from a LocalSource directory of
+per-site files written from it first (so that file reads are measured as well). Reports time and peak RSS.
+
+e.g.
+    python bench_tables.py --generators 50 500 --days 28 --local-dir /tmp/synthetic-wtk
+"""
+
+# System
+import sys
+import time
+import json
+import argparse
+import resource
+
+# Externals
+import numpy as np
+import pandas as pd
+
+# Locals
+from powerscenarios.grid import Grid
+from powerscenarios.wtk_source import SyntheticSource, LocalSource
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser("bench_tables.py")
+    add_arg = parser.add_argument
+    add_arg("--generators", nargs="+", type=int, default=[50, 500])
+    add_arg("--sites", type=int, default=20000, help="number of synthetic WTK sites")
+    add_arg("--days", type=int, default=28, help="length of actuals and of scenarios windows")
+    add_arg("--local-dir", default=None, help="write synthetic data here and read it back with LocalSource")
+    add_arg("--workers", type=int, default=1)
+    add_arg("--dtype", default="float64")
+    add_arg("--json", default=None, help="also save results to this .json file")
+    return parser.parse_args()
+
+
+def max_rss_mb():
+    """ peak resident set size of this process in MB (ru_maxrss is in kB on Linux, bytes on macOS) """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return max_rss / 2 ** 20
+    return max_rss / 2 ** 10
+
+
+def synthetic_wind_generators(n_generators, bounds, seed=0):
+    """ wind generators spread over the same lon/lat box as the sites, 50 to 300 MW each """
+    rng = np.random.RandomState(seed)
+    lon_min, lon_max, lat_min, lat_max = bounds
+    return pd.DataFrame(
+        {
+            "BusNum": np.arange(1, n_generators + 1),
+            "GenUID": ["{}_Wind_1".format(bus_num) for bus_num in range(1, n_generators + 1)],
+            "Latitude": rng.uniform(lat_min + 1.0, lat_max - 1.0, n_generators),
+            "Longitude": rng.uniform(lon_min + 1.0, lon_max - 1.0, n_generators),
+            "GenMWMax": rng.uniform(50.0, 300.0, n_generators),
+        }
+    )
+
+
+def timed(results, step, function, *args, **kwargs):
+    """ calls function, appends its time and peak RSS (so far) to results """
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    results.append({"step": step, "elapsed_s": time.perf_counter() - start, "peak_rss_mb": max_rss_mb()})
+    print("  {:<25} {:>9.3f} s  peak RSS {:>8.1f} MB".format(step, results[-1]["elapsed_s"], results[-1]["peak_rss_mb"]))
+
+
+def main():
+    """ Main function """
+    args = parse_args()
+    synthetic_source = SyntheticSource(n_sites=args.sites)
+    actuals_start = pd.Timestamp("2007-01-01 00:00:00", tz="utc")
+    actuals_end = actuals_start + pd.Timedelta(days=args.days) - pd.Timedelta("5min")
+    scenarios_start = actuals_end + pd.Timedelta("5min")
+    scenarios_end = scenarios_start + pd.Timedelta(days=args.days) - pd.Timedelta("5min")
+
+    results = []
+    for n_generators in args.generators:
+        print("{} wind generators, {} days:".format(n_generators, args.days))
+        wind_gen_df = synthetic_wind_generators(n_generators, synthetic_source.bounds)
+        grid = Grid("synthetic{}".format(n_generators), pd.DataFrame(), pd.DataFrame(), wind_gen_df)
+        step_results = []
+        timed(step_results, "retrieve_wind_sites", grid.retrieve_wind_sites, wtk_source=synthetic_source)
+
+        wtk_source = synthetic_source
+        if args.local_dir is not None:
+            timed(
+                step_results,
+                "write local data",
+                synthetic_source.write,
+                args.local_dir,
+                grid.wind_sites["SiteID"].values,
+                actuals_start,
+                scenarios_end,
+            )
+            wtk_source = LocalSource(args.local_dir)
+
+        timed(
+            step_results,
+            "make_tables",
+            grid.make_tables,
+            actuals_start=actuals_start,
+            actuals_end=actuals_end,
+            scenarios_start=scenarios_start,
+            scenarios_end=scenarios_end,
+            workers=args.workers,
+            dtype=args.dtype,
+            wtk_source=wtk_source,
+        )
+        timed(
+            step_results,
+            "generate_wind_scenarios",
+            grid.generate_wind_scenarios,
+            actuals_start + pd.Timedelta(days=1),
+            n_scenarios=100,
+            n_periods=12,
+        )
+        timed(
+            step_results,
+            "generate_wind_scenarios_batch",
+            grid.generate_wind_scenarios_batch,
+            pd.date_range(actuals_start + pd.Timedelta(days=1), periods=288, freq="5min"),
+            n_scenarios=10,
+            n_periods=12,
+        )
+        for result in step_results:
+            result.update({"generators": n_generators, "sites": len(grid.wind_sites)})
+        results += step_results
+
+    results_df = pd.DataFrame(results).set_index(["generators", "step"])
+    print()
+    print(results_df[["sites", "elapsed_s", "peak_rss_mb"]].to_string(float_format="{:.2f}".format))
+
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
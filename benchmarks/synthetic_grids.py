@@ -0,0 +1,469 @@
+"""
+Synthetic grid files with the same structure as the real ones (no real grid data needed):
+    TAMU (PowerWorld) .aux with Bus, Gen, Load and two Branch tables,
+    TAMU (MATPOWER) case_*.m and scenarios_*.m,
+    TAMU load time series .csv,
+    RTS-GMLC bus.csv and gen.csv
+Sizes are scaled from ACTIVSg200 (per bus: 0.25 generators, 0.8 loads, 0.9 lines, 0.33 transformers; up to 10 load zones).
+"""
+
+# System
+import os
+
+# Externals
+import numpy as np
+import pandas as pd
+
+# Locals
+from powerscenarios.parser import AUX_TOKEN_RE
+
+# .aux tables: header fields and a template row (taken from ACTIVSg200.aux), synthetic rows change only some fields
+AUX_TEMPLATES = {
+    "Bus": (
+        "BusNum,BusName,BusNomVolt,BusSlack,BusB:1,BusG:1,BusPUVolt,BusAngle,DCLossMultiplier,AreaNum,ZoneNum,"
+        "BANumber,OwnerNum,SubNum,Latitude:1,Longitude:1,BusMonEle,LSName,BusVoltLim,BusVoltLimLow:1,BusVoltLimLow:2,"
+        "BusVoltLimLow:3,BusVoltLimLow:4,BusVoltLimHigh:1,BusVoltLimHigh:2,BusVoltLimHigh:3,BusVoltLimHigh:4,Latitude,"
+        "Longitude,TopologyBusType,Priority,EMSType,EMSDeviceID,DataMaintainerAssign,AllLabels,GICConductance",
+        '1 "CREVE COEUR 0" 115.00000000000000000000 "NO " 0.00000000000000000000 0.00000000000000000000 '
+        "0.99996724932576741600 -76.66506520866829530000 1.00000000000000000000 1 2 1 1 1 40.642116 -89.599560 "
+        '"YES" "Default" "NO " "" "" "" "" "" "" "" "" "" "" "BusbarSection" 0 "" "" "" "" ""',
+    ),
+    "Gen": (
+        "BusNum,GenID,GenStatus,GenVoltSet,GenRegNum,GenRMPCT,GenAGCAble,GenParFac,GenMWSetPoint,GenMWMax,GenMWMin,"
+        "GenEnforceMWLimits,GenAVRAble,GenMvrSetPoint,GenMVRMax,GenMVRMin,GenUseCapCurve,GenWindControlMode,"
+        "GenWindPowerFactor,GenUseLDCRCC,GenRLDCRCC,GenXLDCRCC,GenMVABase,GenZR,GenZX,GenStepR,GenStepX,GenStepTap,"
+        "TSGovRespLimit,GenUnitType:1,AreaNum,ZoneNum,BANumber,OwnerNum,OwnPercent,OwnerNum:1,OwnPercent:1,OwnerNum:2,"
+        "OwnPercent:2,OwnerNum:3,OwnPercent:3,OwnerNum:4,OwnPercent:4,OwnerNum:5,OwnPercent:5,OwnerNum:6,OwnPercent:6,"
+        "OwnerNum:7,OwnPercent:7,EMSType,EMSDeviceID,DataMaintainerAssign,AllLabels,GenUnitType,GenTotalFixedCosts,"
+        "GenCostModel,GenFuelType,GenFuelCost,GenFixedCost,GenIOD,GenIOC,GenIOB",
+        '49 "1" "Closed" 1.03999996185302734000 49 100.00000 "YES" 4.53000020980834961000 4.53000031411647797000 '
+        '4.53000031411647797000 1.36000001803040504000 "YES" "YES" 2.10999995470046997000 2.10999995470046997000 '
+        '-0.54999999701976776100 "NO " "None" 1.00000000000000000000 "NO" 0.000000 0.000100 5.44000005722045898000 '
+        "0.00000000000000000000 1.00000000000000000000 0.00000000000000000000 0.00000000000000000000 "
+        '1.00000000000000000000 "Normal" "ST" 1 6 49 1 100.000 "" "" "" "" "" "" "" "" "" "" "" "" "" "" "" "" "" "" '
+        '"ST (Steam Turbine)" 236.120804 "Cubic" "Coal" 2.160000 236.120804 0.000000 0.000926 8.796296',
+    ),
+    "Load": (
+        "BusNum,LoadID,LoadStatus,GenAGCAble,LoadSMW,LoadSMVR,LoadIMW,LoadIMVR,LoadZMW,LoadZMVR,DistStatus,"
+        "DistMWInput,DistMvarInput,Interruptible,GenMWMax,GenMWMin,LoadModelGroup,AreaNum,ZoneNum,BANumber,OwnerNum,"
+        "EMSType,EMSDeviceID,DataMaintainerAssign,AllLabels",
+        '2 "1 " "Closed" "YES" 10.81962585449218750000 3.08358538895845413000 0.00000000000000000000 '
+        "0.00000000000000000000 0.00000000000000000000 0.00000000000000000000 "
+        '"Closed" 0.00000 0.00000 "NO " 0.00000000000000000000 0.00000000000000000000 "" 1 2 2 1 "" "" "" ""',
+    ),
+    "Line": (
+        "BusNum,BusNum:1,LineCircuit,BranchDeviceType,ConsolidateBranch,LineStatus,NormLineStatus,SeriesCapStatus,"
+        "LineMeter:1,LineR,LineX,LineC,LineG,LineLength,LineMonEle,LSName,LineAMVA,LineAMVA:1,LineAMVA:2,LineAMVA:3,"
+        "LineAMVA:4,LineAMVA:5,LineAMVA:6,LineAMVA:7,LineAMVA:8,LineAMVA:9,LineAMVA:10,LineAMVA:11,LineAMVA:12,"
+        "LineAMVA:13,LineAMVA:14,OwnerNum,OwnPercent,OwnerNum:1,OwnPercent:1,OwnerNum:2,OwnPercent:2,OwnerNum:3,"
+        "OwnPercent:3,OwnerNum:4,OwnPercent:4,OwnerNum:5,OwnPercent:5,OwnerNum:6,OwnPercent:6,OwnerNum:7,OwnPercent:7,"
+        "EMSType,EMSDeviceID,EMSDeviceID:1,EMSType:1,EMSDeviceID:2,EMSDeviceID:3,DataMaintainerAssign,AllLabels",
+        '2 1 "1" "Line" "" "Closed" "Closed" "NO" "2" 0.00067305727861821652 0.00333871063776314259 '
+        "0.00000000000000000000 0.00000000000000000000 0.00000000000000000000 "
+        '"YES" "Default" 100.00000000000000000000' + " 0.00000000000000000000" * 14 + " 1 100.00000000000000000000"
+        + ' ""' * 22,
+    ),
+    "Transformer": (
+        "BusNum,BusNum:1,LineCircuit,BranchDeviceType,LineStatus,NormLineStatus,SeriesCapStatus,LineMeter:1,"
+        "LineXFType,XFAuto,XFRegBus,XFUseLDCRCC,XFRLDCRCC,XFXLDCRCC,XFRegMax,XFRegMin,XFRegTargetType,XFMVABase,"
+        "XFNominalKV,XFNominalKV:1,LineR:1,LineX:1,LineG:1,LineC:1,XfrmerMagnetizingG:1,XfrmerMagnetizingB:1,"
+        "XFFixedTap,XFFixedTap:1,XFTapMax:1,XFTapMin:1,XFStep:1,LineTap:1,LinePhase,XFTableNum,LineLength,LineMonEle,"
+        "LSName,LineAMVA,LineAMVA:1,LineAMVA:2,LineAMVA:3,LineAMVA:4,LineAMVA:5,LineAMVA:6,LineAMVA:7,LineAMVA:8,"
+        "LineAMVA:9,LineAMVA:10,LineAMVA:11,LineAMVA:12,LineAMVA:13,LineAMVA:14,OwnerNum,OwnPercent,OwnerNum:1,"
+        "OwnPercent:1,OwnerNum:2,OwnPercent:2,OwnerNum:3,OwnPercent:3,OwnerNum:4,OwnPercent:4,OwnerNum:5,OwnPercent:5,"
+        "OwnerNum:6,OwnPercent:6,OwnerNum:7,OwnPercent:7,EMSType,EMSDeviceID,EMSDeviceID:1,EMSType:1,EMSDeviceID:2,"
+        "EMSDeviceID:3,DataMaintainerAssign,AllLabels",
+        '15 14 "1" "Transformer" "Closed" "Closed" "NO" "15" "Fixed" "NO" 0 "NO " 0.000000 0.000100 1.500000 '
+        '0.510000 "Middle" 100.000000 115.000000 230.000000 0.000637 0.027526 0.000000 0.000000 0.000000 0.000000 '
+        "1.000000 1.000000 1.500000 0.510000 0.006250 1.000000 0.000000 0 0.000000 "
+        '"YES" "Default" 300.000000' + " 0.000000" * 14 + " 1 100.000000" + ' ""' * 22,
+    ),
+}
+
+# .aux DATA table name of each template
+AUX_TABLE_NAMES = {
+    "Bus": "Bus",
+    "Gen": "Gen",
+    "Load": "Load",
+    "Line": "Branch",
+    "Transformer": "Branch",
+}
+
+# fuel mix of generators (GenFuelType, GenUnitType, share)
+FUEL_MIX = [
+    ("Coal", "ST (Steam Turbine)", 0.3),
+    ("NaturalGas", "GT (Gas Turbine)", 0.4),
+    ("Nuclear", "NB (ST - Boiling Water Nuclear Reactor)", 0.05),
+    ("Wind", "W2 (Wind Turbine, Type 2)", 0.15),
+    ("Solar", "PV (Photovoltaic)", 0.1),
+]
+
+# MATPOWER columns (as in Parser.parse_tamu_m)
+M_BUS_COLUMNS = 17
+M_GEN_COLUMNS = 25
+M_BRANCH_COLUMNS = 21
+
+
+def grid_sizes(n_buses):
+    """ function to scale table sizes with number of buses (ratios from ACTIVSg200)
+
+    Required Args:
+        n_buses - (int) number of buses
+    Returns:
+        dict with number of buses, gens, loads, lines, transformers, zones
+    """
+    return {
+        "buses": n_buses,
+        "gens": max(n_buses // 4, 1),
+        "loads": max(n_buses * 4 // 5, 1),
+        "lines": max(n_buses * 9 // 10, 1),
+        "transformers": max(n_buses // 3, 1),
+        # load zones/areas of chgtab, TAMU cases have only a handful of them
+        "zones": min(max(n_buses // 30, 1), 10),
+    }
+
+
+def format_aux_rows(template_name, fields):
+    """ function to make .aux rows out of a template row with some fields replaced
+
+    Required Args:
+        template_name - (str) key of AUX_TEMPLATES
+        fields - (dict) field name -> sequence of already formatted values (quoted for string fields), one per row
+    Returns:
+        list of str, one row per line
+    """
+    header, template = AUX_TEMPLATES[template_name]
+    column_names = header.split(",")
+    # split template into fields the same way Parser does
+    template_fields = AUX_TOKEN_RE.findall(template)
+    assert len(template_fields) == len(column_names), template_name
+
+    n_rows = len(next(iter(fields.values())))
+    columns = []
+    for name, value in zip(column_names, template_fields):
+        if name in fields:
+            columns.append(fields[name])
+        else:
+            columns.append([value] * n_rows)
+
+    return [" ".join(row) for row in zip(*columns)]
+
+
+def write_aux_table(f, template_name, rows):
+    """ function to write one DATA block with header wrapped like PowerWorld does (several fields per line)
+    """
+    header, template = AUX_TEMPLATES[template_name]
+    column_names = header.split(",")
+    header_lines = [
+        ",".join(column_names[i : i + 8]) for i in range(0, len(column_names), 8)
+    ]
+    f.write(
+        "DATA ({}, [{}])\n".format(AUX_TABLE_NAMES[template_name], ",\n   ".join(header_lines))
+    )
+    f.write("{\n")
+    for row in rows:
+        f.write(row + "\n")
+    f.write("}\n")
+
+
+def make_grid_tables(n_buses, seed=0):
+    """ function to make random bus, gen, load, and branch data for a synthetic grid
+
+    Required Args:
+        n_buses - (int) number of buses
+    Optional Args:
+        seed - (int) random seed
+    Returns:
+        dict with numpy arrays of synthetic grid data
+    """
+    rng = np.random.default_rng(seed)
+    sizes = grid_sizes(n_buses)
+
+    bus_nums = np.arange(1, n_buses + 1)
+    fuel_shares = np.array([share for fuel, unit, share in FUEL_MIX])
+    return {
+        "sizes": sizes,
+        "bus_nums": bus_nums,
+        "latitude": rng.uniform(28.0, 48.0, n_buses),
+        "longitude": rng.uniform(-120.0, -80.0, n_buses),
+        "zone": rng.integers(1, sizes["zones"] + 1, n_buses),
+        "gen_bus": rng.choice(bus_nums, sizes["gens"]),
+        "gen_fuel": rng.choice(len(FUEL_MIX), sizes["gens"], p=fuel_shares / fuel_shares.sum()),
+        "gen_mw_max": rng.uniform(5.0, 500.0, sizes["gens"]),
+        "load_bus": rng.choice(bus_nums, sizes["loads"]),
+        "load_mw": rng.uniform(0.0, 200.0, sizes["loads"]),
+        "line_from": rng.choice(bus_nums, sizes["lines"]),
+        "line_to": rng.choice(bus_nums, sizes["lines"]),
+        "line_r": rng.uniform(0.0001, 0.01, sizes["lines"]),
+        "line_x": rng.uniform(0.001, 0.1, sizes["lines"]),
+        "xf_from": rng.choice(bus_nums, sizes["transformers"]),
+        "xf_to": rng.choice(bus_nums, sizes["transformers"]),
+    }
+
+
+def write_aux(file_name, tables):
+    """ function to write synthetic TAMU .aux file
+
+    Required Args:
+        file_name - (str) path to .aux file
+        tables - (dict) as returned by make_grid_tables
+    """
+    fmt = lambda values, spec: [spec.format(value) for value in values]
+    bus_rows = format_aux_rows(
+        "Bus",
+        {
+            "BusNum": fmt(tables["bus_nums"], "{:6d}"),
+            "BusName": fmt(tables["bus_nums"], '"SYNTH {} 0"'),
+            "ZoneNum": fmt(tables["zone"], "{:6d}"),
+            "SubNum": fmt(tables["bus_nums"], "{}"),
+            "Latitude:1": fmt(tables["latitude"], "{:12.6f}"),
+            "Longitude:1": fmt(tables["longitude"], "{:12.6f}"),
+        },
+    )
+    gen_rows = format_aux_rows(
+        "Gen",
+        {
+            "BusNum": fmt(tables["gen_bus"], "{:6d}"),
+            "GenID": fmt(np.arange(len(tables["gen_bus"])) % 9 + 1, '"{}"'),
+            "GenMWMax": fmt(tables["gen_mw_max"], "{:.20f}"),
+            "GenMWMin": fmt(tables["gen_mw_max"] * 0.1, "{:.20f}"),
+            "GenMWSetPoint": fmt(tables["gen_mw_max"] * 0.5, "{:.20f}"),
+            "GenFuelType": ['"{}"'.format(FUEL_MIX[i][0]) for i in tables["gen_fuel"]],
+            "GenUnitType": ['"{}"'.format(FUEL_MIX[i][1]) for i in tables["gen_fuel"]],
+        },
+    )
+    load_rows = format_aux_rows(
+        "Load",
+        {
+            "BusNum": fmt(tables["load_bus"], "{:6d}"),
+            "LoadSMW": fmt(tables["load_mw"], "{:.20f}"),
+            "LoadSMVR": fmt(tables["load_mw"] * 0.3, "{:.20f}"),
+        },
+    )
+    line_rows = format_aux_rows(
+        "Line",
+        {
+            "BusNum": fmt(tables["line_from"], "{:6d}"),
+            "BusNum:1": fmt(tables["line_to"], "{:6d}"),
+            "LineR": fmt(tables["line_r"], "{:.20f}"),
+            "LineX": fmt(tables["line_x"], "{:.20f}"),
+        },
+    )
+    xf_rows = format_aux_rows(
+        "Transformer",
+        {
+            "BusNum": fmt(tables["xf_from"], "{:6d}"),
+            "BusNum:1": fmt(tables["xf_to"], "{:6d}"),
+        },
+    )
+
+    with open(file_name, "w") as f:
+        f.write("DATA (PWCaseInformation, [Selected])\n{\n\"NO \"\n")
+        f.write("   <SUBDATA PWCaseHeader>\n     //Case Description\n     Synthetic grid\n   </SUBDATA>\n}\n")
+        write_aux_table(f, "Bus", bus_rows)
+        write_aux_table(f, "Gen", gen_rows)
+        write_aux_table(f, "Load", load_rows)
+        write_aux_table(f, "Line", line_rows)
+        write_aux_table(f, "Transformer", xf_rows)
+
+
+def write_m_matrix(f, name, comment, data):
+    """ function to write one MATPOWER matrix (tab separated, rows end with ;)
+    """
+    f.write("\n%% {}\n".format(comment))
+    f.write("{} = [\n".format(name))
+    for row in data:
+        f.write("\t" + "\t".join(row) + ";\n")
+    f.write("];\n")
+
+
+def write_m(case_file_name, scenarios_file_name, tables, n_hours=8760):
+    """ function to write synthetic TAMU case_*.m and scenarios_*.m files
+
+    Required Args:
+        case_file_name - (str) path to case .m file
+        scenarios_file_name - (str) path to scenarios .m file
+        tables - (dict) as returned by make_grid_tables
+    Optional Args:
+        n_hours - (int) number of hours in chgtab (8760 in TAMU files)
+    """
+    sizes = tables["sizes"]
+    zeros = lambda n, k: [["0"] * k for i in range(n)]
+
+    bus = zeros(sizes["buses"], M_BUS_COLUMNS)
+    for row, bus_num, zone in zip(bus, tables["bus_nums"], tables["zone"]):
+        row[:13] = [str(bus_num), "1", "7.39", "2.1", "0", "0", str(zone), "1.0190346", "-7.098018", "115", str(zone), "1.1", "0.9"]
+        row[13:] = ["6.8700", "0.0000", "0.0000", "0.0000"]
+
+    gen = zeros(sizes["gens"], M_GEN_COLUMNS)
+    for row, bus_num, mw_max in zip(gen, tables["gen_bus"], tables["gen_mw_max"]):
+        row[:10] = [str(bus_num), "1.36", "0.88", "2.11", "-0.55", "1.04", "100", "1", "{:.2f}".format(mw_max), "{:.2f}".format(mw_max * 0.1)]
+        row[21:] = ["0.0000"] * 4
+
+    branch = zeros(sizes["lines"], M_BRANCH_COLUMNS)
+    for row, f_bus, t_bus, r, x in zip(branch, tables["line_from"], tables["line_to"], tables["line_r"], tables["line_x"]):
+        row[:11] = [str(f_bus), str(t_bus), "{:.6f}".format(r), "{:.6f}".format(x), "0", "100", "0", "0", "0", "0", "1"]
+        row[13:] = ["-7.3900", "-2.1000", "7.3900", "2.1100", "0.0000", "0.0000", "0.0000", "0.0000"]
+
+    with open(case_file_name, "w") as f:
+        f.write("function mpc = case_synthetic\n%CASE_SYNTHETIC  Synthetic power system model.\n\n")
+        f.write("%% MATPOWER Case Format : Version 2\nmpc.version = '2';\n\n")
+        f.write("%%-----  Power Flow Data  -----%%\n%% system MVA base\nmpc.baseMVA = 100;\n")
+        write_m_matrix(f, "mpc.bus", "bus data", bus)
+        write_m_matrix(f, "mpc.gen", "generator data", gen)
+        write_m_matrix(f, "mpc.branch", "branch data", branch)
+        write_m_matrix(f, "mpc.gencost", "generator cost data", [["2", "0", "0", "3", "0.002", "19", "236.12"]] * sizes["gens"])
+        for name, values in [
+            ("mpc.genfuel", [FUEL_MIX[i][0].lower() for i in tables["gen_fuel"]]),
+            ("mpc.bus_name", ["SYNTH {} 0".format(bus_num) for bus_num in tables["bus_nums"]]),
+        ]:
+            f.write("\n{} = {{\n".format(name))
+            for value in values:
+                f.write("\t'{}';\n".format(value))
+            f.write("};\n")
+
+    rng = np.random.default_rng(1)
+    with open(scenarios_file_name, "w") as f:
+        f.write("function chgtab = scenarios_synthetic\n\ndefine_constants;\n\n")
+        f.write("%% Change Table\n%\tlabel\tprob\ttable\trow\tcol\tchgtype\tnewval\nchgtab = [\n")
+        for hour in range(1, n_hours + 1):
+            for zone in range(1, sizes["zones"] + 1):
+                f.write(
+                    "\t{}\t0\tCT_TAREALOAD\t{}\tCT_LOAD_ALL_P\tCT_REP\t{:.1f};\n".format(hour, zone, rng.uniform(50, 500))
+                )
+        f.write("];\n")
+
+
+def write_load_csv(file_name, tables, start="2016-01-01 00:00:00", n_hours=8784):
+    """ function to write synthetic TAMU load time series .csv (title line, header, hourly rows, one column per load)
+
+    Required Args:
+        file_name - (str) path to .csv file
+        tables - (dict) as returned by make_grid_tables
+    Optional Args:
+        start - (str) first timestamp
+        n_hours - (int) number of hourly rows
+    """
+    rng = np.random.default_rng(2)
+    load_buses = tables["load_bus"]
+    timestamps = pd.date_range(start, periods=n_hours, freq="h")
+    header = ["Date", "Time", "Num Load", "Total MW Load", "Total Mvar Load"] + [
+        "Bus {} #{} MW".format(bus_num, i % 3 + 1) for i, bus_num in enumerate(load_buses)
+    ]
+    daily = 1.0 + 0.2 * np.sin(np.arange(n_hours) * 2 * np.pi / 24)
+
+    with open(file_name, "w") as f:
+        f.write("Synthetic load time series\n")
+        f.write(",".join(header) + "\n")
+        for hour, timestamp in enumerate(timestamps):
+            loads = tables["load_mw"] * daily[hour] * rng.uniform(0.95, 1.05, len(load_buses))
+            f.write(
+                "{},{},{},{:.6f},0,".format(
+                    timestamp.strftime("%m/%d/%Y"), timestamp.strftime("%H:%M:%S"), len(load_buses), loads.sum()
+                )
+                + ",".join("{:.6f}".format(load) for load in loads)
+                + "\n"
+            )
+
+
+def write_rts_csvs(bus_file_name, gen_file_name, tables):
+    """ function to write synthetic RTS-GMLC bus.csv and gen.csv
+
+    Required Args:
+        bus_file_name - (str) path to bus.csv
+        gen_file_name - (str) path to gen.csv
+        tables - (dict) as returned by make_grid_tables
+    """
+    n_buses = len(tables["bus_nums"])
+    bus_df = pd.DataFrame(
+        {
+            "Bus ID": tables["bus_nums"],
+            "Bus Name": ["Synth{}".format(bus_num) for bus_num in tables["bus_nums"]],
+            "BaseKV": 138.0,
+            "Bus Type": "PQ",
+            "MW Load": 100.0,
+            "MVAR Load": 20.0,
+            "V Mag": 1.04,
+            "V Angle": -7.7,
+            "MW Shunt G": 0.0,
+            "MVAR Shunt B": 0.0,
+            "Area": 1,
+            "Sub Area": 11.0,
+            "Zone": tables["zone"].astype(float),
+            "lat": tables["latitude"],
+            "lng": tables["longitude"],
+        }
+    )
+    bus_df.to_csv(bus_file_name, index=False)
+
+    # RTS fuel names
+    rts_fuels = {"Coal": "Coal", "NaturalGas": "NG", "Nuclear": "Nuclear", "Wind": "Wind", "Solar": "Solar"}
+    fuels = [rts_fuels[FUEL_MIX[i][0]] for i in tables["gen_fuel"]]
+    gen_ids = np.arange(len(fuels)) + 1
+    gen_df = pd.DataFrame(
+        {
+            "GEN UID": ["{}_{}_{}".format(bus_num, fuel, gen_id) for bus_num, fuel, gen_id in zip(tables["gen_bus"], fuels, gen_ids)],
+            "Bus ID": tables["gen_bus"],
+            "Gen ID": gen_ids,
+            "Unit Group": "U20",
+            "Unit Type": "CT",
+            "Category": fuels,
+            "Fuel": fuels,
+            "MW Inj": 8.0,
+            "MVAR Inj": 4.96,
+            "V Setpoint p.u.": 1.0468,
+            "PMax MW": tables["gen_mw_max"],
+            "PMin MW": tables["gen_mw_max"] * 0.1,
+        }
+    )
+    # the rest of RTS gen.csv columns are numeric
+    for column_name in [
+        "QMax MVAR", "QMin MVAR", "Min Down Time Hr", "Min Up Time Hr", "Ramp Rate MW/Min", "Start Time Cold Hr",
+        "Start Time Warm Hr", "Start Time Hot Hr", "Start Heat Cold MBTU", "Start Heat Warm MBTU", "Start Heat Hot MBTU",
+        "Non Fuel Start Cost $", "FOR", "MTTF Hr", "MTTR Hr", "Scheduled Maint Weeks", "Fuel Price $/MMBTU",
+        "Output_pct_0", "Output_pct_1", "Output_pct_2", "Output_pct_3", "HR_avg_0", "HR_incr_1", "HR_incr_2",
+        "HR_incr_3", "Fuel Sulfur Content %", "Emissions SO2 Lbs/MMBTU", "Emissions NOX Lbs/MMBTU",
+        "Emissions Part Lbs/MMBTU", "Emissions CO2 Lbs/MMBTU", "Emissions CH4 Lbs/MMBTU", "Emissions N2O Lbs/MMBTU",
+        "Emissions CO Lbs/MMBTU", "Emissions VOCs Lbs/MMBTU", "Damping Ratio", "Inertia MJ/MW", "Base MVA",
+        "Transformer X p.u.", "Unit X p.u.", "Pump Load MW", "Storage Roundtrip Efficiency",
+    ]:
+        gen_df[column_name] = 0.0
+    gen_df.to_csv(gen_file_name, index=False)
+
+
+def write_synthetic_grid(out_dir, n_buses, load_hours=8784, chgtab_hours=8760, seed=0, overwrite=False):
+    """ function to write all synthetic files of one grid into out_dir/<name>/
+
+    Required Args:
+        out_dir - (str) output directory
+        n_buses - (int) number of buses
+    Optional Args:
+        load_hours - (int) hourly rows in load .csv (a year is 8784 for 2016)
+        chgtab_hours - (int) hours in scenarios .m chgtab
+        seed - (int) random seed
+        overwrite - (bool) write files even if they are already there (generating big grids takes a while)
+    Returns:
+        files - (dict) kind -> path, kinds: aux, case_m, scenarios_m, load_csv, rts_bus_csv, rts_gen_csv
+    """
+    name = "SYNTHg{}".format(n_buses)
+    grid_dir = os.path.join(out_dir, name)
+    os.makedirs(grid_dir, exist_ok=True)
+
+    files = {
+        "aux": os.path.join(grid_dir, name + ".aux"),
+        "case_m": os.path.join(grid_dir, "case_" + name + ".m"),
+        "scenarios_m": os.path.join(grid_dir, "scenarios_" + name + ".m"),
+        "load_csv": os.path.join(grid_dir, name + "_load_time_series_MW.csv"),
+        "rts_bus_csv": os.path.join(grid_dir, "bus.csv"),
+        "rts_gen_csv": os.path.join(grid_dir, "gen.csv"),
+    }
+    if not overwrite and all(os.path.isfile(file_name) for file_name in files.values()):
+        return files
+
+    tables = make_grid_tables(n_buses, seed=seed)
+    write_aux(files["aux"], tables)
+    write_m(files["case_m"], files["scenarios_m"], tables, n_hours=chgtab_hours)
+    write_load_csv(files["load_csv"], tables, n_hours=load_hours)
+    write_rts_csvs(files["rts_bus_csv"], files["rts_gen_csv"], tables)
+
+    return files
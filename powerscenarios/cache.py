@@ -0,0 +1,276 @@
+from __future__ import print_function
+import logging
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+logging.basicConfig()
+
+# On-disk cache of DataFrames (e.g. parsed grid tables)
+# each entry is a directory <cache_dir>/<key>/ with one .feather file per DataFrame (needs pyarrow)
+# key is made from fingerprints (size, mtime, content hash) of source files plus any parameters,
+# so editing a source file gives a new key (old entries are simply not used anymore)
+# results computed from tables (e.g. wind sites of wind generators) are keyed by table content instead (make_frame_key)
+# content hashes are remembered by (path, size, mtime_ns), in this process and in <cache_dir>/file_hashes/,
+# so a cache hit does not read the whole source file again (file is hashed again only when its size or mtime changes)
+# entries (and other directories and files shared by jobs, e.g. tables, power store, site index) are written to a
+# temporary directory or file first and then renamed (atomic_write_dir, atomic_write_file),
+# so concurrent jobs never see a half written one
+
+HASH_DIR = "file_hashes"
+# (abs path, size, mtime_ns) -> sha256
+file_hashes = {}
+
+
+def atomic_write_dir(dir_name, write, replace=True):
+    """ function to write a directory atomically, write fills a temporary directory next to dir_name,
+        which is then renamed to dir_name
+
+    Required Args:
+        dir_name - (str) directory
+        write - (function) write(tmp_dir), writes files into tmp_dir
+    Optional Args:
+        replace - (bool) if True (default), existing dir_name is replaced (moved aside, renamed over, then removed),
+            if False, existing dir_name is kept (e.g. another job saved the same cache entry first)
+    Returns:
+        written - (bool) False if dir_name was kept
+    """
+    parent_dir = os.path.dirname(os.path.abspath(dir_name))
+    os.makedirs(parent_dir, exist_ok=True)
+    if not replace and os.path.isdir(dir_name):
+        return False
+
+    tmp_dir = tempfile.mkdtemp(prefix=os.path.basename(dir_name) + ".", dir=parent_dir)
+    try:
+        write(tmp_dir)
+        if replace and os.path.isdir(dir_name):
+            old_dir = tempfile.mkdtemp(prefix=os.path.basename(dir_name) + ".", dir=parent_dir)
+            try:
+                os.rename(dir_name, os.path.join(old_dir, "old"))
+                try:
+                    os.rename(tmp_dir, dir_name)
+                except OSError:
+                    os.rename(os.path.join(old_dir, "old"), dir_name)
+                    raise
+            finally:
+                shutil.rmtree(old_dir)
+        else:
+            os.rename(tmp_dir, dir_name)
+    except OSError:
+        # another job saved the same directory first
+        if replace or not os.path.isdir(dir_name):
+            raise
+        return False
+    finally:
+        if os.path.isdir(tmp_dir):
+            shutil.rmtree(tmp_dir)
+
+    return True
+
+
+def atomic_write_file(file_name, write, mode="w"):
+    """ function to write a file atomically, write fills a temporary file next to file_name,
+        which then replaces file_name
+
+    Required Args:
+        file_name - (str) path to file
+        write - (function) write(f), writes into open file f
+    Optional Args:
+        mode - (str) "w" for text, "wb" for binary
+    """
+    dir_name = os.path.dirname(os.path.abspath(file_name))
+    os.makedirs(dir_name, exist_ok=True)
+    fd, tmp_file_name = tempfile.mkstemp(prefix=os.path.basename(file_name) + ".", dir=dir_name)
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp_file_name, file_name)
+    finally:
+        if os.path.isfile(tmp_file_name):
+            os.remove(tmp_file_name)
+
+
+def file_fingerprint(file_name, chunk_size=2 ** 20, hash_dir=None):
+    """ function to fingerprint a file, content hash is taken from memo if size and mtime of the file did not change,
+        otherwise the file is read in chunks (never whole file in memory)
+
+    Required Args:
+        file_name - (str) path to file
+    Optional Args:
+        hash_dir - (str) cache directory, content hashes are remembered there across processes (see load_file_hash)
+    Returns:
+        (size, mtime_ns, sha256) - (int, int, str) file size in bytes, modification time in ns, content hash
+    """
+    stat = os.stat(file_name)
+    memo_key = (os.path.abspath(file_name), stat.st_size, stat.st_mtime_ns)
+    digest = file_hashes.get(memo_key)
+    if digest is None and hash_dir is not None:
+        digest = load_file_hash(hash_dir, *memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(file_name, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        if hash_dir is not None:
+            save_file_hash(hash_dir, *memo_key, digest)
+    file_hashes[memo_key] = digest
+
+    return stat.st_size, stat.st_mtime_ns, digest
+
+
+def file_hash_name(hash_dir, path):
+    """ function to get name of file that remembers content hash of path (one small .json per source file)
+    """
+    return os.path.join(hash_dir, HASH_DIR, hashlib.sha256(path.encode()).hexdigest() + ".json")
+
+
+def load_file_hash(hash_dir, path, size, mtime_ns):
+    """ function to load remembered content hash of path, None if there is none or size or mtime changed
+    """
+    try:
+        with open(file_hash_name(hash_dir, path)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("path") != path or entry.get("size") != size or entry.get("mtime_ns") != mtime_ns:
+        return None
+
+    return entry.get("sha256")
+
+
+def save_file_hash(hash_dir, path, size, mtime_ns, digest):
+    """ function to remember content hash of path (written to a temporary file first and then renamed)
+    """
+    atomic_write_file(
+        file_hash_name(hash_dir, path),
+        lambda f: json.dump({"path": path, "size": size, "mtime_ns": mtime_ns, "sha256": digest}, f),
+    )
+
+
+def make_key(file_names, *params, hash_dir=None):
+    """ function to make cache key out of source files and parameters
+
+    Required Args:
+        file_names - (list of str) source files, e.g. [aux_file_name] or [bus_csv_file_name, gen_csv_file_name]
+        params - anything with a stable str(), e.g. method name, parser version, options (solar2wind=True)
+    Optional Args:
+        hash_dir - (str) cache directory where content hashes of source files are remembered (see file_fingerprint)
+    Returns:
+        key - (str) hex digest
+    """
+    sha = hashlib.sha256()
+    for file_name in file_names:
+        sha.update(str(file_fingerprint(file_name, hash_dir=hash_dir)).encode())
+    for param in params:
+        sha.update(str(param).encode())
+
+    return sha.hexdigest()
+
+
+def make_frame_key(df, columns, *params):
+    """ function to make cache key out of DataFrame content and parameters (for results that depend on a table, not on files)
+
+    Required Args:
+        df - (pd.DataFrame) e.g. wind generators
+        columns - (list of str) columns that change the result, e.g. ['GenUID', 'Latitude', 'Longitude', 'GenMWMax']
+        params - anything with a stable str(), e.g. method name
+    Returns:
+        key - (str) hex digest
+    """
+    sha = hashlib.sha256()
+    for column in columns:
+        sha.update(str(column).encode())
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values):
+            sha.update(np.ascontiguousarray(values.values, dtype=np.float64).tobytes())
+        else:
+            sha.update("\0".join(str(value) for value in values).encode())
+    for param in params:
+        sha.update(str(param).encode())
+
+    return sha.hexdigest()
+
+
+def load_frames(cache_dir, key, names):
+    """ function to load cached DataFrames
+
+    Required Args:
+        cache_dir - (str) cache directory
+        key - (str) cache key (see make_key)
+        names - (list of str) names of DataFrames as they were saved, e.g. ['bus_df', 'gen_df', 'wind_gen_df']
+    Returns:
+        list of pd.DataFrame in the order of names, or None if there is no such entry
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    file_names = [os.path.join(entry_dir, name + ".feather") for name in names]
+    if not all(os.path.isfile(file_name) for file_name in file_names):
+        return None
+
+    return [pd.read_feather(file_name) for file_name in file_names]
+
+
+def save_frames(cache_dir, key, frames, meta=None):
+    """ function to save DataFrames to cache
+        entry is written to a temporary directory first and then renamed,
+        so concurrent jobs never see a half written entry
+
+    Required Args:
+        cache_dir - (str) cache directory
+        key - (str) cache key (see make_key)
+        frames - (dict) name -> pd.DataFrame (with default RangeIndex and str column names)
+    Optional Args:
+        meta - (dict) json-able info saved next to DataFrames (e.g. source file names)
+    """
+
+    def write(tmp_dir):
+        for name, df in frames.items():
+            df.to_feather(os.path.join(tmp_dir, name + ".feather"))
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta or {}, f)
+
+    # existing entry (e.g. saved by another job first) is kept
+    atomic_write_dir(os.path.join(cache_dir, key), write, replace=False)
+
+
+def load_json(cache_dir, key, name):
+    """ function to load cached json-able object (e.g. byte-offset index of a file)
+
+    Required Args:
+        cache_dir - (str) cache directory
+        key - (str) cache key (see make_key)
+        name - (str) name of object as it was saved
+    Returns:
+        object, or None if there is no such entry
+    """
+    file_name = os.path.join(cache_dir, key, name + ".json")
+    if not os.path.isfile(file_name):
+        return None
+
+    with open(file_name) as f:
+        return json.load(f)
+
+
+def save_json(cache_dir, key, name, obj, meta=None):
+    """ function to save json-able object to cache, entry is written the same way as in save_frames
+
+    Required Args:
+        cache_dir - (str) cache directory
+        key - (str) cache key (see make_key)
+        name - (str) name of object
+        obj - json-able object
+    Optional Args:
+        meta - (dict) json-able info saved next to object
+    """
+
+    def write(tmp_dir):
+        with open(os.path.join(tmp_dir, name + ".json"), "w") as f:
+            json.dump(obj, f)
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta or {}, f)
+
+    atomic_write_dir(os.path.join(cache_dir, key), write, replace=False)
@@ -3,18 +3,28 @@ import logging
 import pandas as pd
 import numpy as np
 import sys
+import collections
+import itertools
+import concurrent.futures
+import json
+import scipy.sparse
 
 # should this be imported only as needed (in retrieve_wind_sites, retrieve_wtk_data,)
 import os
 
 logging.basicConfig()
 
-# do this before importing pywtk, so that WIND_MET_NC_DIR and WIND_FCST_DIR are set correctly
+# pywtk is imported only as needed (by PywtkSource, the default WTK data source), other sources don't need it
+# set this before pywtk is imported, so that WIND_MET_NC_DIR and WIND_FCST_DIR are set correctly
 # if cache dir is set, will use AWS (as opposed to local data)
 #os.environ["PYWTK_CACHE_DIR"] = os.path.join(os.environ["HOME"], "pywtk-data")
 
-from pywtk.wtk_api import get_nc_data, site_from_cache, WIND_FCST_DIR, WIND_MET_NC_DIR
-import pywtk
+from powerscenarios import cache
+from powerscenarios.parser import Parser
+from powerscenarios.site_index import SiteIndex
+from powerscenarios.power_store import PowerStore
+from powerscenarios.sampling_index import SamplingIndex
+from powerscenarios.wtk_source import PywtkSource
 
 
 class Grid(object):
@@ -38,11 +48,22 @@ class Grid(object):
         self.wind_sites = wind_sites
         self.actuals = actuals
         self.scenarios = scenarios
+        # meta data of tables loaded with load_tables (time windows, wind penetration, ...)
+        self.tables_meta = None
+        # how wind sites were retrieved (method, radius, WTK source) and where tables came from (source, WTK source),
+        # saved in meta.json with tables (see save_tables)
+        self.wind_sites_meta = None
+        self.tables_source = None
+        # power bins and sampling probabilities of scenarios table (see get_sampling_index)
+        self.sampling_index = None
 
     # attributes
 
     blet = "ble"
     WTK_DATA_PRECISION = 6
+    WTK_TIME_STEP = pd.Timedelta("5min")
+    # wind sites depend only on these wind generator columns (and method), used for wind sites cache key
+    WIND_SITES_KEY_COLUMNS = ["GenUID", "Latitude", "Longitude", "GenMWMax"]
 
     # if __repr__ is defined, then __str__ = __repr__ (converse is not true)
     #    def __str__(self):
@@ -180,12 +201,36 @@ class Grid(object):
     #         wind_penetration = 100*wind_capacity/total_capacity
     #         print('curent wind penetration: {:.2f}%'.format(wind_penetration))
 
-    def retrieve_wind_sites(self, method = "simple proximity", **kwargs):
+    def retrieve_wind_sites(
+        self,
+        method="simple proximity",
+        site_index=None,
+        site_index_file=None,
+        use_site_index=True,
+        cache_dir=None,
+        wtk_source=None,
+        radius=0.5,
+        capacity_factor_start=pd.Timestamp("2007-01-01 00:00:00", tz="utc"),
+        capacity_factor_end=pd.Timestamp("2007-12-31 23:55:00", tz="utc"),
+        **kwargs,
+    ):
         """ Method to retrieve wind sites (SiteID) nearest to wind generators (up to their capacity, GenMWMax).
-            Requires pywtk_api. 
+            Requires pywtk_api (or another wtk_source). 
 
          Required Args:
-            method='simple proximity',  TODO: 'capacity factor'
+            method='simple proximity' or 'capacity factor' (sites with best mean capacity factor within radius first)
+
+         Optional Args:
+            site_index - (SiteIndex) KD-tree index of WTK sites, default is built from wtk_source site catalog
+            site_index_file - (str) .npz file of SiteIndex, loaded if it exists, otherwise index is built and saved to it
+            use_site_index - (bool) if False, sort all WTK sites by distance for every generator with pywtk (slow, old way)
+            cache_dir - (str) cache for wind sites, keyed by wind generators (GenUID, Latitude, Longitude, GenMWMax) and method, 
+                if wind generators did not change since last run, wind sites are loaded from there
+            wtk_source - (WTKSource) WTK site catalog and power data (see wtk_source), default PywtkSource(),
+                e.g. SyntheticSource() to run without WTK data
+            radius - (float) 'capacity factor' only, search radius around wind generators [degrees]
+            capacity_factor_start - (pd.Timestamp) 'capacity factor' only, start of power data averaged for capacity factors
+            capacity_factor_end - (pd.Timestamp) 'capacity factor' only, end of power data averaged for capacity factors
 
         """
 
@@ -193,63 +238,130 @@ class Grid(object):
         # i.e. turn Latitude and Longitude of wind generators into wkt POINT format (add it as a new column)
         # both, astype and apply work
         # wind_gen_df['wkt'] = 'POINT(' + wind_gen_df['Longitude'].astype(str) + ' ' + wind_gen_df['Latitude'].astype(str) + ')'
-        if method == "simple proximity":
-
-	        wind_gen_df = self.wind_generators
-
-	        wind_gen_df["Point"] = (
-	            "POINT("
-	            + wind_gen_df["Longitude"].apply(str)
-	            + " "
-	            + wind_gen_df["Latitude"].apply(str)
-	            + ")"
-	        )
-
-	        print("Retrieving wind sites ...")
-	        # will create a DataFrame out of this list of dicts (rows)
-	        wind_sites_list = []
-
-	        site_ids_list = []  # for keeping track of used sites (don't want repeats)
-
-	        for row in wind_gen_df.itertuples():
-	            gen_capacity = row.GenMWMax
-	            gen_wkt_point = row.Point
-	            # retrieve wind sites sorted by proximity to gen location
-	            sorted_sites = pywtk.site_lookup.get_3tiersites_from_wkt(gen_wkt_point)
-	            # keep adding sites to the list until gen capacity is exceeded
-	            total_sites_capacity = 0.0
-	            for site in sorted_sites.itertuples():
-
-	                wind_site = {
-	                    "SiteID": site.Index,
-	                    "Capacity": site.capacity,
-	                    "Point": str(site.point),
-	                    "Latitude": site.lat,
-	                    "Longitude": site.lon,
-	                    "BusNum": row.BusNum,  # add BusNum this site belongs to (maybe it'll be usefull)
-	                    "GenUID": row.GenUID,  # add GenUID (generator unique ID) this site belongs to
-	                }
-	                # note that site.point is of type : shapely.geometry.point.Point
-	                # hence, turn it into str, since get_wind_data_by_wkt() wants a str (stupid, isn't it?)
-
-	                # if wind site is not in the list already, add it to the list (don't want repeats)
-	                if not (site.Index in site_ids_list):
-	                    wind_sites_list.append(wind_site)
-	                    site_ids_list.append(site.Index)
-	                    total_sites_capacity += site.capacity
-
-	                if total_sites_capacity > gen_capacity:
-	                    break
-
-	        wind_sites_df = pd.DataFrame(wind_sites_list)
-
-	        self.wind_sites = wind_sites_df
-	        print("Done")
+        if method in ("simple proximity", "capacity factor"):
+
+            wind_gen_df = self.wind_generators
+
+            wind_gen_df["Point"] = (
+                "POINT("
+                + wind_gen_df["Longitude"].apply(str)
+                + " "
+                + wind_gen_df["Latitude"].apply(str)
+                + ")"
+            )
+
+            if wtk_source is None:
+                wtk_source = PywtkSource()
+            self.wind_sites_meta = {
+                "method": method,
+                "radius": radius if method == "capacity factor" else None,
+                "wtk_source": repr(wtk_source),
+            }
+
+            if cache_dir is not None:
+                params = [method, wtk_source]
+                if method == "capacity factor":
+                    params += [radius, capacity_factor_start, capacity_factor_end]
+                key = cache.make_frame_key(
+                    wind_gen_df, self.WIND_SITES_KEY_COLUMNS, "retrieve_wind_sites", *params
+                )
+                frames = cache.load_frames(cache_dir, key, ["wind_sites"])
+                if frames is not None:
+                    self.wind_sites = frames[0]
+                    print("Loaded wind sites from cache")
+                    return
+
+            print("Retrieving wind sites ...")
+
+            if method == "capacity factor":
+                # capacity factors are computed once per site (only sites near wind generators),
+                # kept in the index (and its file), selection itself is a sort within radius
+                if site_index is None:
+                    site_index = SiteIndex.from_source(wtk_source, site_index_file)
+                # capacity factors of another time window are dropped (and computed again below)
+                site_index.use_capacity_factor_window(capacity_factor_start, capacity_factor_end)
+                candidates = site_index.within_radius(
+                    wind_gen_df["Longitude"].values, wind_gen_df["Latitude"].values, radius
+                )
+                candidates = np.unique(np.concatenate(candidates)) if candidates else np.array([], dtype=np.int64)
+                missing = candidates[np.isnan(site_index.capacity_factor[candidates])]
+                if len(missing) > 0:
+                    print("Computing capacity factors of {} wind sites ...".format(len(missing)))
+                    site_index.compute_capacity_factors(
+                        missing, capacity_factor_start, capacity_factor_end, wtk_source=wtk_source
+                    )
+                    if site_index_file is not None:
+                        site_index.save(site_index_file)
+                wind_sites_df = site_index.assign_sites_by_capacity_factor(wind_gen_df, radius)
+            elif use_site_index:
+                # nearest sites for all generators in one KD-tree query, used sites are kept in a bitmap
+                if site_index is None:
+                    site_index = SiteIndex.from_source(wtk_source, site_index_file)
+                wind_sites_df = site_index.assign_sites(wind_gen_df)
+            else:
+                wind_sites_df = self.retrieve_wind_sites_pywtk(wind_gen_df)
+
+            self.wind_sites = wind_sites_df
+            if cache_dir is not None:
+                cache.save_frames(
+                    cache_dir, key, {"wind_sites": wind_sites_df}, meta={"grid": self.name, "method": method}
+                )
+            print("Done")
         # return wind_sites_df
 
+    # internal, old way of retrieve_wind_sites (use_site_index=False)
+    def retrieve_wind_sites_pywtk(self, wind_gen_df):
+        """ Function to find wind sites for wind generators by sorting all WTK sites by distance (pywtk) for every generator
+
+        Required Args:
+            wind_gen_df - (pd.DataFrame) wind generators with Point (wkt) column
+        Returns:
+            wind_sites_df - (pd.DataFrame) as in retrieve_wind_sites
+        """
+        import pywtk.site_lookup
+
+        # will create a DataFrame out of this list of dicts (rows)
+        wind_sites_list = []
+
+        site_ids_list = []  # for keeping track of used sites (don't want repeats)
+
+        for row in wind_gen_df.itertuples():
+            gen_capacity = row.GenMWMax
+            gen_wkt_point = row.Point
+            # retrieve wind sites sorted by proximity to gen location
+            sorted_sites = pywtk.site_lookup.get_3tiersites_from_wkt(gen_wkt_point)
+            # keep adding sites to the list until gen capacity is exceeded
+            total_sites_capacity = 0.0
+            for site in sorted_sites.itertuples():
+
+                wind_site = {
+                    "SiteID": site.Index,
+                    "Capacity": site.capacity,
+                    "Point": str(site.point),
+                    "Latitude": site.lat,
+                    "Longitude": site.lon,
+                    "BusNum": row.BusNum,  # add BusNum this site belongs to (maybe it'll be usefull)
+                    "GenUID": row.GenUID,  # add GenUID (generator unique ID) this site belongs to
+                }
+                # note that site.point is of type : shapely.geometry.point.Point
+                # hence, turn it into str, since get_wind_data_by_wkt() wants a str (stupid, isn't it?)
+
+                # if wind site is not in the list already, add it to the list (don't want repeats)
+                if not (site.Index in site_ids_list):
+                    wind_sites_list.append(wind_site)
+                    site_ids_list.append(site.Index)
+                    total_sites_capacity += site.capacity
+
+                if total_sites_capacity > gen_capacity:
+                    break
+
+        wind_sites_df = pd.DataFrame(wind_sites_list)
+
+        return wind_sites_df
+
     # internal, used for make_tables
     def retrieve_wtk_data(
-        self, start_of_data, end_of_data, nc_dir="met", attributes=["power"], **kwargs,
+        self, start_of_data, end_of_data, nc_dir="met", attributes=["power"], workers=1, power_store=None, dtype=np.float64, wtk_source=None, **kwargs,
     ):
         """ Function to retrieve wind power data using self.wind_sites
             Used to create initial actuals_df and scenarios_df 
@@ -260,6 +372,12 @@ class Grid(object):
 
         Optional Args:
             nc_dir - (string) either 'met' for meteorological (WIND_MET_NC_DIR) or 'fcst' for forecast (WIND_FCST_DIR)
+            wtk_source - (WTKSource) where site power comes from (see wtk_source), default PywtkSource()
+            workers - (int) number of worker processes reading site files concurrently, 
+                default 1 reads them one by one in this process, None uses all cpus
+            power_store - (PowerStore) consolidated site power (see make_power_store), 
+                if given, power of all sites is one sliced read from it instead of reading WTK files
+            dtype - (np.dtype) of returned power, np.float64 (default) or np.float32 (sites are still summed in float64)
 
         Returns:
             pd.DataFrame with columns as BusNum from wind_site_df and
@@ -270,10 +388,8 @@ class Grid(object):
 
         """
 
-        if nc_dir == "met":
-            nc_dir = WIND_MET_NC_DIR
-        elif nc_dir == "fcst":
-            nc_dir = WIND_FCST_DIR
+        if wtk_source is None:
+            wtk_source = PywtkSource()
 
         wind_sites_df = self.wind_sites
         if wind_sites_df.empty:
@@ -288,50 +404,31 @@ class Grid(object):
         # attributes = ['power',]
 
         print("Retrieving WTK data ...")
-        # initialize DataFrame by pulling one data point
-        site_id = wind_sites_df["SiteID"].loc[0]
-        wind_data_df_index = pywtk.wtk_api.get_nc_data(
-            site_id,
-            start_of_data,
-            end_of_data,
-            attributes=attributes,
-            leap_day=True,
-            utc=True,
-            nc_dir=nc_dir,
-        ).index
-
-        wind_data_df = pd.DataFrame(index=wind_data_df_index)
 
         #  we need unique GenUID because BusNum is not unique ( multiple wind generators attached to one bus happen)
-        # bus_numbers = wind_sites_df['BusNum'].unique()
-        gen_uids = wind_sites_df["GenUID"].unique()
-        # for bus_number in bus_numbers:
-        for gen_uid in gen_uids:
-            # actuals_df['Bus'+str(bus_number)] = 0.
-
-            # initialize column
-            # wind_data_df[bus_number] = 0.
-            wind_data_df[gen_uid] = 0.0
-
-            # site_ids = wind_sites_df[wind_sites_df['BusNum']== bus_number]['SiteID'].values
-            # take site_ids that belong to the same gen_uid
-            site_ids = wind_sites_df[wind_sites_df["GenUID"] == gen_uid][
-                "SiteID"
-            ].values
-            for site_id in site_ids:
-                # retrieve by site_id and keep adding
-                wind_data_df_temp = pywtk.wtk_api.get_nc_data(
-                    site_id,
-                    start_of_data,
-                    end_of_data,
-                    attributes=attributes,
-                    leap_day=True,
-                    utc=True,
-                    nc_dir=nc_dir,
+        # sites are aggregated by generator with a sparse (generator x site) incidence matrix
+        gen_uids, site_gen_matrix = make_site_gen_matrix(wind_sites_df)
+        site_ids = wind_sites_df["SiteID"].values
+        if power_store is not None:
+            # one sliced read of all sites
+            times, power = power_store.read(site_ids, start_of_data, end_of_data)
+        else:
+            # (site x time) matrix is filled as site files are read
+            times, power = None, None
+            for position, site_power in enumerate(
+                get_sites_power(
+                    wtk_source, site_ids, start_of_data, end_of_data, nc_dir, attributes[0], workers=workers
                 )
-
-                # wind_data_df[bus_number]+=wind_data_df_temp[attributes[0]].values
-                wind_data_df[gen_uid] += wind_data_df_temp[attributes[0]].values
+            ):
+                if power is None:
+                    # index is taken from the first site
+                    times = site_power.index
+                    power = np.empty((len(site_ids), len(times)), dtype=site_power.dtype)
+                power[position] = site_power.values
+
+        wind_data_df = pd.DataFrame(
+            aggregate_sites(site_gen_matrix, power, dtype=dtype), index=times, columns=gen_uids, copy=False
+        )
 
         # add name for column index?
         # wind_data_df.columns.rename('BusNum',inplace=True)
@@ -343,6 +440,119 @@ class Grid(object):
 
         return wind_data_df
 
+    # internal, used for make_tables
+    def retrieve_wtk_windows(self, windows, **kwargs):
+        """ Function to retrieve wind power data (as retrieve_wtk_data) for several time windows,
+            overlapping or adjacent windows are retrieved together, so every site file is read once for them
+
+        Required Args:
+            windows - (list of (pd.Timestamp, pd.Timestamp)) start and end of required power data, 
+                e.g. [(actuals_start, actuals_end), (scenarios_start, scenarios_end)]
+        Optional Args:
+            as in retrieve_wtk_data
+        Returns:
+            list of pd.DataFrame (as retrieve_wtk_data), one per window 
+                (windows retrieved together are slices of one DataFrame, do not change them in place)
+        """
+        # merge windows that overlap or are at most one WTK time step apart
+        spans = []
+        for start_of_data, end_of_data in sorted(windows):
+            if spans and start_of_data <= spans[-1][1] + self.WTK_TIME_STEP:
+                spans[-1][1] = max(spans[-1][1], end_of_data)
+            else:
+                spans.append([start_of_data, end_of_data])
+
+        spans_df = [
+            (start_of_data, end_of_data, self.retrieve_wtk_data(start_of_data, end_of_data, **kwargs))
+            for start_of_data, end_of_data in spans
+        ]
+
+        windows_df = []
+        for start_of_data, end_of_data in windows:
+            for span_start, span_end, span_df in spans_df:
+                if span_start <= start_of_data and end_of_data <= span_end:
+                    windows_df.append(span_df.loc[start_of_data:end_of_data])
+                    break
+
+        return windows_df
+
+    def make_power_store(self, store_dir, start_of_data, end_of_data, workers=1, wtk_source=None):
+        """ Method to open consolidated power store (site x time) of self.wind_sites, 
+            store is built from WTK files (met data) on first use, later only sites it does not have yet are read,
+            so that several grids and wind penetration levels can share one store
+
+        Required Args:
+            store_dir - (str) store directory
+            start_of_data - (pd.Timestamp) start of required power data
+            end_of_data - (pd.Timestamp) end of required power data
+        Optional Args:
+            workers - (int) number of worker processes reading WTK files (see retrieve_wtk_data)
+            wtk_source - (WTKSource) where site power comes from, default PywtkSource()
+        Returns:
+            PowerStore
+        """
+        if self.wind_sites.empty:
+            raise Exception(
+                "No wind sites, retrieve wind sites before retrieving data."
+            )
+
+        if wtk_source is None:
+            wtk_source = PywtkSource()
+
+        return PowerStore.build(
+            store_dir,
+            self.wind_sites["SiteID"].values,
+            start_of_data,
+            end_of_data,
+            lambda site_ids, start_of_data, end_of_data: get_sites_power(
+                wtk_source, site_ids, start_of_data, end_of_data, workers=workers
+            ),
+            meta={"wtk_source": type(wtk_source).__name__, "nc_dir": "met", "attribute": "power"},
+        )
+
+    # internal, used for make_tables with source="rts"
+    def retrieve_rts_data(self, start_of_data, end_of_data, timeseries_df, **kwargs):
+        """ Function to retrieve wind power data from local RTS-GMLC time series (no WIND Toolkit, works offline)
+            Used to create initial actuals_df and scenarios_df for RTS grid
+
+        Required Args: 
+            start_of_data - (pd.Timestamp) start of required power data
+            end_of_data - (pd.Timestamp) end of required power data
+            timeseries_df - (pd.DataFrame) RTS-GMLC time series from Parser.parse_rts_timeseries 
+                (if solar2wind, it has to include solar time series: PV, RTPV and CSP)
+
+        Returns:
+            pd.DataFrame with columns as GenUID from wind_generators and
+            rows of power values indexed by Timestamp (IssueTime), same layout as retrieve_wtk_data
+
+        """
+
+        gen_uids = self.wind_generators["GenUID"].values
+        missing_gen_uids = [gen_uid for gen_uid in gen_uids if gen_uid not in timeseries_df.columns]
+        if missing_gen_uids:
+            raise Exception(
+                "No RTS time series for wind generators: {}".format(missing_gen_uids)
+            )
+
+        print("Retrieving RTS data ...")
+        wind_data_df = timeseries_df.loc[start_of_data:end_of_data, gen_uids].copy()
+        if wind_data_df.empty:
+            raise Exception(
+                "No RTS time series between {} and {}, data is available between {} and {}".format(
+                    start_of_data,
+                    end_of_data,
+                    timeseries_df.index.min(),
+                    timeseries_df.index.max(),
+                )
+            )
+
+        wind_data_df.columns.name = None
+        wind_data_df.index.rename("IssueTime", inplace=True)
+
+        print("Done")
+
+        return wind_data_df
+
     # new method, this one does not power condition, makes actuals_df and scenarios_df
     def make_tables(
         self,
@@ -350,6 +560,15 @@ class Grid(object):
         actuals_end=pd.Timestamp("2007-12-31 23:55:00", tz="utc"),
         scenarios_start=pd.Timestamp("2008-01-01 00:00:00", tz="utc"),
         scenarios_end=pd.Timestamp("2013-12-31 23:55:00", tz="utc"),
+        source="wtk",
+        rts_timeseries_files=None,
+        cache_dir=None,
+        workers=1,
+        power_store_dir=None,
+        dtype=np.float64,
+        wtk_source=None,
+        tables_dir=None,
+        block_days=30,
         **kwargs,
     ):
         """ Method retrieves data from wtk and makes actuals(DataFrame) and scenarios(DataFrame) 
@@ -359,9 +578,51 @@ class Grid(object):
                 actuals_end - (pd.Timestamp)  
                 scenarios_start - (pd.Timestamp)  
                 scenarios_end - (pd.Timestamp)  
-                source - (str) placeholder
+            Optional args:
+                source - (str) 'wtk' (default) retrieves WIND Toolkit data for wind_sites, 
+                    'rts' takes RTS-GMLC time series from local rts_timeseries_files (no wind sites needed, 
+                    RTS-GMLC data is for 2020 only, so pick actuals and scenarios dates from 2020)
+                rts_timeseries_files - (list of str) RTS-GMLC time series .csv files for source='rts', 
+                    e.g. [REAL_TIME_wind.csv] (add PV, RTPV and CSP REAL_TIME_*.csv if solar2wind)
+                cache_dir - (str) parse cache for RTS-GMLC time series (see Parser)
+                workers - (int) source='wtk' only, number of worker processes reading WTK site files (see retrieve_wtk_data)
+                power_store_dir - (str) source='wtk' only, consolidated power store of wind sites (see make_power_store),
+                    built on first run, later runs read actuals and scenarios windows from it
+                dtype - (np.dtype) of actuals and scenarios, np.float64 (default) or np.float32 (half the memory),
+                    with np.float32 sums (TotalPower, Deviation) are computed in float64 and rounded once, 
+                    so every value is within float32 rounding (relative 6e-8, i.e. about 1e-4 MW for 1 GW) 
+                    of the float64 path, and generator deviations within rounding of their actuals (two roundings)
+                wtk_source - (WTKSource) source='wtk' only, where site power comes from (see wtk_source), default PywtkSource()
+                tables_dir - (str) if given, tables are made out of core (for grids whose tables do not fit in memory):
+                    power is retrieved and turned into table rows block_days at a time, rows are written straight 
+                    to tables_dir (as save_tables, replaces existing one) and actuals and scenarios are memory-mapped 
+                    from there, so generate_wind_scenarios reads only rows it needs (and later runs can load_tables)
+                block_days - (float) tables_dir only, days of power data per block
         """
 
+        self.tables_source = {
+            "source": source,
+            "wtk_source": repr(PywtkSource() if wtk_source is None else wtk_source) if source == "wtk" else None,
+        }
+
+        if tables_dir is not None:
+            self.make_tables_out_of_core(
+                tables_dir,
+                actuals_start,
+                actuals_end,
+                scenarios_start,
+                scenarios_end,
+                block_days=block_days,
+                dtype=dtype,
+                source=source,
+                rts_timeseries_files=rts_timeseries_files,
+                cache_dir=cache_dir,
+                workers=workers,
+                power_store_dir=power_store_dir,
+                wtk_source=wtk_source,
+            )
+            return
+
         # time window selection:
         # one year, e.g. 2007, for the actuals
         # start_of_data = pd.Timestamp('2007-01-01 00:00:00', tz='utc')
@@ -373,23 +634,18 @@ class Grid(object):
         # start_of_data = pd.Timestamp('2013-01-01 00:00:00', tz='utc')
         # end_of_data = pd.Timestamp('2013-12-31 23:55:00', tz='utc')
 
-        wind_sites_df = self.wind_sites
-        actuals_df = self.retrieve_wtk_data(actuals_start, actuals_end)
-
-        # index does not have timezone in Devon's code, but it should
-        # actuals_df.index = actuals_df.index.tz_localize(None)
-
-        ###### fix "over" problem
-        # max actual power can not go above GenMWMax
-        # note that, it does not go "under" - WTK takes care of that
-        max_gen_capacity = self.wind_generators.set_index("GenUID")["GenMWMax"]
-        actuals_df = actuals_df[actuals_df < max_gen_capacity].fillna(max_gen_capacity)
-        # grid.actuals = new_df
-
-        # add total power column (accross all buses)
-        actuals_df["TotalPower"] = actuals_df.sum(axis=1).values
+        actuals_df, scenarios_df = self.retrieve_tables_data(
+            [(actuals_start, actuals_end), (scenarios_start, scenarios_end)],
+            source=source,
+            rts_timeseries_files=rts_timeseries_files,
+            cache_dir=cache_dir,
+            workers=workers,
+            power_store_dir=power_store_dir,
+            dtype=dtype,
+            wtk_source=wtk_source,
+        )
 
-        self.actuals = actuals_df
+        self.actuals = self.make_actuals_table(actuals_df, dtype=dtype)
 
         # for scenarios_df, just change time window, last 6 years
         # start_of_data = pd.Timestamp('2008-01-01 00:00:00', tz='utc')
@@ -401,43 +657,468 @@ class Grid(object):
         # start_of_data = pd.Timestamp('2007-01-01 00:00:00', tz='utc')
         # end_of_data = pd.Timestamp('2012-12-31 23:55:00', tz='utc')
 
-        scenarios_df = self.retrieve_wtk_data(scenarios_start, scenarios_end)
+        self.scenarios = self.make_scenarios_table(scenarios_df, dtype=dtype)
 
-        # fix "over". same as for actuals_df, but different way
-        # for GenMWMax info we take wind generators and reindex by GenUID
-        wind_generators_df = self.wind_generators.set_index("GenUID")
-        scenarios_df=scenarios_df.where(
-            scenarios_df <= wind_generators_df["GenMWMax"],
-            other=wind_generators_df["GenMWMax"],
-            axis=1,
-            #inplace=True,
+        # tables are built in place, so peak memory should stay close to tables plus retrieved power
+        max_rss = peak_rss_mb()
+        print(
+            "Tables: actuals {:.1f} MB, scenarios {:.1f} MB, peak RSS {} MB".format(
+                self.actuals.memory_usage(index=False).sum() / 2 ** 20,
+                self.scenarios.memory_usage(index=False).sum() / 2 ** 20,
+                "unknown" if max_rss is None else "{:.1f}".format(max_rss),
+            )
         )
 
+    # internal, used for make_tables with tables_dir
+    def make_tables_out_of_core(
+        self,
+        tables_dir,
+        actuals_start,
+        actuals_end,
+        scenarios_start,
+        scenarios_end,
+        block_days=30,
+        dtype=np.float64,
+        **kwargs,
+    ):
+        """ Function to make actuals and scenarios block by block into tables_dir (see make_tables), 
+            other arguments as in make_tables
+        """
+        dtype = np.dtype(dtype)
+        block_size = max(1, int(pd.Timedelta(days=block_days) / self.WTK_TIME_STEP))
+        read_windows = self.tables_data_reader(
+            min(actuals_start, scenarios_start), max(actuals_end, scenarios_end), dtype=dtype, **kwargs
+        )
+
+        def read_window(start_of_data, end_of_data):
+            return read_windows([(start_of_data, end_of_data)])[0]
+
+        actuals_times = pd.date_range(actuals_start, actuals_end, freq=self.WTK_TIME_STEP)
+        scenarios_times = pd.date_range(scenarios_start, scenarios_end, freq=self.WTK_TIME_STEP)
+
+        columns = {}
+
+        def write(tmp_dir):
+            columns["actuals"] = self.write_table_blocks(
+                tmp_dir, "actuals", actuals_times, read_window, block_size, dtype=dtype
+            )
+            columns["scenarios"] = self.write_table_blocks(
+                tmp_dir, "scenarios", scenarios_times, read_window, block_size, dtype=dtype, deviations=True
+            )
+            self.save_tables_meta(tmp_dir, actuals_times, scenarios_times[:-1], dtype, columns)
+
+        cache.atomic_write_dir(tables_dir, write)
+
+        self.actuals = load_table_block(tables_dir, "actuals", columns["actuals"])
+        self.scenarios = load_table_block(tables_dir, "scenarios", columns["scenarios"])
+
+        # only blocks are in memory, tables are on disk
+        max_rss = peak_rss_mb()
+        print(
+            "Tables (in {}): actuals {:.1f} MB, scenarios {:.1f} MB, peak RSS {} MB".format(
+                tables_dir,
+                self.actuals.values.nbytes / 2 ** 20,
+                self.scenarios.values.nbytes / 2 ** 20,
+                "unknown" if max_rss is None else "{:.1f}".format(max_rss),
+            )
+        )
+
+    def extend_tables(
+        self,
+        actuals_start=None,
+        actuals_end=None,
+        scenarios_start=None,
+        scenarios_end=None,
+        source="wtk",
+        **kwargs,
+    ):
+        """ Method to extend actuals and scenarios (made with make_tables) in time, 
+            only power data of the added time ranges is retrieved and made into blocks, which are put before and after
+            the tables in time order (tables are copied once into the new blocks, never sorted)
+            memory-mapped tables (load_tables, or make_tables with tables_dir) can not be extended, make them again
+            e.g. grid.extend_tables(scenarios_end=pd.Timestamp("2013-12-31 23:55:00", tz="utc"))
+
+            Optional args:
+                actuals_start - (pd.Timestamp) new (earlier) start of actuals, default keeps current start
+                actuals_end - (pd.Timestamp) new (later) end of actuals, default keeps current end
+                scenarios_start - (pd.Timestamp) new (earlier) start of scenarios, default keeps current start
+                scenarios_end - (pd.Timestamp) new (later) end of scenarios, default keeps current end
+                source, rts_timeseries_files, cache_dir, workers, power_store_dir, wtk_source - as in make_tables
+                    (use the same source as make_tables did)
+        """
+        if self.actuals is None or self.scenarios is None:
+            raise Exception("No tables, make tables before extending them.")
+        if is_memory_mapped(self.actuals) or is_memory_mapped(self.scenarios):
+            raise Exception(
+                "Tables are memory-mapped (load_tables or make_tables with tables_dir), extending them would read "
+                "them into memory, make them again with the new time windows instead."
+            )
+
+        # tables keep their dtype
+        dtype = self.actuals.dtypes.iloc[0]
+
+        # actuals: new ranges, without timestamps already in the table
+        actuals_first, actuals_last = self.actuals.index[0], self.actuals.index[-1]
+        actuals_windows = [None, None]
+        if actuals_start is not None and actuals_start < actuals_first:
+            actuals_windows[0] = (actuals_start, actuals_first - self.WTK_TIME_STEP)
+        if actuals_end is not None and actuals_end > actuals_last:
+            actuals_windows[1] = (actuals_last + self.WTK_TIME_STEP, actuals_end)
+
+        # scenarios: last row of power data was dropped when deviations were computed (it has no next row),
+        # new ranges include the timestamp next to the table (at the seam), so that deviations there come out right
+        scenarios_first = self.scenarios.index[0]
+        scenarios_last = self.scenarios.index[-1] + self.WTK_TIME_STEP
+        scenarios_windows = [None, None]
+        if scenarios_start is not None and scenarios_start < scenarios_first:
+            scenarios_windows[0] = (scenarios_start, scenarios_first)
+        if scenarios_end is not None and scenarios_end > scenarios_last:
+            scenarios_windows[1] = (scenarios_last, scenarios_end)
+
+        # (before, after) windows of both tables, in this order
+        windows = [window for window in actuals_windows + scenarios_windows if window is not None]
+        if not windows:
+            return
+
+        windows_df = iter(self.retrieve_tables_data(windows, source=source, dtype=dtype, **kwargs))
+        actuals_before, actuals_after, scenarios_before, scenarios_after = [
+            None if window is None else next(windows_df) for window in actuals_windows + scenarios_windows
+        ]
+
+        # new blocks are made for added ranges only and put before and after the table (already in time order)
+        self.actuals = concat_tables(
+            None if actuals_before is None else self.make_actuals_table(actuals_before, dtype=dtype),
+            self.actuals,
+            None if actuals_after is None else self.make_actuals_table(actuals_after, dtype=dtype),
+        )
+        self.scenarios = concat_tables(
+            None if scenarios_before is None else self.make_scenarios_table(scenarios_before, dtype=dtype),
+            self.scenarios,
+            None if scenarios_after is None else self.make_scenarios_table(scenarios_after, dtype=dtype),
+        )
+
+        if self.tables_meta is not None:
+            # time windows of tables loaded with load_tables (tables_dir itself is not changed, save_tables again)
+            self.tables_meta.update(
+                {
+                    "actuals_start": str(self.actuals.index[0]),
+                    "actuals_end": str(self.actuals.index[-1]),
+                    "scenarios_start": str(self.scenarios.index[0]),
+                    "scenarios_end": str(self.scenarios.index[-1] + self.WTK_TIME_STEP),
+                }
+            )
+
+    def save_tables(self, tables_dir):
+        """ Method to save actuals and scenarios (made with make_tables), wind generators and wind sites,
+            so that they can be loaded (memory-mapped) with Grid.load_tables instead of being made again
+            actuals and scenarios are saved as .npy blocks (values, timestamps), other tables as .feather (needs pyarrow),
+            meta.json has grid name, time windows, wind penetration, dtype, WTK_DATA_PRECISION,
+            tables source (and WTK source) and how wind sites were retrieved (method, radius, WTK source)
+            directory is written to a temporary directory first and then renamed (replaces existing one)
+
+        Required Args:
+            tables_dir - (str) directory
+        """
+        if self.actuals is None or self.scenarios is None:
+            raise Exception("No tables, make tables before saving them.")
+
+        def write(tmp_dir):
+            columns = {name: save_table_block(tmp_dir, name, getattr(self, name)) for name in ["actuals", "scenarios"]}
+            self.save_tables_meta(
+                tmp_dir, self.actuals.index, self.scenarios.index, self.actuals.dtypes.iloc[0], columns
+            )
+
+        cache.atomic_write_dir(tables_dir, write)
+
+    # internal, used for save_tables and make_tables with tables_dir
+    def save_tables_meta(self, tables_dir, actuals_index, scenarios_index, dtype, columns):
+        """ Function to save meta.json and wind generators, wind sites (and other grid tables) as .feather
+            next to actuals and scenarios blocks (see save_tables)
+        """
+        meta = {
+            "name": self.name,
+            "actuals_start": str(actuals_index[0]),
+            "actuals_end": str(actuals_index[-1]),
+            "scenarios_start": str(scenarios_index[0]),
+            # last timestamp of scenarios data has no row (no deviations)
+            "scenarios_end": str(scenarios_index[-1] + self.WTK_TIME_STEP),
+            "wind_penetration": self.wind_penetration(),
+            "dtype": str(np.dtype(dtype)),
+            "wtk_data_precision": self.WTK_DATA_PRECISION,
+            # None if not known (e.g. tables set by hand)
+            "source": None if self.tables_source is None else self.tables_source["source"],
+            "wtk_source": None if self.tables_source is None else self.tables_source["wtk_source"],
+            "wind_sites": self.wind_sites_meta,
+            "columns": columns,
+        }
+        for name in ["buses", "generators", "wind_generators", "wind_sites"]:
+            df = getattr(self, name)
+            if df is not None and not df.empty:
+                df.reset_index(drop=True).to_feather(os.path.join(tables_dir, name + ".feather"))
+        with open(os.path.join(tables_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load_tables(cls, tables_dir, mmap=True):
+        """ Method to load grid with tables saved by save_tables
+            e.g. grid = Grid.load_tables("ACTIVSg2000-tables") (then grid.generate_wind_scenarios(...))
+
+        Required Args:
+            tables_dir - (str) directory
+        Optional Args:
+            mmap - (bool) if True (default), actuals and scenarios are memory-mapped read only
+                (nothing is read into memory until it is used, and processes share the pages), 
+                if False, they are read into memory
+        Returns:
+            Grid (with meta.json content in tables_meta)
+        """
+        with open(os.path.join(tables_dir, "meta.json")) as f:
+            meta = json.load(f)
+
+        frames = {}
+        for name in ["buses", "generators", "wind_generators", "wind_sites"]:
+            file_name = os.path.join(tables_dir, name + ".feather")
+            frames[name] = pd.read_feather(file_name) if os.path.isfile(file_name) else pd.DataFrame()
+
+        grid = cls(
+            meta["name"],
+            frames["buses"],
+            frames["generators"],
+            frames["wind_generators"],
+            wind_sites=frames["wind_sites"],
+            actuals=load_table_block(tables_dir, "actuals", meta["columns"]["actuals"], mmap=mmap),
+            scenarios=load_table_block(tables_dir, "scenarios", meta["columns"]["scenarios"], mmap=mmap),
+        )
+        grid.tables_meta = meta
+        # kept when tables are saved again (tables saved before they were in meta.json have None)
+        grid.wind_sites_meta = meta.get("wind_sites")
+        if meta.get("source") is not None:
+            grid.tables_source = {"source": meta["source"], "wtk_source": meta.get("wtk_source")}
+
+        return grid
+
+    def wind_penetration(self):
+        """ Method to get wind penetration (percentage of total generator capacity), None if generators are not known
+        """
+        if self.generators is None or "GenFuelType" not in self.generators or "GenMWMax" not in self.generators:
+            return None
+        total_capacity = self.generators["GenMWMax"].sum()
+        wind_capacity = self.generators[self.generators["GenFuelType"] == "Wind"]["GenMWMax"].sum()
+
+        return float(100 * wind_capacity / total_capacity)
+
+    # internal, used for make_tables and extend_tables
+    def retrieve_tables_data(self, windows, **kwargs):
+        """ Function to retrieve power of wind generators for several time windows (arguments as in make_tables)
+
+        Required args:
+            windows - (list of (pd.Timestamp, pd.Timestamp)) start and end of required power data
+        Returns:
+            list of pd.DataFrame, power (as retrieve_wtk_data), one per window
+        """
+        read_windows = self.tables_data_reader(
+            min(start_of_data for start_of_data, end_of_data in windows),
+            max(end_of_data for start_of_data, end_of_data in windows),
+            **kwargs,
+        )
+
+        return read_windows(windows)
+
+    # internal, used for make_tables (also block by block) and extend_tables
+    def tables_data_reader(
+        self,
+        start_of_data,
+        end_of_data,
+        source="wtk",
+        rts_timeseries_files=None,
+        cache_dir=None,
+        workers=1,
+        power_store_dir=None,
+        dtype=np.float64,
+        wtk_source=None,
+        **kwargs,
+    ):
+        """ Function to prepare retrieval of power of wind generators between start_of_data and end_of_data
+            (arguments as in make_tables), power store is opened (built) and RTS-GMLC time series are parsed once here,
+            so that returned function can be called for many (e.g. block) windows
+
+        Required args:
+            start_of_data - (pd.Timestamp) start of all windows
+            end_of_data - (pd.Timestamp) end of all windows
+        Returns:
+            read_windows - (function) read_windows(windows) gives list of pd.DataFrame, power (as retrieve_wtk_data), 
+                one per window
+        """
+        if source == "wtk":
+            power_store = None
+            if power_store_dir is not None:
+                power_store = self.make_power_store(
+                    power_store_dir, start_of_data, end_of_data, workers=workers, wtk_source=wtk_source,
+                )
+
+            # each site is read once for overlapping or adjacent actuals and scenarios windows
+            def read_windows(windows):
+                return self.retrieve_wtk_windows(
+                    windows, workers=workers, power_store=power_store, dtype=dtype, wtk_source=wtk_source
+                )
+
+        elif source == "rts":
+            if rts_timeseries_files is None:
+                raise ValueError("source='rts' needs rts_timeseries_files")
+            # parse local time series once, actuals and scenarios are windows of it
+            timeseries_df = Parser(cache_dir=cache_dir).parse_rts_timeseries(rts_timeseries_files)
+
+            def read_windows(windows):
+                return [
+                    self.retrieve_rts_data(start_of_data, end_of_data, timeseries_df).astype(dtype, copy=False)
+                    for start_of_data, end_of_data in windows
+                ]
+
+        else:
+            raise ValueError("unknown source: {}, use 'wtk' or 'rts'".format(source))
+
+        return read_windows
+
+    # internal, used for make_tables and extend_tables
+    def make_actuals_table(self, actuals_df, dtype=np.float64):
+        """ Function to make actuals table out of power of wind generators (caps power at GenMWMax, adds TotalPower)
+            table is one preallocated block (generators and TotalPower), power is copied into it once 
+            and capped in place (actuals_df is not changed)
+        """
+        # index does not have timezone in Devon's code, but it should
+        # actuals_df.index = actuals_df.index.tz_localize(None)
+
+        n_gens = actuals_df.shape[1]
+        block = np.empty((len(actuals_df), n_gens + 1), dtype=dtype)
+        block[:, :n_gens] = actuals_df.values
+
+        ###### fix "over" problem
+        # max actual power can not go above GenMWMax (missing power is taken as GenMWMax, as it used to be)
+        # note that, it does not go "under" - WTK takes care of that
+        cap_power(block[:, :n_gens], self.gen_capacity(actuals_df.columns, dtype))
+
+        # add total power column (accross all buses), summed in float64
+        block[:, n_gens] = block[:, :n_gens].sum(axis=1, dtype=np.float64)
+
+        return pd.DataFrame(
+            block, index=actuals_df.index, columns=list(actuals_df.columns) + ["TotalPower"], copy=False
+        )
+
+    # internal, used for make_tables and extend_tables
+    def make_scenarios_table(self, scenarios_df, dtype=np.float64):
+        """ Function to make scenarios table out of power of wind generators 
+            (caps power at GenMWMax, adds TotalPower, replaces power by deviations from next timestamp, drops last row)
+            table is one preallocated block (generators, TotalPower and Deviation), power is copied into it once,
+            capped and turned into deviations in place (scenarios_df is not changed)
+        """
         # index does not have timezone in Devon's code, but it should
         # scenarios_df.index = scenarios_df.index.tz_localize(None)
 
-        # add total power column (accross all generators)
-        scenarios_df["TotalPower"] = scenarios_df.sum(axis=1).values
+        n_gens = scenarios_df.shape[1]
+        block = np.empty((len(scenarios_df), n_gens + 2), dtype=dtype)
+        block[:, :n_gens] = scenarios_df.values
+
+        # fix "over". same as for actuals_df
+        cap_power(block[:, :n_gens], self.gen_capacity(scenarios_df.columns, dtype))
+
+        # add total power column (accross all generators), summed in float64
+        scenarios_total_power = block[:, :n_gens].sum(axis=1, dtype=np.float64)
+        block[:, n_gens] = scenarios_total_power
 
         # compute deviations
         # i.e. make error calculations (instead of full power at each bus, have deviations from persistence)
 
-        # deviations from persistence at generators
-        gen_deviations_array = (
-            scenarios_df.iloc[1:, :-1].values - scenarios_df.iloc[:-1, :-1].values
-        )
-        # total power deviations
-        total_power_deviations_array = (
-            scenarios_df["TotalPower"].values[1:]
-            - scenarios_df["TotalPower"].values[:-1]
+        # deviations from persistence at generators, in place
+        # (difference of two values of dtype is rounded once, no need for float64 here)
+        power_deviations(block[:, :n_gens])
+        # total power deviations, from float64 total power
+        block[:-1, n_gens + 1] = scenarios_total_power[1:] - scenarios_total_power[:-1]
+
+        # last row has no deviations, it is left out of the table (view, no copy)
+        return pd.DataFrame(
+            block[:-1],
+            index=scenarios_df.index[:-1],
+            columns=list(scenarios_df.columns) + ["TotalPower", "Deviation"],
+            copy=False,
         )
-        # drop last row
-        scenarios_df.drop(scenarios_df.tail(1).index, inplace=True)
-        # record deviations
-        scenarios_df.iloc[:, :-1] = gen_deviations_array
-        scenarios_df["Deviation"] = total_power_deviations_array
 
-        self.scenarios = scenarios_df
+    # internal, used for make_tables with tables_dir (out of core)
+    def write_table_blocks(self, tables_dir, name, times, read_window, block_size, dtype=np.float64, deviations=False):
+        """ Function to make actuals (deviations=False) or scenarios (deviations=True) table block by block,
+            straight into <tables_dir>/<name>.npy and <name>_index.npy (as save_table_block), so that only
+            block_size timestamps of power are in memory at a time
+            blocks are capped and summed as in make_actuals_table and make_scenarios_table, for scenarios 
+            the last row of power of a block is carried over to the next block (its deviations need the next row), 
+            so the table comes out the same as the one made in memory
+
+        Required Args:
+            tables_dir - (str) directory
+            name - (str) 'actuals' or 'scenarios'
+            times - (pd.DatetimeIndex) all timestamps of power data (5 min)
+            read_window - (function) read_window(start_of_data, end_of_data) gives power (pd.DataFrame, time x GenUID)
+            block_size - (int) number of timestamps per block
+        Optional Args:
+            dtype - (np.dtype) of the table
+            deviations - (bool) make scenarios table (deviations from next timestamp, last timestamp left out)
+        Returns:
+            columns - (list of str) column names
+        """
+        n_rows = len(times) - 1 if deviations else len(times)
+        n_blocks = -(-len(times) // block_size)
+        table = None
+        carry_power, carry_total_power = None, None
+        for block_i, start in enumerate(range(0, len(times), block_size)):
+            block_times = times[start : start + block_size]
+            power_df = read_window(block_times[0], block_times[-1])
+            if not np.array_equal(timestamps_ns(power_df.index), timestamps_ns(block_times)):
+                raise ValueError(
+                    "Power data between {} and {} has {} timestamps, expected {} (every {})".format(
+                        block_times[0], block_times[-1], len(power_df), len(block_times), self.WTK_TIME_STEP
+                    )
+                )
+            if table is None:
+                gen_uids = [str(gen_uid) for gen_uid in power_df.columns]
+                n_gens = len(gen_uids)
+                gen_capacity = self.gen_capacity(power_df.columns, dtype)
+                table = np.lib.format.open_memmap(
+                    os.path.join(tables_dir, name + ".npy"),
+                    mode="w+",
+                    dtype=dtype,
+                    shape=(n_rows, n_gens + (2 if deviations else 1)),
+                )
+
+            # copy of block power (values of power_df can be read only), capped and turned into deviations in place
+            block = np.array(power_df.values, dtype=dtype)
+            cap_power(block, gen_capacity)
+            total_power = block.sum(axis=1, dtype=np.float64)
+            if not deviations:
+                table[start : start + len(block), :n_gens] = block
+                table[start : start + len(block), n_gens] = total_power
+            else:
+                if carry_power is not None:
+                    # last row of previous block, its deviations are to the first row of this block
+                    table[start - 1, :n_gens] = block[0] - carry_power
+                    table[start - 1, n_gens] = carry_total_power
+                    table[start - 1, n_gens + 1] = total_power[0] - carry_total_power
+                carry_power, carry_total_power = block[-1].copy(), total_power[-1]
+                power_deviations(block)
+                end = start + len(block) - 1
+                table[start:end, :n_gens] = block[:-1]
+                table[start:end, n_gens] = total_power[:-1]
+                table[start:end, n_gens + 1] = total_power[1:] - total_power[:-1]
+            print("{} block {}/{} done".format(name, block_i + 1, n_blocks))
+
+        table.flush()
+        del table
+        np.save(os.path.join(tables_dir, name + "_index.npy"), timestamps_ns(times[:n_rows]))
+
+        return gen_uids + (["TotalPower", "Deviation"] if deviations else ["TotalPower"])
+
+    # internal, used for make_actuals_table and make_scenarios_table
+    def gen_capacity(self, gen_uids, dtype=np.float64):
+        """ Function to get GenMWMax of wind generators in order of gen_uids (array of dtype)
+        """
+        return self.wind_generators.set_index("GenUID")["GenMWMax"].reindex(gen_uids).values.astype(dtype)
 
     # old make tables method
     def make_tables2(
@@ -475,7 +1156,11 @@ class Grid(object):
         # end_of_data = pd.Timestamp('2013-12-31 23:55:00', tz='utc')
 
         wind_sites_df = self.wind_sites
-        actuals_df = self.retrieve_wtk_data(actuals_start, actuals_end)
+        # windows retrieved together are slices of one DataFrame, copied since they are changed in place below
+        actuals_df, scenarios_df = [
+            window_df.copy()
+            for window_df in self.retrieve_wtk_windows([(actuals_start, actuals_end), (scenarios_start, scenarios_end)])
+        ]
 
         # index does not have timezone in Devon's code, but it should
         # actuals_df.index = actuals_df.index.tz_localize(None)
@@ -502,8 +1187,6 @@ class Grid(object):
         # start_of_data = pd.Timestamp('2007-01-01 00:00:00', tz='utc')
         # end_of_data = pd.Timestamp('2012-12-31 23:55:00', tz='utc')
 
-        scenarios_df = self.retrieve_wtk_data(scenarios_start, scenarios_end)
-
         # index does not have timezone in Devon's code, but it should
         # scenarios_df.index = scenarios_df.index.tz_localize(None)
 
@@ -556,6 +1239,33 @@ class Grid(object):
 
         # new method
 
+    def get_sampling_index(self, power_quantiles, n_periods, loss_of_load_cost=10000 / 12.0, spilled_wind_cost=0.001):
+        """ method to get sampling index of scenarios table (see sampling_index),
+            index is built on first use and kept until parameters or scenarios table change
+
+        Required Args:
+            power_quantiles - (list) quantiles for power conditioning
+            n_periods - (integer) number of periods for each scenario
+        Optional Args:
+            loss_of_load_cost - (float) cost of MW per 5-min period of negative deviation
+            spilled_wind_cost - (float) cost of MW per 5-min period of positive deviation
+        Returns:
+            SamplingIndex
+        """
+        if self.sampling_index is None or not self.sampling_index.matches(
+            self.scenarios, power_quantiles, n_periods, loss_of_load_cost, spilled_wind_cost
+        ):
+            self.sampling_index = SamplingIndex(
+                self.scenarios,
+                power_quantiles,
+                n_periods,
+                loss_of_load_cost=loss_of_load_cost,
+                spilled_wind_cost=spilled_wind_cost,
+                precision=self.WTK_DATA_PRECISION,
+            )
+
+        return self.sampling_index
+
     def generate_wind_scenarios(
         self,
         timestamp,
@@ -565,6 +1275,8 @@ class Grid(object):
         n_periods=1,
         random_seed=25,
         output_format=0,
+        loss_of_load_cost=10000 / 12.0,
+        spilled_wind_cost=0.001,
         **kwargs,
     ):
         """Method to generate scenarios
@@ -574,6 +1286,8 @@ class Grid(object):
 	            sampling_method - (string) either "importance" or "monte carlo"
 	            n_scenarios - (integer) number of scenarios to draw 
 	            n_periods - (integer) number of periods for each scenario
+	            loss_of_load_cost - (float) cost of MW per 5-min period of negative deviation (importance sampling)
+	            spilled_wind_cost - (float) cost of MW per 5-min period of positive deviation (importance sampling)
 	                
 	        Returns:
 	            scenarios_df - (pd.DataFrame) multi-indexed DataFrame with all scenarios
@@ -617,69 +1331,19 @@ class Grid(object):
         total_power_t0 = actuals_df.loc[timestamps[0]]["TotalPower"]
         # total_power_t0
 
-        # power conditioning
-        # .iloc[:-n_periods] is so that we can find consecutive timestamps for multiperiod scenarios
-        power_bins = pd.qcut(
-            scenarios_df["TotalPower"].iloc[:-n_periods], q=power_quantiles,
+        # power conditioning and sampling, index of bins (and importance probabilities) is built once
+        # per (power_quantiles, n_periods, cost parameters) and reused by following calls
+        sampling_index = self.get_sampling_index(
+            power_quantiles, n_periods, loss_of_load_cost=loss_of_load_cost, spilled_wind_cost=spilled_wind_cost
         )
-        # power_bins
-
-        # which power bin does it belong to?
-        # for power_bin in power_bins.unique():
-        for power_bin in power_bins.cat.categories:
-            if total_power_t0 in power_bin:
-                break
-        # power_bin
-        # wanted power bin
-        p_bin = power_bins.loc[power_bins == power_bin]
-
-        if sampling_method == "monte carlo":
-            # sample of n_scenarios timestamps that are in wanted bin
-            sample_timestamps = p_bin.sample(n_scenarios, random_state=random_seed).index
-            # #     # df of weights to return (all ones, redundant, but have to return something)
-            weights_df = pd.DataFrame(index=[timestamps[1]], columns=range(1, n_scenarios + 1))
-            weights_df.loc[timestamps[1]] = dict(
-                zip(range(1, n_scenarios + 1), np.ones(n_scenarios))
-            )
-
-
-        elif sampling_method == "importance":
-            # importance sample from an appropriate power bin
-            # cost of MW per 5-min period
-            loss_of_load_cost = 10000 / 12.0
-            spilled_wind_cost = 0.001
+        sample_positions, sample_weights = sampling_index.draw(
+            total_power_t0, n_scenarios, random_seed=random_seed, sampling_method=sampling_method
+        )
+        sample_timestamps = scenarios_df.index[sample_positions]
 
-            # compute costs of each 1-period scenario
-            cost_1 = scenarios_df["Deviation"].apply(
-                lambda dev: np.abs(loss_of_load_cost * dev)
-                if dev < 0
-                else np.abs(spilled_wind_cost * dev)
-            )
-            # print("any neg values in cost_1? {}".format((cost_1 < 0).any()))
-
-            # based on n_periods, compute cost_n, rolling window sum (if n_periods is 1, this will be the same as cost_1)
-            cost_n = cost_1.rolling(n_periods).sum().shift(-(n_periods - 1))
-            # rolling window operation looses digits, have to round (so we don't have negative values when adding zeroes)
-            cost_n = cost_n.round(self.WTK_DATA_PRECISION)
-            if (cost_n < 0).any():
-                print("any neg values in cost_n? {}".format((cost_n < 0).any()))
-            # IS
-            # probability mass function g(s) i.e. importance distribution
-            importance_probs = cost_n.loc[p_bin.index] / cost_n.loc[p_bin.index].sum()
-
-            # sample of n_scenarios timestamps that are in wanted bin with probabilities given by cost_n series
-            sample_timestamps = p_bin.sample(
-                n_scenarios, random_state=random_seed, weights=importance_probs
-            ).index
-
-            # IS weights: f(s)/g(s), i.e. nominal/importance
-            importance_weights = (1 / p_bin.size) / importance_probs.loc[sample_timestamps]
-
-            # df of weights to return
-            weights_df = pd.DataFrame(index=[timestamps[1]], columns=range(1, n_scenarios + 1))
-            weights_df.loc[timestamps[1]] = dict(
-                zip(range(1, n_scenarios + 1), importance_weights.values)
-            )
+        # df of weights to return (all ones for monte carlo, IS weights f(s)/g(s) for importance)
+        weights_df = pd.DataFrame(index=[timestamps[1]], columns=range(1, n_scenarios + 1))
+        weights_df.loc[timestamps[1]] = dict(zip(range(1, n_scenarios + 1), sample_weights))
 
         # initialize multi-indexed df for all scenarios to return
 
@@ -716,8 +1380,8 @@ class Grid(object):
             #     print("\nactual:")
             #     actuals_df.loc[timestamps[0]]
 
-            # first take actual
-            running_sum = actuals_df.loc[timestamps[0]].drop("TotalPower")
+            # first take actual (in float64, so that float32 tables don't add rounding errors)
+            running_sum = actuals_df.loc[timestamps[0]].drop("TotalPower").astype(np.float64)
             # now keep adding deviations to the above actual
             for timestamp in timestamps[1:]:
                 running_sum += deviation.loc[timestamp].drop(
@@ -747,6 +1411,111 @@ class Grid(object):
         return multi_scenarios_df, weights_df
 
 
+    def generate_wind_scenarios_batch(
+        self,
+        sim_timestamps,
+        power_quantiles=[0.0, 0.1, 0.9, 1.0],
+        sampling_method="monte carlo",
+        n_scenarios=5,
+        n_periods=1,
+        random_seed=25,
+        loss_of_load_cost=10000 / 12.0,
+        spilled_wind_cost=0.001,
+        chunk_size=2 ** 24,
+        **kwargs,
+    ):
+        """Method to generate scenarios for many simulation timestamps at once, same scenarios as 
+            generate_wind_scenarios of every timestamp (power conditioning, running sums of deviations in float64 
+            from actual power at t0, clipping at 0 and GenMWMax), but bins are found and sample rows are drawn 
+            for all timestamps at once, and scenarios are made as (timestamp x scenario x period x generator) arrays
+            draws come from one random stream for the whole batch, so they are not the same rows as those of 
+            generate_wind_scenarios with one seed per timestamp, but they have the same distribution 
+            (uniform, or successive sampling without replacement for importance, see SamplingIndex.draw_batch)
+	        Required Args:
+	            sim_timestamps - (iterable of pd.Timestamp) simulation timestamps (t1 of each scenario)
+	        Optional Args:
+	            power_quantiles, sampling_method, n_scenarios, n_periods, loss_of_load_cost, spilled_wind_cost - 
+	                as in generate_wind_scenarios
+	            random_seed - (integer) seed of the whole batch
+	            chunk_size - (integer) number of scenario values made at a time (bounds temporaries)
+	                
+	        Returns:
+	            scenarios_df - (pd.DataFrame) multi-indexed (sim_timestamp, scenario_nr, period_timestamp) DataFrame
+	                with all scenarios of all timestamps, columns as actuals (without TotalPower)
+	            weights_df - (pd.DataFrame) weights of scenarios, indexed by sim_timestamp, columns scenario_nr
+	    """
+        actuals_df = self.actuals
+        scenarios_df = self.scenarios
+        sim_timestamps = pd.DatetimeIndex(sim_timestamps)
+
+        # rows of actuals at t0 of every timestamp
+        t0_positions = actuals_df.index.get_indexer(sim_timestamps - self.WTK_TIME_STEP)
+        if (t0_positions < 0).any():
+            raise ValueError(
+                "No actuals at {} (t0 of sim_timestamp), actuals are between {} and {}".format(
+                    sim_timestamps[np.argmax(t0_positions < 0)] - self.WTK_TIME_STEP,
+                    actuals_df.index.min(),
+                    actuals_df.index.max(),
+                )
+            )
+
+        # power conditioning and sampling of all timestamps at once
+        sampling_index = self.get_sampling_index(
+            power_quantiles, n_periods, loss_of_load_cost=loss_of_load_cost, spilled_wind_cost=spilled_wind_cost
+        )
+        sample_positions, sample_weights = sampling_index.draw_batch(
+            actuals_df["TotalPower"].values[t0_positions],
+            n_scenarios,
+            np.random.RandomState(random_seed),
+            sampling_method=sampling_method,
+        )
+
+        # generators are matched by GenUID (columns of actuals and scenarios tables)
+        gen_uids = actuals_df.columns.drop("TotalPower")
+        actuals_columns = actuals_df.columns.get_indexer(gen_uids)
+        scenarios_columns = scenarios_df.columns.get_indexer(gen_uids)
+        # for GenMWMax info we take wind generators (by GenUID)
+        gen_capacity = self.gen_capacity(gen_uids)
+        actuals_values = actuals_df.values
+        scenarios_values = scenarios_df.values
+
+        # (timestamp x scenario x period x generator), made chunk of timestamps at a time
+        n_gens = len(gen_uids)
+        power = np.empty((len(sim_timestamps), n_scenarios, n_periods, n_gens), dtype=np.float64)
+        chunk_timestamps = max(1, chunk_size // max(1, n_scenarios * n_periods * n_gens))
+        periods = np.arange(n_periods)
+        for start in range(0, len(sim_timestamps), chunk_timestamps):
+            chunk = power[start : start + chunk_timestamps]
+            # deviations of consecutive rows of every sample (rows are 5 minutes apart)
+            rows = sample_positions[start : start + chunk_timestamps, :, None] + periods
+            chunk[...] = scenarios_values[rows[..., None], scenarios_columns]
+            # first take actual (in float64), then keep adding deviations to it (same order as running sums)
+            chunk[:, :, 0, :] += actuals_values[
+                t0_positions[start : start + chunk_timestamps, None], actuals_columns
+            ].astype(np.float64)[:, None, :]
+            np.cumsum(chunk, axis=2, out=chunk)
+            # "under/over" problem, under (fmax takes 0.0 where power is NaN, as .where did) and over
+            np.fmax(chunk, 0.0, out=chunk)
+            np.minimum(chunk, gen_capacity, out=chunk)
+
+        index = pd.MultiIndex.from_arrays(
+            [
+                np.repeat(sim_timestamps, n_scenarios * n_periods),
+                np.tile(np.repeat(np.arange(1, n_scenarios + 1), n_periods), len(sim_timestamps)),
+                (
+                    np.repeat(sim_timestamps, n_scenarios * n_periods)
+                    + np.tile(periods, len(sim_timestamps) * n_scenarios) * self.WTK_TIME_STEP
+                ),
+            ],
+            names=["sim_timestamp", "scenario_nr", "period_timestamp"],
+        )
+        multi_scenarios_df = pd.DataFrame(
+            power.reshape(-1, n_gens), index=index, columns=gen_uids, copy=False
+        )
+        weights_df = pd.DataFrame(sample_weights, index=sim_timestamps, columns=range(1, n_scenarios + 1))
+
+        return multi_scenarios_df, weights_df
+
     def generate_wind_scenarios2(
         self,
         timestamps,
@@ -1041,3 +1810,200 @@ class Grid(object):
             # multi_scenarios_df=multi_scenarios_df+forecast_s
 
             return multi_scenarios_df, actual_s
+
+
+def get_site_power(wtk_source, site_id, start_of_data, end_of_data, nc_dir, attribute):
+    """Internal function (runs in worker processes of Grid.retrieve_wtk_data) to read power of one WTK site
+    """
+    return wtk_source.get_power(site_id, start_of_data, end_of_data, nc_dir=nc_dir, attribute=attribute)
+
+
+def get_sites_power(
+    wtk_source, site_ids, start_of_data, end_of_data, nc_dir="met", attribute="power", workers=1
+):
+    """ generator of power (pd.Series) of WTK sites, in the order of site_ids
+        with workers other than 1, site files are read and decoded concurrently in a process pool,
+        at most a few files per worker are read ahead, so that memory stays bounded for long time windows
+
+    Required Args:
+        wtk_source - (WTKSource) where site power comes from
+        site_ids - (list of int) WTK site ids
+        start_of_data - (pd.Timestamp) start of required power data
+        end_of_data - (pd.Timestamp) end of required power data
+    Optional Args:
+        nc_dir - (str) 'met' or 'fcst'
+        attribute - (str) WTK attribute
+        workers - (int) number of worker processes, default 1 reads in this process, None uses all cpus
+    """
+    if workers == 1:
+        for site_id in site_ids:
+            yield get_site_power(wtk_source, site_id, start_of_data, end_of_data, nc_dir, attribute)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        read_ahead = 4 * (workers or os.cpu_count() or 1)
+        futures = collections.deque()
+        site_ids = iter(site_ids)
+        for site_id in itertools.islice(site_ids, read_ahead):
+            futures.append(
+                executor.submit(
+                    get_site_power, wtk_source, site_id, start_of_data, end_of_data, nc_dir, attribute
+                )
+            )
+        while futures:
+            site_power = futures.popleft().result()
+            for site_id in itertools.islice(site_ids, 1):
+                futures.append(
+                    executor.submit(
+                        get_site_power, wtk_source, site_id, start_of_data, end_of_data, nc_dir, attribute
+                    )
+                )
+            yield site_power
+
+
+def make_site_gen_matrix(wind_sites_df):
+    """ function to make sparse (generator x site) incidence matrix, one 1.0 per site in the row of its generator
+
+    Required Args:
+        wind_sites_df - (pd.DataFrame) wind sites with GenUID column (one row per site)
+    Returns:
+        (gen_uids, site_gen_matrix) - (array, scipy.sparse.csr_matrix) unique GenUID (order of appearance), incidence matrix
+    """
+    gen_rows, gen_uids = pd.factorize(wind_sites_df["GenUID"])
+    n_sites = len(wind_sites_df)
+    site_gen_matrix = scipy.sparse.csr_matrix(
+        (np.ones(n_sites), (gen_rows, np.arange(n_sites))), shape=(len(gen_uids), n_sites)
+    )
+
+    return np.asarray(gen_uids), site_gen_matrix
+
+
+def aggregate_sites(site_gen_matrix, power, chunk_size=2 ** 14, dtype=np.float64):
+    """ function to sum power of sites by generator (sparse-dense matmul), in float64, chunk_size timestamps at a time
+        sites of a generator are added in the order of sites, as they used to be added one by one
+
+    Required Args:
+        site_gen_matrix - (scipy.sparse.csr_matrix) (generator x site) incidence matrix (see make_site_gen_matrix)
+        power - (2-D array) power, site x time
+    Optional Args:
+        dtype - (np.dtype) of returned power, sums are rounded to it only at the end (e.g. np.float32)
+    Returns:
+        gen_power - (2-D array of dtype) power, time x generator
+    """
+    n_times = power.shape[1]
+    gen_power = np.empty((n_times, site_gen_matrix.shape[0]), dtype=dtype)
+    for start in range(0, n_times, chunk_size):
+        gen_power[start : start + chunk_size] = (
+            site_gen_matrix @ power[:, start : start + chunk_size].astype(np.float64)
+        ).T
+
+    return gen_power
+
+
+def cap_power(power, gen_capacity, chunk_size=2 ** 14):
+    """ function to cap power of generators at their capacity in place, missing power (NaN) is set to capacity,
+        chunk_size rows at a time (no full size temporaries)
+
+    Required Args:
+        power - (2-D array) power, time x generator (changed in place)
+        gen_capacity - (array) capacity of generators
+    """
+    for start in range(0, len(power), chunk_size):
+        rows = power[start : start + chunk_size]
+        # fmin takes capacity where power is NaN
+        np.fmin(rows, gen_capacity, out=rows)
+
+
+def power_deviations(power, chunk_size=2 ** 14):
+    """ function to turn power into deviations from persistence in place, row t becomes power[t + 1] - power[t], 
+        last row is left as it is, chunk_size rows at a time (rows are done in order, 
+        so every row is read before it is changed, temporaries are chunk sized)
+
+    Required Args:
+        power - (2-D array) power, time x generator (changed in place)
+    """
+    n_rows = len(power) - 1
+    for start in range(0, n_rows, chunk_size):
+        end = min(start + chunk_size, n_rows)
+        np.subtract(power[start + 1 : end + 1], power[start:end], out=power[start:end])
+
+
+def peak_rss_mb():
+    """ function to get peak resident set size of this process [MB] (None if it is not known on this platform)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kB on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        return max_rss / 2 ** 20
+    return max_rss / 2 ** 10
+
+
+def concat_tables(before_df, table_df, after_df):
+    """ function to put blocks before and after a table (actuals or scenarios), blocks are already in time order,
+        so the table is not sorted again, result is one preallocated block (same layout as make_actuals_table)
+
+    Required Args:
+        before_df - (pd.DataFrame or None) block before the table
+        table_df - (pd.DataFrame) table
+        after_df - (pd.DataFrame or None) block after the table
+    Returns:
+        pd.DataFrame
+    """
+    dfs = [df for df in [before_df, table_df, after_df] if df is not None]
+    if len(dfs) == 1:
+        return table_df
+
+    block = np.empty((sum(len(df) for df in dfs), table_df.shape[1]), dtype=table_df.dtypes.iloc[0])
+    start = 0
+    for df in dfs:
+        block[start : start + len(df)] = df[table_df.columns].values
+        start += len(df)
+
+    return pd.DataFrame(
+        block, index=dfs[0].index.append([df.index for df in dfs[1:]]), columns=table_df.columns, copy=False
+    )
+
+
+def is_memory_mapped(table_df):
+    """ function to check if values of a table are memory-mapped (tables of load_tables, or make_tables with tables_dir)
+    """
+    array = table_df.values
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+
+    return False
+
+
+def timestamps_ns(index):
+    """ function to get timestamps as ns since epoch (UTC), whatever unit the DatetimeIndex has (pandas 2+ keeps e.g. us),
+        so that saved timestamps are read back the same (with unit="ns")
+    """
+    return np.asarray(index.values, dtype="datetime64[ns]").view(np.int64)
+
+
+def save_table_block(tables_dir, name, table_df):
+    """ function to save actuals or scenarios as .npy blocks: <name>.npy (values) and <name>_index.npy (ns since epoch, UTC)
+
+    Returns:
+        columns - (list of str) column names (kept in meta.json)
+    """
+    np.save(os.path.join(tables_dir, name + ".npy"), np.ascontiguousarray(table_df.values))
+    np.save(os.path.join(tables_dir, name + "_index.npy"), timestamps_ns(table_df.index))
+
+    return [str(column) for column in table_df.columns]
+
+
+def load_table_block(tables_dir, name, columns, mmap=True):
+    """ function to load actuals or scenarios saved by save_table_block, memory-mapped (read only) if mmap
+    """
+    values = np.load(os.path.join(tables_dir, name + ".npy"), mmap_mode="r" if mmap else None)
+    index = pd.to_datetime(np.load(os.path.join(tables_dir, name + "_index.npy")), unit="ns", utc=True)
+
+    return pd.DataFrame(values, index=index.rename("IssueTime"), columns=columns, copy=False)
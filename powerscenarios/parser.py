@@ -3,12 +3,25 @@ import logging
 import pandas as pd
 import numpy as np
 import sys
+import io
+import csv
+import re
+import itertools
+import concurrent.futures
 
 # should this be imported only as needed (in retrieve_wind_sites, retrieve_wtk_data,)
 import os
 
+from powerscenarios import cache
+
 logging.basicConfig()
 
+# bump when parsed tables change (columns, types, values), so that parse cache entries made by older versions are not used
+PARSER_VERSION = "2"
+
+# tokenizer for rows of .aux DATA blocks: a quoted field (spaces allowed inside) or a run of non-space characters
+AUX_TOKEN_RE = re.compile(r'"[^"]*"|\S+')
+
 
 class Parser(object):
     """ Class for parsing various grid files 
@@ -19,8 +32,60 @@ class Parser(object):
 
     blet = "ble"
 
-    def __init__(self):
-        pass
+    # columns picked from .aux Bus and Gen tables: bus_df/gen_df column name -> .aux field name (from DATA header)
+    AUX_BUS_FIELDS = {
+        "BusNum": "BusNum",
+        "BusName": "BusName",
+        "Latitude": "Latitude:1",
+        "Longitude": "Longitude:1",
+        "Zone": "ZoneNum",
+    }
+    AUX_GEN_FIELDS = {
+        "BusNum": "BusNum",
+        "GenID": "GenID",
+        "GenMWMax": "GenMWMax",
+        "GenMWMin": "GenMWMin",
+        "GenWindPowerFactor": "GenWindPowerFactor",
+        "GenFuelType": "GenFuelType",
+    }
+
+    def __init__(self, cache_dir=None):
+        """
+        Optional Args:
+            cache_dir - (str) directory for parse cache, if given parse_tamu_aux and parse_rts_csvs 
+                store their results there and load them on later calls (as long as source files do not change)
+        """
+        self.cache_dir = cache_dir
+        # byte-offset indexes of .aux files: (abs path, size, mtime_ns) -> list of DATA blocks (see index_aux_file)
+        self.aux_indexes = {}
+
+    def load_cached(self, file_names, names, *params):
+        """Internal function to load parsed DataFrames from parse cache
+
+        Required Args:
+            file_names - (list of str) source files 
+            names - (list of str) names of cached DataFrames
+            params - parsing options that change the result (e.g. method name, solar2wind)
+        Returns:
+            (key, frames) - cache key and list of DataFrames (None if not cached or no cache_dir)
+        """
+        if self.cache_dir is None:
+            return None, None
+
+        key = cache.make_key(file_names, PARSER_VERSION, *params, hash_dir=self.cache_dir)
+        return key, cache.load_frames(self.cache_dir, key, names)
+
+    def save_cached(self, key, file_names, frames):
+        """Internal function to save parsed DataFrames (dict name -> DataFrame) to parse cache under key (see load_cached)
+        """
+        if self.cache_dir is None:
+            return
+
+        meta = {
+            "file_names": [os.path.abspath(file_name) for file_name in file_names],
+            "parser_version": PARSER_VERSION,
+        }
+        cache.save_frames(self.cache_dir, key, frames, meta=meta)
 
     def remove_spaces_between_quotes(self, line):
         """Internal function to remove spaces in a line if they appear between "" while parsing .aux files for TAMU grids
@@ -67,6 +132,244 @@ class Parser(object):
 
         return new_line
 
+    def iter_aux_blocks(self, grid_file_name, table_names=None, batch_size=10000):
+        """ generator that walks a TAMU grid .aux file once, line by line, and yields rows of DATA blocks in batches
+            only the current batch is held in memory, never the whole file
+
+        Required Args:
+            grid_file_name - (str) path to .aux file
+        Optional Args:
+            table_names - (list of str) tables to pull out (e.g. ['Bus', 'Gen', 'Branch']), default None takes all tables
+            batch_size - (int) max number of rows in one batch
+        Yields:
+            (table_name, block_nr, column_names, rows) - (str, int, list of str, list of lists of str)
+                block_nr - counts DATA blocks of the same table starting from 1 (e.g. there are 2 Branch tables: lines and transformers)
+                column_names - field list from the DATA header
+                rows - rows of the block split into fields by AUX_TOKEN_RE (quoted fields keep their quotes)
+            every block yields at least one (possibly empty) batch
+
+        E.g. to read Bus and Gen tables in one pass:
+            for table_name, block_nr, column_names, rows in parser.iter_aux_blocks(aux_file_name, ["Bus", "Gen"]):
+                ...
+        """
+
+        if table_names is not None:
+            table_names = set(table_names)
+
+        block_counts = {}
+        header = None  # DATA header text, collected until field list is closed
+        table_name = None
+        column_names = None
+        wanted = False
+        rows_start = False
+        subdata = False
+        rows = []
+
+        with open(grid_file_name) as f:
+            for line in f:
+                line = line.strip()
+
+                if header is not None:
+                    # DATA header can span several lines
+                    header += line
+                    if "]" in line:
+                        table_name, column_names = self.parse_aux_header(header)
+                        header = None
+                        block_counts[table_name] = block_counts.get(table_name, 0) + 1
+                        wanted = table_names is None or table_name in table_names
+                    continue
+
+                if not rows_start:
+                    if line.startswith("DATA"):
+                        header = line
+                        if "]" in line:
+                            table_name, column_names = self.parse_aux_header(header)
+                            header = None
+                            block_counts[table_name] = block_counts.get(table_name, 0) + 1
+                            wanted = table_names is None or table_name in table_names
+                    elif line == "{" and table_name is not None:
+                        rows_start = True
+                    continue
+
+                # inside a DATA block
+                if subdata:
+                    # skip SUBDATA sections (e.g. contingency elements)
+                    if line.startswith("</SUBDATA"):
+                        subdata = False
+                    continue
+                if line.startswith("<SUBDATA"):
+                    subdata = True
+                    continue
+                if line == "}":
+                    # end of the block
+                    if wanted:
+                        yield table_name, block_counts[table_name], column_names, rows
+                    rows = []
+                    rows_start = False
+                    table_name = None
+                    continue
+                if not wanted or not line or line.startswith("//"):
+                    continue
+
+                rows.append(AUX_TOKEN_RE.findall(line))
+                if len(rows) == batch_size:
+                    yield table_name, block_counts[table_name], column_names, rows
+                    rows = []
+
+    def parse_aux_header(self, header):
+        """Internal function to get table name and field list from a DATA header of .aux file
+
+        E.g. header:
+        'DATA (Bus, [BusNum,BusName,BusNomVolt])'
+        returns:
+        ('Bus', ['BusNum', 'BusName', 'BusNomVolt'])
+        """
+        table_name = header[header.index("(") + 1 :].split(",")[0].strip()
+        fields = header[header.index("[") + 1 : header.index("]")].split(",")
+        column_names = [field.strip() for field in fields if field.strip()]
+        return table_name, column_names
+
+    def scan_aux_offsets(self, grid_file_name):
+        """Internal function to find byte offsets of all DATA blocks in .aux file (one pass, binary mode, no tokenizing)
+
+        Required Args:
+            grid_file_name - (str) path to .aux file
+        Returns:
+            index - (list of dict) one dict per DATA block in file order, with keys
+                'table_name', 'block_nr', 'column_names' - as in iter_aux_blocks
+                'header_offset' - byte offset of the DATA line
+                'rows_offset' - byte offset of the first line after '{'
+                'end_offset' - byte offset of the closing '}' line
+        """
+        index = []
+        block_counts = {}
+        header = None
+        block = None
+        rows_start = False
+        subdata = False
+        offset = 0
+
+        with open(grid_file_name, "rb") as f:
+            for raw_line in f:
+                line_offset = offset
+                offset += len(raw_line)
+                line = raw_line.strip()
+
+                if header is not None or (not rows_start and line.startswith(b"DATA")):
+                    if header is None:
+                        header = ""
+                        block = {"header_offset": line_offset}
+                    header += line.decode()
+                    if "]" in header:
+                        block["table_name"], block["column_names"] = self.parse_aux_header(header)
+                        header = None
+                        table_name = block["table_name"]
+                        block_counts[table_name] = block_counts.get(table_name, 0) + 1
+                        block["block_nr"] = block_counts[table_name]
+                    continue
+
+                if not rows_start:
+                    if line == b"{" and block is not None:
+                        block["rows_offset"] = offset
+                        rows_start = True
+                    continue
+
+                # inside a DATA block, a '}' in a SUBDATA section does not close the block
+                if subdata:
+                    if line.startswith(b"</SUBDATA"):
+                        subdata = False
+                elif line.startswith(b"<SUBDATA"):
+                    subdata = True
+                elif line == b"}":
+                    block["end_offset"] = line_offset
+                    index.append(block)
+                    block = None
+                    rows_start = False
+
+        return index
+
+    def index_aux_file(self, grid_file_name):
+        """ function to get byte-offset index of DATA blocks in .aux file (see scan_aux_offsets)
+            the index is built once per file and kept in memory, and in parse cache if cache_dir is given,
+            so later reads of single tables (read_aux_table) seek straight to their block instead of scanning the file
+
+        Required Args:
+            grid_file_name - (str) path to .aux file
+        Returns:
+            index - (list of dict) DATA blocks in file order
+        """
+        stat = os.stat(grid_file_name)
+        memo_key = (os.path.abspath(grid_file_name), stat.st_size, stat.st_mtime_ns)
+        if memo_key in self.aux_indexes:
+            return self.aux_indexes[memo_key]
+
+        index = None
+        if self.cache_dir is not None:
+            key = cache.make_key([grid_file_name], PARSER_VERSION, "index_aux_file", hash_dir=self.cache_dir)
+            index = cache.load_json(self.cache_dir, key, "aux_index")
+
+        if index is None:
+            index = self.scan_aux_offsets(grid_file_name)
+            if self.cache_dir is not None:
+                meta = {"file_names": [os.path.abspath(grid_file_name)], "parser_version": PARSER_VERSION}
+                cache.save_json(self.cache_dir, key, "aux_index", index, meta=meta)
+
+        self.aux_indexes[memo_key] = index
+        return index
+
+    def read_aux_block_rows(self, grid_file_name, block):
+        """Internal function to read rows of one DATA block of .aux file, seeking to its byte offsets (see index_aux_file)
+
+        Required Args:
+            grid_file_name - (str) path to .aux file
+            block - (dict) entry of index_aux_file
+        Returns:
+            rows - (list of lists of str) as in iter_aux_blocks
+        """
+        with open(grid_file_name, "rb") as f:
+            f.seek(block["rows_offset"])
+            data = f.read(block["end_offset"] - block["rows_offset"])
+
+        rows = []
+        subdata = False
+        # decode the same way open() in text mode does
+        for line in io.TextIOWrapper(io.BytesIO(data)):
+            line = line.strip()
+            if subdata:
+                if line.startswith("</SUBDATA"):
+                    subdata = False
+                continue
+            if line.startswith("<SUBDATA"):
+                subdata = True
+                continue
+            if not line or line.startswith("//"):
+                continue
+            rows.append(AUX_TOKEN_RE.findall(line))
+
+        return rows
+
+    def read_aux_blocks(self, grid_file_name, table_names=None):
+        """ function to read DATA blocks from TAMU grid .aux file in one pass
+        
+        Required Args:
+            grid_file_name - (str) path to .aux file
+        Optional Args:
+            table_names - (list of str) tables to read (e.g. ['Bus', 'Gen']), default None reads all tables
+        Returns:
+            blocks - (dict) table_name -> list of blocks (in file order), 
+                each block is a dict with keys 'column_names' and 'rows' (as yielded by iter_aux_blocks)
+        """
+        blocks = {}
+        for table_name, block_nr, column_names, rows in self.iter_aux_blocks(
+            grid_file_name, table_names=table_names
+        ):
+            table_blocks = blocks.setdefault(table_name, [])
+            if len(table_blocks) < block_nr:
+                table_blocks.append({"column_names": column_names, "rows": []})
+            table_blocks[block_nr - 1]["rows"].extend(rows)
+
+        return blocks
+
     def read_bus_table(self, grid_file_name):
         """ function to read Bus table from TAMU grid .aux file
         
@@ -75,63 +378,28 @@ class Parser(object):
         Returns:
             pandas DataFrame with columns: BusNum, Latitude, Longitude, Zone, 
             
-        Modify source to add other columns.
+        Modify source (make_bus_df) to add other columns.
         """
 
-        table_name = "Bus"
-        # when reading .aux end line string is different for different versions of Python
-        if sys.version_info[0] == 2:
-            end_line_str = "\r\n"
-        elif sys.version_info[0] == 3:
-            end_line_str = "\n"
-
-        with open(grid_file_name) as f:
-            lines = f.readlines()
-            # reads all lines in a file at once, for large files can cause memory problems
-            # f.readline() reads just one line at a time
-
-        # df = pd.DataFrame()
-        table_start = False
-        rows_start = False
-        rows = []
-
-        for n, line in enumerate(lines):
-            words = line.split(" ")
-            if words[0] == "DATA" and words[1][1:-1] == table_name:
-                # new table table_name starts
-                table_start = True
-                continue
-            if table_start and line == "{" + end_line_str:
+        blocks = self.read_aux_blocks(grid_file_name, table_names=["Bus"])
 
-                rows_start = True
-                continue
-            if rows_start and line != "}" + end_line_str:
-                line = self.remove_spaces_between_quotes(line)
-                line = line.replace(end_line_str, "")
-                row = line.split()
-                # this is where you pick what columns you want (and set their types)
-                try:
-                    rows.append(
-                        {
-                            "BusNum": int(row[0]),
-                            "BusName": row[1][1:-1],
-                            "Latitude": float(row[14]),
-                            "Longitude": float(row[15]),
-                            "Zone": int(row[10]),
-                        }
-                    )
-                except Exception as e:
-                    print("data conversion error: " + str(e))
-                    break
+        return self.make_bus_df(blocks)
 
-            elif rows_start and line == "}" + end_line_str:
-                break
+    def make_bus_df(self, blocks):
+        """ function to make Bus table from .aux blocks (as returned by read_aux_blocks)
+        
+        Required Args:
+            blocks - (dict) .aux blocks, must contain 'Bus'
+        Returns:
+            pandas DataFrame with columns: BusNum, BusName, Latitude, Longitude, Zone, 
+            
+        Modify AUX_BUS_FIELDS to add other columns.
+        """
 
-        # create df out of a list of dicts
-        df = pd.DataFrame(rows)
+        df = self.make_aux_df(blocks, "Bus", fields=self.AUX_BUS_FIELDS)
 
-        if df.empty:
-            print("dataframe empty, try another end_line_str")
+        # plain strings (not categorical) so that names can be concatenated and merged
+        df["BusName"] = df["BusName"].astype(str)
 
         return df
 
@@ -143,73 +411,102 @@ class Parser(object):
         Returns:
             pandas DataFrame with columns: BusNum, GenMWMax, GenMWMin, GenWindPowerFactor, GenFuelType
             
-        Modify source to add other columns.
+        Modify source (make_gen_df) to add other columns.
         """
 
         # file_name = "../grids/ACTIVSg200/ACTIVSg200.aux"
         # file_name = "../grids/ACTIVSg2000/ACTIVSg2000.aux"
-        table_name = "Gen"
+        blocks = self.read_aux_blocks(grid_file_name, table_names=["Gen"])
 
-        # when reading .aux end line string is different for different versions of Python
+        return self.make_gen_df(blocks)
 
-        if sys.version_info[0] == 2:
-            end_line_str = "\r\n"
-        elif sys.version_info[0] == 3:
-            end_line_str = "\n"
+    def make_gen_df(self, blocks):
+        """ function to make Gen table from .aux blocks (as returned by read_aux_blocks)
+        
+        Required Args:
+            blocks - (dict) .aux blocks, must contain 'Gen'
+        Returns:
+            pandas DataFrame with columns: BusNum, GenID, GenMWMax, GenMWMin, GenWindPowerFactor, GenFuelType
+            
+        Modify AUX_GEN_FIELDS to add other columns.
+        """
 
-        with open(grid_file_name) as f:
-            lines = f.readlines()
+        df = self.make_aux_df(blocks, "Gen", fields=self.AUX_GEN_FIELDS)
 
-        # this is tricky, at first lines ended with \r\n, now it is just \n (maybe because I saved it with text editor??)
-        # end_line_str = '\r\n'
-        end_line_str = "\n"
+        # GenID is quoted in .aux files, but it is a number
+        df["GenID"] = df["GenID"].astype(str).astype(int)
+        # plain strings (not categorical) so that GenUID can be made out of it
+        df["GenFuelType"] = df["GenFuelType"].astype(str)
 
-        # df = pd.DataFrame()
-        table_start = False
-        rows_start = False
-        rows = []
+        return df
 
-        for n, line in enumerate(lines):
-            words = line.split(" ")
-            if words[0] == "DATA" and words[1][1:-1] == table_name:
-                # new table table_name starts
-                table_start = True
-                # column_names = words[2]
-                continue
-            if table_start and line == "{" + end_line_str:
-                rows_start = True
-                continue
-            if rows_start and line != "}" + end_line_str:
-                line = self.remove_spaces_between_quotes(line)
-                line = line.replace(end_line_str, "")
-                row = line.split()
-                # this is where you pick what columns you want (and set their types)
-                try:
-                    rows.append(
-                        {
-                            "BusNum": int(row[0]),
-                            "GenID": int(row[1][1:-1]),
-                            "GenMWMax": float(row[9]),
-                            "GenMWMin": float(row[10]),
-                            "GenWindPowerFactor": float(row[18]),
-                            "GenFuelType": row[56][1:-1],
-                        }
-                    )
-                except Exception as e:
-                    print("data conversion error: " + str(e))
-                    print("line nr = {}".format(n))
-                    print(row[0])
-                    break
+    def make_aux_df(self, blocks, table_name, block_nr=1, fields=None):
+        """ function to make a typed DataFrame out of a .aux block (as returned by read_aux_blocks)
+            columns are found by name in the DATA header field list, so the order of fields in the file does not matter
+        
+        Required Args:
+            blocks - (dict) .aux blocks
+            table_name - (str) e.g. 'Bus', 'Gen', 'Branch'
+        Optional Args:
+            block_nr - (int) which block of table_name to take (e.g. 2 for second Branch table), default 1
+            fields - (dict) new column name -> .aux field name, default None takes all fields as they are named in .aux
+        Returns:
+            df - (pd.DataFrame) with typed columns (see aux_column_to_array)
+        """
 
-            elif rows_start and line == "}" + end_line_str:
-                break
+        table_blocks = blocks.get(table_name, [])
+        if len(table_blocks) < block_nr:
+            raise ValueError(
+                "No table: {} (block {}) in .aux blocks".format(table_name, block_nr)
+            )
+        column_names = table_blocks[block_nr - 1]["column_names"]
+        rows = table_blocks[block_nr - 1]["rows"]
+
+        if fields is None:
+            fields = dict(zip(column_names, column_names))
+
+        positions = {name: i for i, name in enumerate(column_names)}
+        missing = [field for field in fields.values() if field not in positions]
+        if missing:
+            raise ValueError(
+                "No field(s): {} in {} table header".format(missing, table_name)
+            )
+
+        # transpose rows to columns (rows with missing trailing fields are padded with "")
+        columns = list(itertools.zip_longest(*rows, fillvalue=""))
+
+        data = {}
+        for new_name, field in fields.items():
+            i = positions[field]
+            values = columns[i] if i < len(columns) else ()
+            data[new_name] = self.aux_column_to_array(values)
+
+        return pd.DataFrame(data, columns=list(fields.keys()))
+
+    def aux_column_to_array(self, values):
+        """Internal function to turn one column of .aux fields into a typed array
+        
+        Required Args:
+            values - (sequence of str) fields as tokenized by AUX_TOKEN_RE
+        Returns:
+            np.ndarray of int64 or float64 for unquoted numeric fields, 
+            pd.Categorical of strings for quoted fields (quotes and spaces between them removed, as in remove_spaces_between_quotes)
+        """
 
-        df = pd.DataFrame(rows)
+        if len(values) == 0:
+            return np.array([], dtype=np.float64)
 
-        if df.empty:
-            print("dataframe empty, try another end_line_str")
+        if values[0][:1] == '"':
+            return pd.Categorical([value[1:-1].replace(" ", "") for value in values])
 
-        return df
+        try:
+            return np.array(values, dtype=np.int64)
+        except ValueError:
+            pass
+        try:
+            return np.array(values, dtype=np.float64)
+        except ValueError:
+            return pd.Categorical(values)
 
     def parse_tamu_aux(self, aux_file_name):
         """ function to parse TAMU grid .aux files
@@ -220,15 +517,23 @@ class Parser(object):
             gen_df (pandas DataFrame) with columns: GenUID, BusNum, GenFuelType, GenMWMax, GenMWMin, GenID, BusName, Latitude, Longitude 
             wind_gen_df (pandas DataFrame) with columns: GenUID(index), BusNum, GenFuelType, GenMWMax, GenMWMin, GenID, BusName, Latitude, Longitude 
 
-        Modify source if other columns are needed
+        Modify source if other columns are needed (and bump PARSER_VERSION)
         """
         # print('parsing {}\n'.format(aux_file_name))
 
-        # read Bus table
-        bus_df = self.read_bus_table(aux_file_name)
+        names = ["bus_df", "gen_df", "wind_gen_df"]
+        key, frames = self.load_cached([aux_file_name], names, "parse_tamu_aux")
+        if frames is not None:
+            return tuple(frames)
+
+        # read Bus and Gen tables in one pass over the file
+        blocks = self.read_aux_blocks(aux_file_name, table_names=["Bus", "Gen"])
+
+        # Bus table
+        bus_df = self.make_bus_df(blocks)
 
-        # read Gen table
-        gen_df = self.read_gen_table(aux_file_name)
+        # Gen table
+        gen_df = self.make_gen_df(blocks)
 
         # create unique generator ID (GenUID) column
         gen_df["GenUID"] = (
@@ -265,6 +570,10 @@ class Parser(object):
 
         # print('Done.')
 
+        self.save_cached(
+            key, [aux_file_name], dict(zip(names, [bus_df, new_gen_df, wind_gen_df]))
+        )
+
         return bus_df, new_gen_df, wind_gen_df
 
     def parse_rts_csvs(self, bus_csv_file_name, gen_csv_file_name, solar2wind=False):
@@ -282,6 +591,14 @@ class Parser(object):
 
         # print('parsing files: {}, {}\n'.format(bus_csv_file_name, gen_csv_file_name))
 
+        file_names = [bus_csv_file_name, gen_csv_file_name]
+        names = ["bus_df", "gen_df", "wind_gen_df"]
+        key, frames = self.load_cached(
+            file_names, names, "parse_rts_csvs", "solar2wind={}".format(solar2wind)
+        )
+        if frames is not None:
+            return tuple(frames)
+
         # read original bus.csv, take what you need, drop the rest, and rename columns to match TAMU convention
         bus_df = pd.read_csv(bus_csv_file_name)
 
@@ -326,8 +643,47 @@ class Parser(object):
         wind_gen_df.reset_index(inplace=True)
         bus_df.reset_index(inplace=True)
 
+        self.save_cached(key, file_names, dict(zip(names, [bus_df, gen_df, wind_gen_df])))
+
         return bus_df, gen_df, wind_gen_df
 
+    def parse_rts_timeseries(self, csv_file_names):
+        """ function to parse RTS-GMLC generator time series .csv files, e.g. REAL_TIME_wind.csv, REAL_TIME_pv.csv, REAL_TIME_rtpv.csv from
+            https://github.com/GridMod/RTS-GMLC/tree/master/RTS_Data/timeseries_data_files
+            
+        Required Args:
+            csv_file_names - (list of str) paths to time series .csv files 
+                with columns Year, Month, Day, Period followed by one column per GEN UID (power in MW)
+        Returns:
+            timeseries_df - (pd.DataFrame) power of all generators in all files (GenUID columns), 
+                indexed by Timestamp (IssueTime), period length is a day over number of periods (5 min for REAL_TIME files)
+                RTS-GMLC time series have no time zone, they are labeled utc to match WTK data
+
+        """
+        file_names = list(csv_file_names)
+        names = ["timeseries_df"]
+        key, frames = self.load_cached(file_names, names, "parse_rts_timeseries")
+        if frames is not None:
+            return frames[0].set_index("IssueTime")
+
+        timeseries_dfs = []
+        for csv_file_name in file_names:
+            df = pd.read_csv(csv_file_name)
+            dates = pd.to_datetime(df[["Year", "Month", "Day"]])
+            period_length = pd.Timedelta("1D") / df["Period"].max()
+            df.index = pd.DatetimeIndex(
+                dates + (df["Period"] - 1) * period_length, name="IssueTime"
+            ).tz_localize("utc")
+            timeseries_dfs.append(
+                df.drop(["Year", "Month", "Day", "Period"], axis=1).astype("float64")
+            )
+
+        timeseries_df = pd.concat(timeseries_dfs, axis=1)
+        timeseries_df.columns = timeseries_df.columns.astype(str)
+
+        self.save_cached(key, file_names, {"timeseries_df": timeseries_df.reset_index()})
+
+        return timeseries_df
 
 
 
@@ -342,6 +698,108 @@ class Parser(object):
     #         1       0       CT_TAREALOAD    3       CT_LOAD_ALL_P   CT_REP  144.2;
     #         1       0       CT_TAREALOAD    4       CT_LOAD_ALL_P   CT_REP  204.5;
 
+    def read_m_blocks(self, filename, table_names=None):
+        """ function to find matrix (name = [ ... ];) and series (name = { ... };) blocks in .m files in one pass
+            file is read line by line, only lines of wanted blocks are kept, reading stops once all wanted blocks are found
+        Required Args:
+            filename - (str) path to .m file
+        Optional Args:
+            table_names - (list of str) names of blocks (e.g. ['mpc.bus', 'mpc.gen', 'mpc.branch', 'mpc.genfuel']), 
+                default None keeps all blocks
+        Returns:
+            blocks - (dict) name -> list of lines (str) between opening and closing line
+        """
+
+        if table_names is not None:
+            table_names = set(table_names)
+
+        blocks = {}
+        block_lines = None
+        block_end = None
+
+        with open(filename) as f:
+            for line in f:
+                if block_lines is None:
+                    # look for "name = [" or "name = {"
+                    stripped = line.strip()
+                    if stripped.endswith("= [") or stripped.endswith("= {"):
+                        name = stripped[:-1].rstrip(" =")
+                        if table_names is None or name in table_names:
+                            block_lines = []
+                            block_end = "];" if stripped[-1] == "[" else "};"
+                    continue
+
+                if line.strip() == block_end:
+                    blocks[name] = block_lines
+                    block_lines = None
+                    if table_names is not None and table_names.issubset(blocks):
+                        break
+                    continue
+
+                block_lines.append(line)
+
+        return blocks
+
+    def make_m_df(self, blocks, table_name, column_names=None, numeric_columns=None):
+        """ function to make DataFrame out of a matrix block of .m file (as returned by read_m_blocks)
+            the whole block is parsed at once by pandas C tokenizer (no dict per row), numeric columns go straight
+            into int64 (if all values are written as integers) or float64 arrays
+        Required Args:
+            blocks - (dict) .m blocks
+            table_name - (str) name of the table in .m file before equals sign (e.g. 'chgtab', 'mpc.bus', etc)
+            column_names - (list of strings) column names as in .m file (e.g. ['label', 'prob', 'table', 'row', 'col', 'chgtype', 'newval'])
+            numeric_columns (list of strings) a subset of column_names that have numeric types (e.g. numeric_columns = ['label', 'prob', 'row', 'newval'])
+
+        Returns:
+            data_df - (pandas.DataFrame) 
+        """
+        if table_name not in blocks:
+            raise ValueError("No table: " + table_name + " in .m blocks")
+
+        # non-numeric columns are kept as strings, numeric ones are converted by the tokenizer itself
+        dtype = {
+            i: str
+            for i, column_name in enumerate(column_names)
+            if column_name not in numeric_columns
+        }
+
+        # row separators (;) and comments (%) are dropped, fields are separated by whitespace
+        data_df = pd.read_csv(
+            io.StringIO("".join(blocks[table_name]).replace(";", "\n")),
+            sep=r"\s+",
+            header=None,
+            comment="%",
+            dtype=dtype,
+            skip_blank_lines=True,
+        )
+
+        # take only known columns (missing trailing columns are filled with NaN)
+        data_df = data_df.iloc[:, : len(column_names)]
+        data_df.columns = column_names[: data_df.shape[1]]
+        data_df = data_df.reindex(columns=column_names)
+
+        # numeric columns that the tokenizer could not convert (e.g. Inf, NaN written in other ways)
+        for column_name in numeric_columns:
+            if not pd.api.types.is_numeric_dtype(data_df[column_name]):
+                data_df[column_name] = pd.to_numeric(data_df[column_name])
+
+        return data_df
+
+    def make_m_series(self, blocks, series_name):
+        """ function to make Series out of a series block of .m file (as returned by read_m_blocks), e.g. mpc.genfuel
+        Required Args:
+            blocks - (dict) .m blocks
+            series_name - (str) name of the series in .m file before equals sign
+        Returns:
+            data_s - (pandas.Series) 
+        """
+        if series_name not in blocks:
+            raise ValueError("No table: " + series_name + " in .m blocks")
+
+        rows = [line.strip().rstrip(";").strip("'") for line in blocks[series_name]]
+
+        return pd.Series(rows,)
+
     def read_m_table(
         self, filename, table_name=None, column_names=None, numeric_columns=None
     ):
@@ -355,39 +813,19 @@ class Parser(object):
         Returns:
             data_df - (pandas.DataFrame) 
         
+        To read several tables from the same file use read_m_blocks and make_m_df (one pass over the file).
         """
-        with open(filename) as f:
-            lines = f.readlines()
-            # reads all lines in a file at once, for large files can cause memory problems
-            # f.readline() reads just one line at a time
+        blocks = self.read_m_blocks(filename, table_names=[table_name])
 
-        # df = pd.DataFrame()
-        table_start = False
-        rows_start = False
-        rows = []
-
-        for n, line in enumerate(lines):
-            if line == table_name + " = [\n":
-                # print("table start")
-                table_start = True
-                continue
-            if table_start and line != "];\n":
-                words = line[1:].replace(";\n", "").split("\t")
-                data = dict(zip(column_names, words))
-                rows.append(data)
-            elif table_start and line == "];\n":
-                break
-
-        if not table_start:
+        if table_name not in blocks:
             raise ValueError("No table: " + table_name + " in file: " + filename)
 
-        data_df = pd.DataFrame(rows, columns=column_names)
-
-        # change selected columns to numeric values (int or float)
-        for column_name in numeric_columns:
-            data_df[column_name] = pd.to_numeric(data_df[column_name])
-
-        return data_df
+        return self.make_m_df(
+            blocks,
+            table_name,
+            column_names=column_names,
+            numeric_columns=numeric_columns,
+        )
 
     def read_m_series(
         self, filename, series_name=None,
@@ -396,45 +834,17 @@ class Parser(object):
             mpc.gentype, mpc.genfuel, and mpc.bus_name are given separately (because those are not numeric columns?) 
         Required Args:
             filename - (str) path to .m file
-            table_name - (str) name of the table in .m file before equals sign (e.g. 'mpc.gentype', 'mpc.bus_name', or mpc.genfuel)
+            series_name - (str) name of the series in .m file before equals sign (e.g. 'mpc.gentype', 'mpc.bus_name', or mpc.genfuel)
         Returns:
             data_s - (pandas.Series) 
 
         """
-        with open(filename) as f:
-            lines = f.readlines()
-            # reads all lines in a file at once, for large files can cause memory problems
-            # f.readline() reads just one line at a time
+        blocks = self.read_m_blocks(filename, table_names=[series_name])
 
-        # df = pd.DataFrame()
-        series_start = False
-        rows = []
+        if series_name not in blocks:
+            raise ValueError("No table: " + series_name + " in file: " + filename)
 
-        for n, line in enumerate(lines):
-            if line == series_name + " = {\n":
-                # print("table start")
-                series_start = True
-                continue
-            if series_start and line != "};\n":
-                # print(n)
-                # print(line)
-                word = word = line.replace("\t'", "").replace("';\n", "")
-                # print(word)
-                rows.append(word)
-            # if n==718: break
-            elif series_start and line == "};\n":
-                break
-
-        if not series_start:
-            raise ValueError("No table: " + table_name + " in file: " + filename)
-
-        data_s = pd.Series(rows,)
-
-        #     # change selected columns to numeric values (int or float)
-        #     for column_name in numeric_columns:
-        #         data_df[column_name] = pd.to_numeric(data_df[column_name])
-
-        return data_s
+        return self.make_m_series(blocks, series_name)
 
     def parse_tamu_m(self, case_m_file=None, scenarios_m_file=None):
         """parse_tamu_m parses TAMU grid's .m files and returns all atables as dataframes
@@ -445,6 +855,11 @@ class Parser(object):
             bus_df, gen_df, branch_df, chgtab_df - (pd.DataFrame) buses, generators, branches, and change table (load profiles by zone)
         """
 
+        # find bus, gen, and branch tables in case_m_file in one pass
+        case_blocks = self.read_m_blocks(
+            case_m_file, table_names=["mpc.bus", "mpc.gen", "mpc.branch"]
+        )
+
         # read bus table from case_m_file
         table_name = "mpc.bus"
         column_names = [
@@ -468,9 +883,9 @@ class Parser(object):
         ]
         # this table is entirely numeric
         numeric_columns = column_names
-        bus_df = self.read_m_table(
-            case_m_file,
-            table_name=table_name,
+        bus_df = self.make_m_df(
+            case_blocks,
+            table_name,
             column_names=column_names,
             numeric_columns=numeric_columns,
         )
@@ -507,9 +922,9 @@ class Parser(object):
         # this table is entirely numeric
         numeric_columns = column_names
 
-        gen_df = self.read_m_table(
-            case_m_file,
-            table_name=table_name,
+        gen_df = self.make_m_df(
+            case_blocks,
+            table_name,
             column_names=column_names,
             numeric_columns=numeric_columns,
         )
@@ -543,9 +958,9 @@ class Parser(object):
         # this table is entirely numeric
         numeric_columns = column_names
 
-        branch_df = self.read_m_table(
-            case_m_file,
-            table_name=table_name,
+        branch_df = self.make_m_df(
+            case_blocks,
+            table_name,
             column_names=column_names,
             numeric_columns=numeric_columns,
         )
@@ -567,7 +982,7 @@ class Parser(object):
 
     #####################################################################
     def parse_tamu_load_csv(
-        self, filename, **kwargs,
+        self, filename, start=None, end=None, chunksize=1000, mmap_file=None, **kwargs,
     ):
         """
         Parse TAMU load .csv files: TAMU 2K and above have power timeseries (real and reactive power)
@@ -575,14 +990,30 @@ class Parser(object):
         Required Args:
             filename - (str) path to .csv file
             e.g. filename = "../grids-data/ACTIVSg2000/ACTIVISg2000_load_time_series_MVAR.csv"
+        Optional Args:
+            start - (pd.Timestamp) start of wanted window, default None is start of the file
+            end - (pd.Timestamp) end of wanted window, default None is end of the file
+            chunksize - (int) number of .csv rows parsed at once
+            mmap_file - (str) if given, 5 min values are written to this file as a memory-mapped float64 array 
+                of shape (number of timestamps, number of buses), returned df is backed by it
         Returns:
-            df - (pandas.DataFrame) a year of load timeseries, linearly interpolated every 5 min and aggregated by bus
+            df - (pandas.DataFrame) load timeseries in [start, end], linearly interpolated every 5 min and aggregated by bus
+
+        Only rows needed for the window (plus one on each side for interpolation) are parsed, 
+        e.g. for a week of 5 min load:
+            df = parser.parse_tamu_load_csv(filename, start=pd.Timestamp("2016-07-01 00:00:00"), end=pd.Timestamp("2016-07-07 23:55:00"))
         """
-        # read .csv, parse date and time columns, combine to one
-        df = pd.read_csv(filename, skiprows=1, parse_dates={"DateTime": [0, 1]})
 
-        # set index as DateTime column
-        df.set_index("DateTime", inplace=True)
+        # header is the second line, first is the title
+        with open(filename) as f:
+            f.readline()
+            column_names = next(csv.reader([f.readline()]))
+            # scan only date and time columns to find rows of the window
+            date_times = [line.split(",", 2)[:2] for line in f]
+        date_times = pd.DatetimeIndex(
+            pd.to_datetime([date + " " + time for date, time in date_times]),
+            name="DateTime",
+        )
 
         # not sure about this????
         # # localize to UTC
@@ -592,343 +1023,204 @@ class Parser(object):
         # Total MW Load - we can always sum all columns
         # Total Mvar Load - all zeroes, Mvar load is in different file
         # df["Num Load"].unique() -> 1350 # "Num Load" has just one value of 1350 that repeats for all rows - redundant!
-        df.drop(["Total MW Load", "Total Mvar Load", "Num Load"], axis=1, inplace=True)
-        # rename columns: "Bus 1001 #1 MW" -> 1001
-        old_names = df.columns.to_list()
-        # old_names
-        new_names = [x.split(" ")[1] for x in old_names]
-        # new_names
-        rename_dict = dict(zip(old_names, new_names))
-        df.rename(columns=rename_dict, inplace=True)
-        df.head()
-
-        # add columns with the same bus #, i.e. aggregate load by bus
-        df = df.groupby(lambda x: x, axis=1).sum()
-
-        # interpolate linearly every five min
-        df_resampled = df.resample("5min").interpolate("linear")
-
-        ## this should be done outside
-        #         # take just select timestamps
-        #         start_of_data = pd.Timestamp("2016-07-01 00:00:00")
-        #         end_of_data = pd.Timestamp("2016-07-07 23:55:00")
-        #        df_part = df_resampled.loc[start_of_data:end_of_data].copy()
+        # load columns: "Bus 1001 #1 MW" -> 1001
+        load_positions = [
+            i
+            for i, name in enumerate(column_names)
+            if i > 1 and name not in ["Total MW Load", "Total Mvar Load", "Num Load"]
+        ]
+        load_buses = [column_names[i].split(" ")[1] for i in load_positions]
+
+        # column to bus mapping: columns sorted by bus, so that columns with the same bus # are contiguous and can be summed at once
+        buses, bus_codes = np.unique(load_buses, return_inverse=True)
+        bus_order = np.argsort(bus_codes, kind="stable")
+        bus_starts = np.flatnonzero(np.r_[True, np.diff(bus_codes[bus_order]) != 0])
+
+        # rows of the window, plus one before start and one after end for interpolation
+        first_row = 0
+        last_row = len(date_times) - 1
+        if start is not None:
+            first_row = max(date_times.searchsorted(start, side="right") - 1, 0)
+        if end is not None:
+            last_row = min(date_times.searchsorted(end, side="left"), last_row)
+        if len(date_times) == 0 or last_row < first_row:
+            raise ValueError(
+                "No load data between {} and {} in file: {}".format(start, end, filename)
+            )
+
+        # read needed rows in chunks and add columns with the same bus #, i.e. aggregate load by bus
+        bus_loads = []
+        reader = pd.read_csv(
+            filename,
+            skiprows=2 + first_row,
+            nrows=last_row - first_row + 1,
+            header=None,
+            usecols=load_positions,
+            dtype=np.float64,
+            chunksize=chunksize,
+        )
+        for chunk in reader:
+            values = chunk.values[:, bus_order]
+            bus_loads.append(np.add.reduceat(values, bus_starts, axis=1))
+        bus_loads = np.concatenate(bus_loads)
+        hours = date_times[first_row : last_row + 1]
+
+        # interpolate linearly every five min, only in the window
+        window_start = hours[0].ceil("5min")
+        window_end = hours[-1].floor("5min")
+        if start is not None:
+            window_start = max(window_start, start.ceil("5min"))
+        if end is not None:
+            window_end = min(window_end, end)
+        index = pd.date_range(window_start, window_end, freq="5min", name="DateTime")
+
+        if mmap_file is None:
+            out = np.empty((len(index), len(buses)))
+        else:
+            out = np.memmap(mmap_file, dtype=np.float64, mode="w+", shape=(len(index), len(buses)))
+
+        # both as ns (units of DatetimeIndexes may differ, e.g. us and s, with pandas 2+)
+        hours_ns = np.asarray(hours.values, dtype="datetime64[ns]").view(np.int64)
+        index_ns = np.asarray(index.values, dtype="datetime64[ns]").view(np.int64)
+        for block_start in range(0, len(index), 100000):
+            t = index_ns[block_start : block_start + 100000]
+            left = np.clip(hours_ns.searchsorted(t, side="right") - 1, 0, len(hours) - 1)
+            right = np.minimum(left + 1, len(hours) - 1)
+            span = (hours_ns[right] - hours_ns[left]).astype(np.float64)
+            weight = np.divide(
+                (t - hours_ns[left]).astype(np.float64), span, out=np.zeros_like(span), where=span > 0
+            )[:, None]
+            out[block_start : block_start + len(t)] = (
+                bus_loads[left] + weight * (bus_loads[right] - bus_loads[left])
+            )
+
+        if mmap_file is not None:
+            out.flush()
+
+        df_resampled = pd.DataFrame(out, index=index, columns=list(buses), copy=False)
 
         return df_resampled
 
     # read any table from .aux file
-    def read_aux_table(self, grid_file_name, table_name="Bus", branch_nr=1, **kwargs):
+    def read_aux_table(self, grid_file_name, table_name="Bus", branch_nr=1, use_index=True, **kwargs):
         """ function to read table from TAMU grid .aux file
         
         Required Args:
             grid_file_name - (str) path to .aux file
-            table_name - (str) one of the following: 'Bus', 'Gen', 'Branch'
-            brsnch_nr - (int)  branch table number: 1 or 2 (there are 2 Branch tables: lines and transformers)
+            table_name - (str) any table in .aux file, e.g. 'Bus', 'Gen', 'Load', 'Branch'
+            branch_nr - (int)  branch table number: 1 or 2 (there are 2 Branch tables: lines and transformers),
+                ignored for other tables
+        Optional Args:
+            use_index - (bool) if True (default) seek straight to the table using byte-offset index of the file
+                (built on first call, see index_aux_file), if False stream the file up to the table
         Returns:
-            table_df - (pd.DataFrame) table with all available columns in .aux file
+            table_df - (pd.DataFrame) table with all available columns in .aux file, named as in the DATA header
+                numeric columns are int64/float64, quoted columns are categorical strings
             
         """
-        if table_name == "Bus":
-            all_cols = [
-                "BusNum",
-                "BusName",
-                "BusNomVolt",
-                "BusSlack",
-                "BusB:1",
-                "BusG:1",
-                "BusPUVolt",
-                "BusAngle",
-                "DCLossMultiplier",
-                "AreaNum",
-                "ZoneNum",
-                "BANumber",
-                "OwnerNum",
-                "SubNum",
-                "Latitude:1",
-                "Longitude:1",
-                "BusMonEle",
-                "LSName",
-                "BusVoltLim",
-                "BusVoltLimLow:1",
-                "BusVoltLimLow:2",
-                "BusVoltLimLow:3",
-                "BusVoltLimLow:4",
-                "BusVoltLimHigh:1",
-                "BusVoltLimHigh:2",
-                "BusVoltLimHigh:3",
-                "BusVoltLimHigh:4",
-                "Latitude",
-                "Longitude",
-                "TopologyBusType",
-                "Priority",
-                "EMSType",
-                "EMSDeviceID",
-                "DataMaintainerAssign",
-                "AllLabels",
-                "GICConductance",
-            ]
-        elif table_name == "Gen":
-            all_cols = [
-                "BusNum",
-                "GenID",
-                "GenStatus",
-                "GenVoltSet",
-                "GenRegNum",
-                "GenRMPCT",
-                "GenAGCAble",
-                "GenParFac",
-                "GenMWSetPoint",
-                "GenMWMax",
-                "GenMWMin",
-                "GenEnforceMWLimits",
-                "GenAVRAble",
-                "GenMvrSetPoint",
-                "GenMVRMax",
-                "GenMVRMin",
-                "GenUseCapCurve",
-                "GenWindControlMode",
-                "GenWindPowerFactor",
-                "GenUseLDCRCC",
-                "GenRLDCRCC",
-                "GenXLDCRCC",
-                "GenMVABase",
-                "GenZR",
-                "GenZX",
-                "GenStepR",
-                "GenStepX",
-                "GenStepTap",
-                "TSGovRespLimit",
-                "GenUnitType:1",
-                "AreaNum",
-                "ZoneNum",
-                "BANumber",
-                "OwnerNum",
-                "OwnPercent",
-                "OwnerNum:1",
-                "OwnPercent:1",
-                "OwnerNum:2",
-                "OwnPercent:2",
-                "OwnerNum:3",
-                "OwnPercent:3",
-                "OwnerNum:4",
-                "OwnPercent:4",
-                "OwnerNum:5",
-                "OwnPercent:5",
-                "OwnerNum:6",
-                "OwnPercent:6",
-                "OwnerNum:7",
-                "OwnPercent:7",
-                "EMSType",
-                "EMSDeviceID",
-                "DataMaintainerAssign",
-                "AllLabels",
-                "GenUnitType",
-                "GenTotalFixedCosts",
-                "GenCostModel",
-                "GenFuelType",
-                "GenFuelCost",
-                "GenFixedCost",
-                "GenIOD",
-                "GenIOC",
-                "GenIOB",
-            ]
-        elif table_name == "Branch" and branch_nr == 1:
-            all_cols = [
-                "BusNum",
-                "BusNum:1",
-                "LineCircuit",
-                "BranchDeviceType",
-                "ConsolidateBranch",
-                "LineStatus",
-                "NormLineStatus",
-                "SeriesCapStatus",
-                "LineMeter:1",
-                "LineR",
-                "LineX",
-                "LineC",
-                "LineG",
-                "LineLength",
-                "LineMonEle",
-                "LSName",
-                "LineAMVA",
-                "LineAMVA:1",
-                "LineAMVA:2",
-                "LineAMVA:3",
-                "LineAMVA:4",
-                "LineAMVA:5",
-                "LineAMVA:6",
-                "LineAMVA:7",
-                "LineAMVA:8",
-                "LineAMVA:9",
-                "LineAMVA:10",
-                "LineAMVA:11",
-                "LineAMVA:12",
-                "LineAMVA:13",
-                "LineAMVA:14",
-                "OwnerNum",
-                "OwnPercent",
-                "OwnerNum:1",
-                "OwnPercent:1",
-                "OwnerNum:2",
-                "OwnPercent:2",
-                "OwnerNum:3",
-                "OwnPercent:3",
-                "OwnerNum:4",
-                "OwnPercent:4",
-                "OwnerNum:5",
-                "OwnPercent:5",
-                "OwnerNum:6",
-                "OwnPercent:6",
-                "OwnerNum:7",
-                "OwnPercent:7",
-                "EMSType",
-                "EMSDeviceID",
-                "EMSDeviceID:1",
-                "EMSType:1",
-                "EMSDeviceID:2",
-                "EMSDeviceID:3",
-                "DataMaintainerAssign",
-                "AllLabels",
-            ]
-        elif table_name == "Branch" and branch_nr == 2:
-            all_cols = [
-                "BusNum",
-                "BusNum:1",
-                "LineCircuit",
-                "BranchDeviceType",
-                "LineStatus",
-                "NormLineStatus",
-                "SeriesCapStatus",
-                "LineMeter:1",
-                "LineXFType",
-                "XFAuto",
-                "XFRegBus",
-                "XFUseLDCRCC",
-                "XFRLDCRCC",
-                "XFXLDCRCC",
-                "XFRegMax",
-                "XFRegMin",
-                "XFRegTargetType",
-                "XFMVABase",
-                "XFNominalKV",
-                "XFNominalKV:1",
-                "LineR:1",
-                "LineX:1",
-                "LineG:1",
-                "LineC:1",
-                "XfrmerMagnetizingG:1",
-                "XfrmerMagnetizingB:1",
-                "XFFixedTap",
-                "XFFixedTap:1",
-                "XFTapMax:1",
-                "XFTapMin:1",
-                "XFStep:1",
-                "LineTap:1",
-                "LinePhase",
-                "XFTableNum",
-                "LineLength",
-                "LineMonEle",
-                "LSName",
-                "LineAMVA",
-                "LineAMVA:1",
-                "LineAMVA:2",
-                "LineAMVA:3",
-                "LineAMVA:4",
-                "LineAMVA:5",
-                "LineAMVA:6",
-                "LineAMVA:7",
-                "LineAMVA:8",
-                "LineAMVA:9",
-                "LineAMVA:10",
-                "LineAMVA:11",
-                "LineAMVA:12",
-                "LineAMVA:13",
-                "LineAMVA:14",
-                "OwnerNum",
-                "OwnPercent",
-                "OwnerNum:1",
-                "OwnPercent:1",
-                "OwnerNum:2",
-                "OwnPercent:2",
-                "OwnerNum:3",
-                "OwnPercent:3",
-                "OwnerNum:4",
-                "OwnPercent:4",
-                "OwnerNum:5",
-                "OwnPercent:5",
-                "OwnerNum:6",
-                "OwnPercent:6",
-                "OwnerNum:7",
-                "OwnPercent:7",
-                "EMSType",
-                "EMSDeviceID",
-                "EMSDeviceID:1",
-                "EMSType:1",
-                "EMSDeviceID:2",
-                "EMSDeviceID:3",
-                "DataMaintainerAssign",
-                "AllLabels",
-            ]
-
-        # when reading .aux end line string is different for different versions of Python
-
-        if sys.version_info[0] == 2:
-            end_line_str = "\r\n"
-        elif sys.version_info[0] == 3:
-            end_line_str = "\n"
-
-        with open(grid_file_name) as f:
-            lines = f.readlines()
-            # reads all lines in a file at once, for large files can cause memory problems
-            # f.readline() reads just one line at a time
-
-        # df = pd.DataFrame()
-        table_start = False
-        rows_start = False
-        # second_branch_table = False
-        rows = []
-
-        for n, line in enumerate(lines):
-            words = line.split(" ")
-
-            #         print(n)
-            #         print(line)
-            #         if n==200:
-            #             return row
-            if words[0] == "DATA" and words[1][1:-1] == table_name:
-                # new table table_name starts
-                if table_name != "Branch" or (
-                    table_name == "Branch" and branch_nr == 1
-                ):
-                    table_start = True
-                    continue
-                elif table_name == "Branch" and branch_nr == 2:
-                    branch_nr = 1
+        blocks = {table_name: []}
+        # branch_nr picks one of the Branch tables, other tables are read from their first DATA block (as before)
+        wanted_block_nr = branch_nr if table_name == "Branch" else 1
+
+        if use_index:
+            for block in self.index_aux_file(grid_file_name):
+                if block["table_name"] == table_name and block["block_nr"] == wanted_block_nr:
+                    rows = self.read_aux_block_rows(grid_file_name, block)
+                    blocks[table_name].append({"column_names": block["column_names"], "rows": rows})
+                    break
+        else:
+            # stream the file and stop as soon as the wanted block (e.g. second Branch table) is read
+            for block_table_name, block_nr, column_names, rows in self.iter_aux_blocks(
+                grid_file_name, table_names=[table_name]
+            ):
+                if block_nr < wanted_block_nr:
                     continue
-
-            if table_start and line == "{" + end_line_str:
-
-                rows_start = True
-                continue
-            if rows_start and line != "}" + end_line_str:
-                line = self.remove_spaces_between_quotes(line)
-                line = line.replace(end_line_str, "")
-                row = line.split()
-                # this is where we take all columns
-                try:
-                    rows.append(dict(zip(all_cols, row)))
-                except Exception as e:
-                    print("data conversion error: " + str(e))
+                if block_nr > wanted_block_nr:
                     break
+                if not blocks[table_name]:
+                    blocks[table_name].append({"column_names": column_names, "rows": []})
+                blocks[table_name][0]["rows"].extend(rows)
 
-            # end reading of the table: for 'Branch' table ending is different
-            elif rows_start and line == "}" + end_line_str:
-                break
+        if not blocks[table_name]:
+            print("dataframe empty, no {} table in .aux file?".format(table_name))
+            return pd.DataFrame()
 
-        # create df out of a list of dicts
-        df = pd.DataFrame(rows)
+        return self.make_aux_df(blocks, table_name)
 
-        if df.empty:
-            print("dataframe empty, try another end_line_str")
+    # parse many grids/files at once
+    def parse_many(self, specs, workers=None):
+        """ function to parse several grid files concurrently in a process pool
+        
+        Required Args:
+            specs - (dict) name -> spec, where spec is a dict with keys:
+                'method' - (str) Parser method, e.g. 'parse_tamu_aux', 'parse_tamu_m', 'parse_rts_csvs', 'parse_tamu_load_csv', 'read_aux_table'
+                'args' - (list) positional arguments of the method (e.g. file names)
+                'kwargs' - (dict) optional keyword arguments of the method (e.g. {'solar2wind': True})
+        Optional Args:
+            workers - (int) number of worker processes, default None uses all cpus, 1 parses in this process
+        Returns:
+            results - (dict) name -> whatever the method returns (e.g. (bus_df, gen_df, wind_gen_df) for parse_tamu_aux)
+        
+        Identical specs (same method and arguments) are parsed only once, biggest files are started first.
+        Workers use the same cache_dir as this parser.
+
+        E.g.:
+            results = parser.parse_many(
+                {
+                    "ACTIVSg200": {"method": "parse_tamu_aux", "args": ["ACTIVSg200/ACTIVSg200.aux"]},
+                    "RTS": {"method": "parse_rts_csvs", "args": ["RTS/bus.csv", "RTS/gen.csv"], "kwargs": {"solar2wind": True}},
+                },
+                workers=8,
+            )
+            bus_df, gen_df, wind_gen_df = results["ACTIVSg200"]
+        """
 
-        return df
+        # unique jobs
+        jobs = {}
+        job_keys = {}
+        for name, spec in specs.items():
+            method = spec["method"]
+            if (
+                not (method.startswith("parse_") or method.startswith("read_"))
+                or not hasattr(self, method)
+                or method == "parse_many"
+            ):
+                raise ValueError("Not a parsing method: {} (spec {})".format(method, name))
+            args = tuple(spec.get("args", ()))
+            kwargs = dict(spec.get("kwargs", {}))
+            job_key = repr((method, args, sorted(kwargs.items())))
+            jobs[job_key] = (method, args, kwargs)
+            job_keys[name] = job_key
+
+        # biggest inputs first, so that the largest file does not start last
+        def input_size(job):
+            method, args, kwargs = job
+            return sum(
+                os.path.getsize(arg)
+                for arg in list(args) + list(kwargs.values())
+                if isinstance(arg, str) and os.path.isfile(arg)
+            )
+
+        job_order = sorted(jobs, key=lambda job_key: input_size(jobs[job_key]), reverse=True)
+
+        job_results = {}
+        if workers == 1:
+            for job_key in job_order:
+                job_results[job_key] = parse_spec(self.cache_dir, *jobs[job_key])
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    job_key: executor.submit(parse_spec, self.cache_dir, *jobs[job_key])
+                    for job_key in job_order
+                }
+                for job_key, future in futures.items():
+                    job_results[job_key] = future.result()
+
+        return {name: job_results[job_key] for name, job_key in job_keys.items()}
+
+
+def parse_spec(cache_dir, method, args, kwargs):
+    """Internal function (runs in worker processes of Parser.parse_many) to call one Parser method
+    """
+    parser = Parser(cache_dir=cache_dir)
+    return getattr(parser, method)(*args, **kwargs)
@@ -0,0 +1,182 @@
+from __future__ import print_function
+import logging
+import pandas as pd
+import numpy as np
+import json
+import os
+
+from powerscenarios import cache
+
+logging.basicConfig()
+
+# Consolidated store of wind site power (site x 5-minute timestamp), built once from per-site WTK files
+# store is a directory with:
+#   site_ids.npy - (int64) sorted site ids, row index of power
+#   times.npy - (int64) timestamps in ns since epoch (UTC), column index of power
+#   power.npy - (float32) power [MW], one row per site, opened memory-mapped (any window of any sites is one sliced read)
+#   meta.json - e.g. WTK data dir it was built from
+# store is written to a temporary directory first and then renamed (see cache.atomic_write_dir)
+# sites can be added later (only new sites are read), several grids and penetration levels can share one store
+
+
+class PowerStore(object):
+    """ consolidated wind site power store
+
+    Required Args:
+        site_ids - (array of int) sorted site ids
+        times - (pd.DatetimeIndex) UTC timestamps
+        power - (2-D array of float32, possibly memory-mapped) power, sites x times
+    Optional Args:
+        meta - (dict) json-able info about the store
+    """
+
+    def __init__(self, site_ids, times, power, meta=None):
+        self.site_ids = np.asarray(site_ids, dtype=np.int64)
+        self.times = times
+        self.power = power
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.site_ids)
+
+    @classmethod
+    def load(cls, store_dir):
+        """ function to open a store, power is memory-mapped (read only)
+
+        Required Args:
+            store_dir - (str) store directory
+        Returns:
+            PowerStore
+        """
+        site_ids = np.load(os.path.join(store_dir, "site_ids.npy"))
+        times = pd.to_datetime(np.load(os.path.join(store_dir, "times.npy")), unit="ns", utc=True)
+        power = np.load(os.path.join(store_dir, "power.npy"), mmap_mode="r")
+        with open(os.path.join(store_dir, "meta.json")) as f:
+            meta = json.load(f)
+
+        return cls(site_ids, times, power, meta=meta)
+
+    @classmethod
+    def build(cls, store_dir, site_ids, start_of_data, end_of_data, read_sites_power, meta=None):
+        """ function to open a store that has power of site_ids between start_of_data and end_of_data,
+            store is built (or extended) if needed:
+            if existing store covers the time window, only missing sites are read and added,
+            otherwise store is rebuilt for the union of both time windows (all sites are read again)
+
+        Required Args:
+            store_dir - (str) store directory
+            site_ids - (array of int) site ids needed
+            start_of_data - (pd.Timestamp) start of power data needed
+            end_of_data - (pd.Timestamp) end of power data needed
+            read_sites_power - (function) read_sites_power(site_ids, start_of_data, end_of_data) gives
+                power of sites (pd.Series indexed by UTC timestamps) in the order of site_ids
+        Optional Args:
+            meta - (dict) json-able info saved with the store (e.g. WTK data dir)
+        Returns:
+            PowerStore
+        """
+        site_ids = np.unique(np.asarray(site_ids, dtype=np.int64))
+        store = cls.load(store_dir) if os.path.isdir(store_dir) else None
+        if store is not None and store.covers(site_ids, start_of_data, end_of_data):
+            return store
+
+        if store is not None and store.covers([], start_of_data, end_of_data):
+            # same time window, read only missing sites
+            new_site_ids = np.setdiff1d(site_ids, store.site_ids)
+            all_site_ids = np.union1d(store.site_ids, new_site_ids)
+            start_of_data, end_of_data = store.times[0], store.times[-1]
+        else:
+            if store is not None:
+                # rebuild for both time windows and all sites
+                start_of_data = min(start_of_data, store.times[0])
+                end_of_data = max(end_of_data, store.times[-1])
+                site_ids = np.union1d(site_ids, store.site_ids)
+                store = None
+            new_site_ids = site_ids
+            all_site_ids = site_ids
+
+        print("Building power store of {} wind sites ({} new) ...".format(len(all_site_ids), len(new_site_ids)))
+
+        def write(tmp_dir):
+            power = None
+            new_positions = np.searchsorted(all_site_ids, new_site_ids)
+            # rows are written one site at a time, whole table is never in memory
+            for position, site_power in zip(
+                new_positions, read_sites_power(new_site_ids, start_of_data, end_of_data)
+            ):
+                if power is None:
+                    times = site_power.index if store is None else store.times
+                    power = np.lib.format.open_memmap(
+                        os.path.join(tmp_dir, "power.npy"),
+                        mode="w+",
+                        dtype=np.float32,
+                        shape=(len(all_site_ids), len(times)),
+                    )
+                if len(site_power) != len(times):
+                    raise ValueError(
+                        "Power of site {} has {} timestamps, expected {}".format(
+                            all_site_ids[position], len(site_power), len(times)
+                        )
+                    )
+                power[position] = site_power.values
+            if power is None:
+                raise ValueError("No wind sites to build power store from")
+
+            if store is not None:
+                old_positions = np.searchsorted(all_site_ids, store.site_ids)
+                power[old_positions] = store.power
+
+            power.flush()
+            del power
+            np.save(os.path.join(tmp_dir, "site_ids.npy"), all_site_ids)
+            # ns whatever unit the index has (pandas 2+ keeps e.g. us)
+            np.save(os.path.join(tmp_dir, "times.npy"), np.asarray(times.values, dtype="datetime64[ns]").view(np.int64))
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump(meta or {}, f)
+
+        cache.atomic_write_dir(store_dir, write)
+        print("Done")
+
+        return cls.load(store_dir)
+
+    def covers(self, site_ids, start_of_data, end_of_data):
+        """ function to check if store has power of site_ids between start_of_data and end_of_data
+
+        Returns:
+            bool
+        """
+        return (
+            len(self.times) > 0
+            and self.times[0] <= start_of_data
+            and end_of_data <= self.times[-1]
+            and np.isin(np.asarray(site_ids, dtype=np.int64), self.site_ids).all()
+        )
+
+    def read(self, site_ids, start_of_data, end_of_data):
+        """ function to read power of sites between start_of_data and end_of_data (one sliced read)
+
+        Required Args:
+            site_ids - (array of int) site ids, all have to be in the store
+            start_of_data - (pd.Timestamp) start of power data
+            end_of_data - (pd.Timestamp) end of power data (inclusive)
+        Returns:
+            (times, power) - (pd.DatetimeIndex, 2-D array of float32) timestamps and power, one row per site in order of site_ids
+        """
+        site_ids = np.asarray(site_ids, dtype=np.int64)
+        if not self.covers(site_ids, start_of_data, end_of_data):
+            raise ValueError(
+                "Power store does not have all sites between {} and {}".format(start_of_data, end_of_data)
+            )
+        positions = np.searchsorted(self.site_ids, site_ids)
+        start = self.times.searchsorted(start_of_data, side="left")
+        end = self.times.searchsorted(end_of_data, side="right")
+
+        return self.times[start:end], np.asarray(self.power[positions, start:end])
+
+    def iter_power(self, site_ids, start_of_data, end_of_data):
+        """ generator of power (pd.Series) of sites in the order of site_ids,
+            same as reading sites one by one from WTK files, but all of them come from one sliced read
+        """
+        times, power = self.read(site_ids, start_of_data, end_of_data)
+        for row in power:
+            yield pd.Series(row, index=times)
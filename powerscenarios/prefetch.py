@@ -0,0 +1,166 @@
+from __future__ import print_function
+import logging
+import numpy as np
+import os
+import time
+import concurrent.futures
+
+logging.basicConfig()
+
+# Prefetch of WIND Toolkit site files into pywtk cache (PYWTK_CACHE_DIR), as a separate (parallel) job step,
+# so that make_tables does not download them one at a time inside pywtk calls
+# cache layout is the same as pywtk's: <cache_dir>/<nc_dir>/<site_id // 500>/<site_id>.nc, nc_dir is met_data or fcst_data,
+# every file has all years of a site (2007-2013), so files needed depend only on wind sites (not on time windows)
+# files are downloaded to <file>.part and renamed when complete, an interrupted prefetch resumes from where .part ends
+# stores (where files come from) have size(key) and read(key, offset) (stream of chunks from byte offset):
+#   DirectoryStore - local directory with the same layout (e.g. a shared copy, or a stand-in for tests)
+#   S3Store - AWS S3 bucket (needs boto3)
+
+NC_DIRS = {"met": "met_data", "fcst": "fcst_data"}
+CHUNK_SIZE = 2 ** 20
+
+
+def site_file_keys(site_ids, nc_dirs=("met",)):
+    """ function to list files (keys, paths relative to cache dir) of WTK sites
+
+    Required Args:
+        site_ids - (list of int) WTK site ids, e.g. grid.wind_sites["SiteID"]
+    Optional Args:
+        nc_dirs - (list of str) 'met' and/or 'fcst'
+    Returns:
+        keys - (list of str) e.g. ['met_data/0/123.nc', ...], sorted, no repeats
+    """
+    return sorted(
+        "{}/{}/{}.nc".format(NC_DIRS[nc_dir], site_id // 500, site_id)
+        for nc_dir in nc_dirs
+        for site_id in np.unique(np.asarray(site_ids, dtype=np.int64))
+    )
+
+
+class DirectoryStore(object):
+    """ files from a local directory (same layout as pywtk cache)
+
+    Required Args:
+        root_dir - (str) directory
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+
+    def size(self, key):
+        return os.path.getsize(os.path.join(self.root_dir, key))
+
+    def read(self, key, offset=0):
+        with open(os.path.join(self.root_dir, key), "rb") as f:
+            f.seek(offset)
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                yield chunk
+
+
+class S3Store(object):
+    """ files from AWS S3 (anonymous access, public WTK bucket)
+
+    Optional Args:
+        bucket - (str) bucket name
+        prefix - (str) prefix of keys in bucket
+    """
+
+    def __init__(self, bucket="nrel-pds-wtk", prefix=""):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = None
+
+    def get_client(self):
+        # one client per store, made on first use (clients are thread safe, but can not be pickled)
+        if self.client is None:
+            import boto3
+            import botocore
+            import botocore.config
+
+            self.client = boto3.client("s3", config=botocore.config.Config(signature_version=botocore.UNSIGNED))
+        return self.client
+
+    def size(self, key):
+        return self.get_client().head_object(Bucket=self.bucket, Key=self.prefix + key)["ContentLength"]
+
+    def read(self, key, offset=0):
+        response = self.get_client().get_object(
+            Bucket=self.bucket, Key=self.prefix + key, Range="bytes={}-".format(offset)
+        )
+        for chunk in iter(lambda: response["Body"].read(CHUNK_SIZE), b""):
+            yield chunk
+
+
+def fetch_file(store, key, cache_dir, retries=3, retry_wait=1.0):
+    """ function to fetch one file into cache, skipped if it is there already,
+        resumes from partial download (<file>.part), retries with growing waits
+
+    Required Args:
+        store - (DirectoryStore or S3Store) where file comes from
+        key - (str) file key, e.g. 'met_data/0/123.nc'
+        cache_dir - (str) pywtk cache dir
+    Optional Args:
+        retries - (int) number of retries after a failed attempt
+        retry_wait - (float) wait before first retry [s], doubled for every next one
+    Returns:
+        status - (str) 'cached' (was there already) or 'fetched'
+    """
+    file_name = os.path.join(cache_dir, key)
+    if os.path.isfile(file_name):
+        return "cached"
+
+    part_file_name = file_name + ".part"
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    for attempt in range(retries + 1):
+        try:
+            size = store.size(key)
+            offset = os.path.getsize(part_file_name) if os.path.isfile(part_file_name) else 0
+            if offset > size:
+                # not a part of this file
+                offset = 0
+            with open(part_file_name, "ab" if offset > 0 else "wb") as f:
+                if offset < size:
+                    for chunk in store.read(key, offset):
+                        f.write(chunk)
+            if os.path.getsize(part_file_name) != size:
+                raise IOError("{}: got {} bytes, expected {}".format(key, os.path.getsize(part_file_name), size))
+            os.replace(part_file_name, file_name)
+            return "fetched"
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(retry_wait * 2 ** attempt)
+
+
+def prefetch(store, keys, cache_dir, workers=8, retries=3, retry_wait=1.0):
+    """ function to fetch files into cache concurrently (at most workers downloads at a time),
+        files that are in cache already are skipped, so an interrupted prefetch can simply be run again
+
+    Required Args:
+        store - (DirectoryStore or S3Store) where files come from
+        keys - (list of str) file keys (see site_file_keys)
+        cache_dir - (str) pywtk cache dir (PYWTK_CACHE_DIR)
+    Optional Args:
+        workers - (int) number of concurrent downloads (threads, downloads are I/O bound)
+        retries - (int) retries of every file
+        retry_wait - (float) wait before first retry [s]
+    Returns:
+        counts - (dict) number of 'cached', 'fetched' and 'failed' files, and 'failed_keys'
+    """
+    counts = {"cached": 0, "fetched": 0, "failed": 0, "failed_keys": []}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(fetch_file, store, key, cache_dir, retries=retries, retry_wait=retry_wait): key
+            for key in keys
+        }
+        for i, future in enumerate(concurrent.futures.as_completed(futures)):
+            try:
+                counts[future.result()] += 1
+            except Exception as e:
+                logging.getLogger(__name__).warning("failed to fetch {}: {}".format(futures[future], e))
+                counts["failed"] += 1
+                counts["failed_keys"].append(futures[future])
+            if (i + 1) % 100 == 0 or i + 1 == len(futures):
+                print("{}/{} files ({} fetched, {} failed)".format(i + 1, len(futures), counts["fetched"], counts["failed"]))
+
+    return counts
@@ -0,0 +1,195 @@
+from __future__ import print_function
+import logging
+import pandas as pd
+import numpy as np
+
+logging.basicConfig()
+
+# Sampling index of scenarios table for Grid.generate_wind_scenarios
+# power conditioning bins (pd.qcut of TotalPower), row positions of every bin and importance sampling probabilities
+# do not depend on simulation timestamp, so they are computed once per (power_quantiles, n_periods, cost parameters)
+# and every call only finds the bin of total power at t0 (searchsorted of bin edges) and draws rows of it
+# draws are the same as DataFrame.sample of the bin (RandomState(random_seed).choice), so results do not change
+# for power within the bins; power below the lowest bin now goes to the lowest bin (the bin loop used to fall through
+# to the highest bin), power above the highest bin still goes to the highest bin
+# draw_batch draws rows for many simulation timestamps at once (one random stream for the batch, for Grid.generate_wind_scenarios_batch),
+# from the same distributions as draw (uniform, or successive sampling without replacement with importance probabilities)
+
+
+class SamplingIndex(object):
+    """ Class for drawing scenario rows conditioned on total power
+
+    Required Args:
+        scenarios_df - (pd.DataFrame) scenarios table (see Grid.make_tables), with columns TotalPower and Deviation
+        power_quantiles - (list) quantiles for power conditioning
+        n_periods - (integer) number of periods of each scenario
+    Optional Args:
+        loss_of_load_cost - (float) cost of MW of negative deviation per 5-min period
+        spilled_wind_cost - (float) cost of MW of positive deviation per 5-min period
+        precision - (int) decimals costs are rounded to (e.g. Grid.WTK_DATA_PRECISION)
+    """
+
+    def __init__(
+        self,
+        scenarios_df,
+        power_quantiles,
+        n_periods,
+        loss_of_load_cost=10000 / 12.0,
+        spilled_wind_cost=0.001,
+        precision=None,
+    ):
+        self.scenarios = scenarios_df
+        self.power_quantiles = tuple(power_quantiles)
+        self.n_periods = n_periods
+        self.loss_of_load_cost = loss_of_load_cost
+        self.spilled_wind_cost = spilled_wind_cost
+
+        # .iloc[:-n_periods] is so that we can find consecutive timestamps for multiperiod scenarios
+        power_bins = pd.qcut(scenarios_df["TotalPower"].iloc[:-n_periods], q=power_quantiles)
+        categories = power_bins.cat.categories
+        # edges of bin labels, (left, right] (as bins were looked up with `in` before)
+        self.bin_edges = np.append(categories.left.values, categories.right.values[-1])
+        codes = power_bins.cat.codes.values
+        # row positions (in scenarios_df) of every bin, in order of rows
+        self.bin_positions = [np.flatnonzero(codes == i) for i in range(len(categories))]
+
+        # costs of each 1-period scenario (in float64, also for float32 tables)
+        deviation = scenarios_df["Deviation"].values.astype(np.float64)
+        cost_1 = np.abs(deviation) * np.where(deviation < 0, loss_of_load_cost, spilled_wind_cost)
+        # cost_n, rolling window sum (if n_periods is 1, this will be the same as cost_1)
+        cost_n = pd.Series(cost_1).rolling(n_periods).sum().shift(-(n_periods - 1))
+        # rolling window operation looses digits, have to round (so we don't have negative values when adding zeroes)
+        if precision is not None:
+            cost_n = cost_n.round(precision)
+        cost_n = cost_n.values
+        if (cost_n < 0).any():
+            print("any neg values in cost_n? {}".format((cost_n < 0).any()))
+        # probability mass function g(s) of every bin i.e. importance distribution (NaN costs are never drawn)
+        self.importance_probs = []
+        for positions in self.bin_positions:
+            costs = np.nan_to_num(cost_n[positions])
+            self.importance_probs.append(costs / costs.sum())
+        # log probabilities, for drawing many samples at once (see draw_batch), -inf is never drawn
+        with np.errstate(divide="ignore"):
+            self.importance_log_probs = [np.log(probs) for probs in self.importance_probs]
+
+    def __len__(self):
+        return len(self.bin_positions)
+
+    def matches(self, scenarios_df, power_quantiles, n_periods, loss_of_load_cost, spilled_wind_cost):
+        """ function to check if index was built for this table and these parameters """
+        return (
+            self.scenarios is scenarios_df
+            and self.power_quantiles == tuple(power_quantiles)
+            and self.n_periods == n_periods
+            and self.loss_of_load_cost == loss_of_load_cost
+            and self.spilled_wind_cost == spilled_wind_cost
+        )
+
+    def find_bin(self, total_power):
+        """ function to find power bin of total power, (left, right] bins,
+            power below the lowest or above the highest bin goes to that bin
+            (before SamplingIndex, power below the lowest bin went to the highest bin, as the bin loop fell through)
+
+        Required Args:
+            total_power - (float or array of float) total power at t0
+        Returns:
+            bin - (int or array of int) bin number
+        """
+        return np.clip(np.searchsorted(self.bin_edges, total_power, side="left") - 1, 0, len(self) - 1)
+
+    def draw(self, total_power, n_scenarios, random_seed=25, sampling_method="monte carlo"):
+        """ function to draw scenario rows from the power bin of total power
+
+        Required Args:
+            total_power - (float) total power at t0
+            n_scenarios - (integer) number of rows to draw (without replacement)
+        Optional Args:
+            random_seed - (integer) seed of the draw
+            sampling_method - (string) either "importance" or "monte carlo"
+        Returns:
+            positions - (array of int) row positions in scenarios table
+            weights - (array of float) sampling weights f(s)/g(s) (all ones for monte carlo)
+        """
+        power_bin = self.find_bin(total_power)
+        positions = self.bin_positions[power_bin]
+        rng = np.random.RandomState(random_seed)
+        if sampling_method == "monte carlo":
+            sample = rng.choice(len(positions), size=n_scenarios, replace=False)
+            weights = np.ones(n_scenarios)
+        elif sampling_method == "importance":
+            probs = self.importance_probs[power_bin]
+            sample = rng.choice(len(positions), size=n_scenarios, replace=False, p=probs)
+            # IS weights: f(s)/g(s), i.e. nominal/importance
+            weights = (1 / len(positions)) / probs[sample]
+        else:
+            raise ValueError("Unknown sampling method: {}".format(sampling_method))
+
+        return positions[sample], weights
+
+    def draw_batch(self, total_power, n_scenarios, rng, sampling_method="monte carlo", chunk_size=2 ** 24):
+        """ function to draw scenario rows for many simulation timestamps at once,
+            rows of every timestamp are drawn from the power bin of its total power, without repeats within a timestamp,
+            from the same distribution as draw (but from one random stream, so not the same rows):
+            monte carlo - all rows are drawn at once, the few timestamps that got a row twice are drawn again one by one
+            importance - successive sampling without replacement (as RandomState.choice with p) by Gumbel-top-k:
+                n_scenarios largest log(p) + Gumbel noise of every timestamp, in order of their keys
+
+        Required Args:
+            total_power - (array of float) total power at t0 of every timestamp
+            n_scenarios - (integer) number of rows to draw for every timestamp
+            rng - (np.random.RandomState) random numbers of the whole batch
+        Optional Args:
+            sampling_method - (string) either "importance" or "monte carlo"
+            chunk_size - (integer) importance only, number of keys (timestamps x rows of bin) made at a time
+        Returns:
+            positions - (2-D array of int) row positions in scenarios table, timestamp x scenario
+            weights - (2-D array of float) sampling weights f(s)/g(s) (all ones for monte carlo), timestamp x scenario
+        """
+        if sampling_method not in ["monte carlo", "importance"]:
+            raise ValueError("Unknown sampling method: {}".format(sampling_method))
+
+        power_bins = self.find_bin(np.asarray(total_power, dtype=np.float64))
+        positions = np.empty((len(power_bins), n_scenarios), dtype=np.int64)
+        weights = np.ones((len(power_bins), n_scenarios))
+        for power_bin in np.unique(power_bins):
+            rows = np.flatnonzero(power_bins == power_bin)
+            bin_positions = self.bin_positions[power_bin]
+            if n_scenarios > len(bin_positions):
+                raise ValueError(
+                    "Can not draw {} scenarios from power bin {} of {} rows".format(
+                        n_scenarios, power_bin, len(bin_positions)
+                    )
+                )
+            if sampling_method == "monte carlo":
+                sample = np.minimum(
+                    (rng.random_sample((len(rows), n_scenarios)) * len(bin_positions)).astype(np.int64),
+                    len(bin_positions) - 1,
+                )
+                # timestamps that got a row more than once
+                sorted_sample = np.sort(sample, axis=1)
+                for i in np.flatnonzero((sorted_sample[:, 1:] == sorted_sample[:, :-1]).any(axis=1)):
+                    sample[i] = rng.choice(len(bin_positions), size=n_scenarios, replace=False)
+            else:
+                log_probs = self.importance_log_probs[power_bin]
+                if n_scenarios > np.count_nonzero(np.isfinite(log_probs)):
+                    raise ValueError(
+                        "Can not draw {} scenarios from power bin {} with {} nonzero probabilities".format(
+                            n_scenarios, power_bin, np.count_nonzero(np.isfinite(log_probs))
+                        )
+                    )
+                sample = np.empty((len(rows), n_scenarios), dtype=np.int64)
+                chunk_rows = max(1, chunk_size // len(bin_positions))
+                for start in range(0, len(rows), chunk_rows):
+                    keys = log_probs + rng.gumbel(size=(len(rows[start : start + chunk_rows]), len(bin_positions)))
+                    top = np.argpartition(-keys, n_scenarios - 1, axis=1)[:, :n_scenarios]
+                    # in order of keys (order of successive draws)
+                    order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+                    sample[start : start + chunk_rows] = np.take_along_axis(top, order, axis=1)
+
+            positions[rows] = bin_positions[sample]
+            if sampling_method == "importance":
+                # IS weights: f(s)/g(s), i.e. nominal/importance
+                weights[rows] = (1 / len(bin_positions)) / self.importance_probs[power_bin][sample]
+
+        return positions, weights
@@ -0,0 +1,341 @@
+from __future__ import print_function
+import logging
+import pandas as pd
+import numpy as np
+import os
+
+from scipy.spatial import cKDTree
+
+from powerscenarios import cache
+from powerscenarios.wtk_source import PywtkSource
+
+logging.basicConfig()
+
+# KD-tree index of WIND Toolkit sites for finding wind sites nearest to wind generators
+# built once from pywtk site catalog (~126k sites), persisted as a small .npz file (site ids, lon/lat, capacity),
+# tree itself is rebuilt on load (takes a fraction of a second)
+# distance is the same planar distance in (lon, lat) degrees that pywtk.site_lookup.get_3tiersites_from_wkt sorts by
+# optionally keeps mean capacity factor of sites (NaN if not known yet), for 'capacity factor' site selection
+# file also keeps which WTK source the catalog came from and which time window capacity factors were averaged over,
+# index is rebuilt if source changes, capacity factors are dropped (computed again) if window changes
+
+
+class SiteIndex(object):
+    """ Class for k-nearest wind site queries
+
+    Required Args:
+        site_ids - (array of int) WTK site ids
+        longitude - (array of float) site longitudes
+        latitude - (array of float) site latitudes
+        capacity - (array of float) site capacities [MW]
+    Optional Args:
+        capacity_factor - (array of float) mean capacity factors of sites, NaN where not computed (default all NaN)
+        source - (str) repr of WTK source the catalog came from (see wtk_source)
+        capacity_factor_window - (tuple of str) start and end of power data capacity factors were averaged over
+    """
+
+    def __init__(
+        self, site_ids, longitude, latitude, capacity, capacity_factor=None, source=None, capacity_factor_window=None
+    ):
+        self.site_ids = np.asarray(site_ids, dtype=np.int64)
+        self.longitude = np.asarray(longitude, dtype=np.float64)
+        self.latitude = np.asarray(latitude, dtype=np.float64)
+        self.capacity = np.asarray(capacity, dtype=np.float64)
+        if capacity_factor is None:
+            capacity_factor = np.full(len(self.site_ids), np.nan)
+        self.capacity_factor = np.asarray(capacity_factor, dtype=np.float32)
+        self.source = source
+        self.capacity_factor_window = None if capacity_factor_window is None else tuple(capacity_factor_window)
+        self.tree = cKDTree(np.column_stack([self.longitude, self.latitude]))
+
+    def __len__(self):
+        return len(self.site_ids)
+
+    @classmethod
+    def from_sites_df(cls, sites_df):
+        """ function to make index out of site catalog
+
+        Required Args:
+            sites_df - (pd.DataFrame) sites indexed by site id, with columns lon, lat, capacity (e.g. pywtk.site_lookup.sites)
+                and optionally capacity_factor
+        Returns:
+            SiteIndex
+        """
+        return cls(
+            sites_df.index.values,
+            sites_df["lon"].values,
+            sites_df["lat"].values,
+            sites_df["capacity"].values,
+            capacity_factor=sites_df["capacity_factor"].values if "capacity_factor" in sites_df else None,
+        )
+
+    @classmethod
+    def from_pywtk(cls, file_name=None):
+        """ function to get index of all WTK sites, built from pywtk site catalog
+
+        Optional Args:
+            file_name - (str) .npz file, if it exists index is loaded from it,
+                otherwise index is built and saved to it (so it is built only once)
+        Returns:
+            SiteIndex
+        """
+        return cls.from_source(PywtkSource(), file_name)
+
+    @classmethod
+    def from_source(cls, wtk_source, file_name=None):
+        """ function to get index of all sites of a WTK data source (see wtk_source)
+
+        Required Args:
+            wtk_source - (WTKSource) e.g. PywtkSource(), LocalSource(data_dir), SyntheticSource()
+        Optional Args:
+            file_name - (str) .npz file, as in from_pywtk
+        Returns:
+            SiteIndex
+        """
+        if file_name is not None and os.path.isfile(file_name):
+            site_index = cls.load(file_name)
+            if site_index.source == repr(wtk_source):
+                return site_index
+            print(
+                "Site index {} was built from {}, rebuilding it from {}".format(
+                    file_name, site_index.source, wtk_source
+                )
+            )
+
+        site_index = cls.from_sites_df(wtk_source.sites())
+        site_index.source = repr(wtk_source)
+        if file_name is not None:
+            site_index.save(file_name)
+
+        return site_index
+
+    def save(self, file_name):
+        """ function to save index to .npz file, written to a temporary file first and then renamed
+
+        Required Args:
+            file_name - (str) path to .npz file
+        """
+        cache.atomic_write_file(
+            file_name,
+            lambda f: np.savez(
+                f,
+                site_ids=self.site_ids,
+                longitude=self.longitude,
+                latitude=self.latitude,
+                capacity=self.capacity,
+                capacity_factor=self.capacity_factor,
+                source=np.array("" if self.source is None else self.source),
+                capacity_factor_window=np.array(self.capacity_factor_window or [], dtype=str),
+            ),
+            mode="wb",
+        )
+
+    @classmethod
+    def load(cls, file_name):
+        """ function to load index saved with save
+
+        Required Args:
+            file_name - (str) path to .npz file
+        Returns:
+            SiteIndex
+        """
+        with np.load(file_name) as data:
+            return cls(
+                data["site_ids"],
+                data["longitude"],
+                data["latitude"],
+                data["capacity"],
+                capacity_factor=data["capacity_factor"] if "capacity_factor" in data else None,
+                # files saved before these were kept have no source (rebuilt by from_source) and no window
+                source=str(data["source"]) or None if "source" in data else None,
+                capacity_factor_window=(
+                    tuple(str(value) for value in data["capacity_factor_window"])
+                    if "capacity_factor_window" in data and len(data["capacity_factor_window"]) == 2
+                    else None
+                ),
+            )
+
+    def query(self, longitude, latitude, k):
+        """ function to find k nearest sites to many points at once
+
+        Required Args:
+            longitude - (array of float) point longitudes
+            latitude - (array of float) point latitudes
+            k - (int) number of sites per point
+        Returns:
+            (distances, positions) - (2d arrays, one row per point) sorted by distance,
+                positions are positions of sites in the index (site_ids[positions] are site ids)
+        """
+        n_points = len(longitude)
+        k = min(k, len(self))
+        distances, positions = self.tree.query(np.column_stack([longitude, latitude]), k=k)
+        return distances.reshape(n_points, k), positions.reshape(n_points, k)
+
+    def within_radius(self, longitude, latitude, radius):
+        """ function to find sites within radius of many points at once
+
+        Required Args:
+            longitude - (array of float) point longitudes
+            latitude - (array of float) point latitudes
+            radius - (float) search radius [degrees]
+        Returns:
+            positions - (list of arrays of int) positions of sites within radius of each point
+        """
+        positions = self.tree.query_ball_point(np.column_stack([longitude, latitude]), r=radius)
+        return [np.asarray(point_positions, dtype=np.int64) for point_positions in positions]
+
+    def use_capacity_factor_window(self, start_of_data, end_of_data):
+        """ function to set time window capacity factors are averaged over,
+            if capacity factors were averaged over another window, they are all dropped (set to NaN, computed again)
+
+        Required Args:
+            start_of_data - (pd.Timestamp) start of power data to average
+            end_of_data - (pd.Timestamp) end of power data to average
+        """
+        window = (str(start_of_data), str(end_of_data))
+        if self.capacity_factor_window != window:
+            if not np.isnan(self.capacity_factor).all():
+                print("Capacity factors were averaged over {}, dropping them".format(self.capacity_factor_window))
+            self.capacity_factor[:] = np.nan
+            self.capacity_factor_window = window
+
+    def compute_capacity_factors(self, positions, start_of_data, end_of_data, wtk_source=None):
+        """ function to compute mean capacity factor (mean power / capacity) of sites from WTK data (local pywtk cache)
+            done once per site, results are kept in capacity_factor (save the index to keep them),
+            capacity factors of another time window are dropped first (see use_capacity_factor_window)
+
+        Required Args:
+            positions - (array of int) positions of sites in the index
+            start_of_data - (pd.Timestamp) start of power data to average
+            end_of_data - (pd.Timestamp) end of power data to average
+        Optional Args:
+            wtk_source - (WTKSource) where met power data comes from, default PywtkSource()
+        """
+        if wtk_source is None:
+            wtk_source = PywtkSource()
+
+        self.use_capacity_factor_window(start_of_data, end_of_data)
+        for position in positions:
+            power = wtk_source.get_power(self.site_ids[position], start_of_data, end_of_data)
+            self.capacity_factor[position] = power.mean() / self.capacity[position]
+
+    def take_sites(self, ranked, gen_capacity, used):
+        """Internal function to take ranked sites that are not used yet, until their capacity exceeds gen_capacity
+
+        Returns:
+            (take, enough) - (array of int, bool) positions of taken sites, and whether their capacity exceeds gen_capacity
+        """
+        free = ranked[~used[ranked]]
+        # first site at which total capacity goes over gen capacity is taken as well
+        n_take = np.searchsorted(np.cumsum(self.capacity[free]), gen_capacity, side="right") + 1
+        return free[:n_take], n_take <= len(free)
+
+    def take_nearest_sites(self, longitude, latitude, gen_capacity, used, nearest, k):
+        """Internal function to take nearest sites that are not used yet, until their capacity exceeds gen_capacity
+            nearest (k nearest positions) are queried again with larger k if they are not enough
+        """
+        n_sites = len(self)
+        while True:
+            take, enough = self.take_sites(nearest, gen_capacity, used)
+            if enough or k == n_sites:
+                return take
+            k = min(n_sites, 2 * k)
+            nearest = self.query([longitude], [latitude], k)[1][0]
+
+    def make_wind_sites_df(self, wind_gen_df, gen_positions):
+        """Internal function to make wind sites table out of taken site positions (list of arrays, one per wind generator)
+        """
+        gen_rows = np.repeat(np.arange(len(wind_gen_df)), [len(take) for take in gen_positions])
+        site_positions = np.concatenate(gen_positions) if gen_positions else np.array([], dtype=np.int64)
+
+        wind_sites_df = pd.DataFrame(
+            {
+                "SiteID": self.site_ids[site_positions],
+                "Capacity": self.capacity[site_positions],
+                "Point": [
+                    "POINT ({} {})".format(lon, lat)
+                    for lon, lat in zip(self.longitude[site_positions], self.latitude[site_positions])
+                ],
+                "Latitude": self.latitude[site_positions],
+                "Longitude": self.longitude[site_positions],
+                "BusNum": wind_gen_df["BusNum"].values[gen_rows],
+                "GenUID": wind_gen_df["GenUID"].values[gen_rows],
+            }
+        )
+
+        return wind_sites_df
+
+    def initial_k(self, gen_capacity):
+        """Internal function to pick k for one k-nearest query of all generators: 
+            large enough for the largest generator (plus some sites taken by neighbors)
+        """
+        site_capacity = self.capacity[self.capacity > 0].mean()
+        k = int(2 * (np.ceil(gen_capacity.max(initial=0.0) / site_capacity) + 1))
+        return min(len(self), max(k, 16))
+
+    def assign_sites(self, wind_gen_df):
+        """ function to assign nearest wind sites to wind generators (up to their capacity, GenMWMax)
+            generators are taken in order, each takes nearest sites that are not used yet,
+            until capacity of its sites exceeds GenMWMax (same as "simple proximity" in Grid.retrieve_wind_sites)
+
+        Required Args:
+            wind_gen_df - (pd.DataFrame) wind generators with columns BusNum, GenUID, Latitude, Longitude, GenMWMax
+        Returns:
+            wind_sites_df - (pd.DataFrame) one row per site with columns SiteID, Capacity, Point, Latitude, Longitude, BusNum, GenUID
+        """
+        longitude = wind_gen_df["Longitude"].values.astype(np.float64)
+        latitude = wind_gen_df["Latitude"].values.astype(np.float64)
+        gen_capacity = wind_gen_df["GenMWMax"].values.astype(np.float64)
+
+        # one query for all generators, generators that need more sites are queried again with larger k
+        k = self.initial_k(gen_capacity)
+        _, positions = self.query(longitude, latitude, k)
+
+        used = np.zeros(len(self), dtype=bool)  # bitmap of used sites (don't want repeats)
+        gen_positions = []
+        for i in range(len(wind_gen_df)):
+            take = self.take_nearest_sites(longitude[i], latitude[i], gen_capacity[i], used, positions[i], k)
+            used[take] = True
+            gen_positions.append(take)
+
+        return self.make_wind_sites_df(wind_gen_df, gen_positions)
+
+    def assign_sites_by_capacity_factor(self, wind_gen_df, radius):
+        """ function to assign wind sites with best capacity factor within radius to wind generators (up to their capacity, GenMWMax)
+            generators are taken in order, each takes sites within radius that are not used yet, best capacity factor first
+            (nearer first if equal), until capacity of its sites exceeds GenMWMax, 
+            if there is not enough capacity within radius, nearest sites outside of it are taken
+            capacity factors of sites within radius have to be computed (see compute_capacity_factors)
+
+        Required Args:
+            wind_gen_df - (pd.DataFrame) wind generators with columns BusNum, GenUID, Latitude, Longitude, GenMWMax
+            radius - (float) search radius [degrees]
+        Returns:
+            wind_sites_df - (pd.DataFrame) as in assign_sites
+        """
+        longitude = wind_gen_df["Longitude"].values.astype(np.float64)
+        latitude = wind_gen_df["Latitude"].values.astype(np.float64)
+        gen_capacity = wind_gen_df["GenMWMax"].values.astype(np.float64)
+
+        candidates = self.within_radius(longitude, latitude, radius)
+        k = self.initial_k(gen_capacity)
+        _, positions = self.query(longitude, latitude, k)
+
+        used = np.zeros(len(self), dtype=bool)  # bitmap of used sites (don't want repeats)
+        gen_positions = []
+        for i in range(len(wind_gen_df)):
+            candidate = candidates[i]
+            distance = np.hypot(self.longitude[candidate] - longitude[i], self.latitude[candidate] - latitude[i])
+            # best capacity factor first, nearer first among equal
+            ranked = candidate[np.lexsort((distance, -self.capacity_factor[candidate]))]
+            take, enough = self.take_sites(ranked, gen_capacity[i], used)
+            used[take] = True
+            if not enough:
+                # not enough capacity within radius, top up with nearest sites
+                missing_capacity = gen_capacity[i] - self.capacity[take].sum()
+                top_up = self.take_nearest_sites(longitude[i], latitude[i], missing_capacity, used, positions[i], k)
+                used[top_up] = True
+                take = np.concatenate([take, top_up])
+            gen_positions.append(take)
+
+        return self.make_wind_sites_df(wind_gen_df, gen_positions)
@@ -0,0 +1,234 @@
+from __future__ import print_function
+import logging
+import pandas as pd
+import numpy as np
+import os
+
+logging.basicConfig()
+
+# WIND Toolkit data sources: where site catalog and site power come from
+# Grid.retrieve_wind_sites, Grid.retrieve_wtk_data (and SiteIndex, PowerStore) go through one of these:
+#   PywtkSource - pywtk (local NetCDF files of pywtk cache, or AWS if PYWTK_CACHE_DIR is set), the default
+#   LocalSource - directory with sites.csv and per-site NetCDF (WTK layout) or .npz files, no pywtk needed
+#   SyntheticSource - made up catalog and power series of realistic shape, no data at all (benchmarks, profiling)
+# sources are small picklable objects, so that they can be sent to worker processes
+# power series are pd.Series indexed by UTC timestamps (5 minutes), leap days included, same as pywtk with utc=True
+
+
+class WTKSource(object):
+    """ interface of WIND Toolkit data sources
+    """
+
+    def __repr__(self):
+        # stable (used in cache keys, e.g. of wind sites)
+        return "{}({})".format(
+            type(self).__name__, ", ".join("{}={!r}".format(name, value) for name, value in sorted(vars(self).items()))
+        )
+
+    def sites(self):
+        """ function to get site catalog
+
+        Returns:
+            sites_df - (pd.DataFrame) sites indexed by site id, with columns lon, lat, capacity (as pywtk.site_lookup.sites)
+        """
+        raise NotImplementedError
+
+    def get_power(self, site_id, start_of_data, end_of_data, nc_dir="met", attribute="power"):
+        """ function to get power (or other attribute) of one site
+
+        Required Args:
+            site_id - (int) site id
+            start_of_data - (pd.Timestamp) start of required power data
+            end_of_data - (pd.Timestamp) end of required power data (inclusive)
+        Optional Args:
+            nc_dir - (str) 'met' for meteorological or 'fcst' for forecast data
+            attribute - (str) WTK attribute
+        Returns:
+            power - (pd.Series) indexed by UTC timestamps
+        """
+        raise NotImplementedError
+
+
+class PywtkSource(WTKSource):
+    """ WTK data through pywtk
+
+    Optional Args:
+        met_dir - (str) met NetCDF dir, default pywtk WIND_MET_NC_DIR
+        fcst_dir - (str) forecast NetCDF dir, default pywtk WIND_FCST_DIR
+    """
+
+    def __init__(self, met_dir=None, fcst_dir=None):
+        self.met_dir = met_dir
+        self.fcst_dir = fcst_dir
+
+    def sites(self):
+        import pywtk.site_lookup
+
+        return pywtk.site_lookup.sites
+
+    def get_power(self, site_id, start_of_data, end_of_data, nc_dir="met", attribute="power"):
+        import pywtk.wtk_api
+
+        if nc_dir == "met":
+            nc_dir = self.met_dir or pywtk.wtk_api.WIND_MET_NC_DIR
+        elif nc_dir == "fcst":
+            nc_dir = self.fcst_dir or pywtk.wtk_api.WIND_FCST_DIR
+
+        return pywtk.wtk_api.get_nc_data(
+            site_id,
+            start_of_data,
+            end_of_data,
+            attributes=[attribute],
+            leap_day=True,
+            utc=True,
+            nc_dir=nc_dir,
+        )[attribute]
+
+
+class LocalSource(WTKSource):
+    """ WTK data from a local directory, no pywtk needed:
+        <data_dir>/sites.csv - site catalog with columns site_id, lon, lat, capacity
+        <data_dir>/<nc_dir>/<site_id // 500>/<site_id>.nc - WTK NetCDF files (same layout as pywtk), or
+        <data_dir>/<nc_dir>/<site_id>.npz - arrays times (ns since epoch, UTC) and one per attribute (see write_site)
+
+    Required Args:
+        data_dir - (str) data directory
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+
+    def sites(self):
+        return pd.read_csv(os.path.join(self.data_dir, "sites.csv"), index_col="site_id")
+
+    def get_power(self, site_id, start_of_data, end_of_data, nc_dir="met", attribute="power"):
+        npz_file_name = os.path.join(self.data_dir, nc_dir, "{}.npz".format(site_id))
+        if os.path.isfile(npz_file_name):
+            with np.load(npz_file_name) as data:
+                power = pd.Series(data[attribute], index=pd.to_datetime(data["times"], unit="ns", utc=True))
+            return power.loc[start_of_data:end_of_data]
+
+        # WTK NetCDF: attribute values every sample_period seconds from start_time (seconds since epoch)
+        import netCDF4
+
+        nc_file_name = os.path.join(self.data_dir, nc_dir, str(int(site_id) // 500), "{}.nc".format(site_id))
+        with netCDF4.Dataset(nc_file_name) as nc:
+            start_time = pd.Timestamp(int(nc.start_time), unit="s", tz="utc")
+            sample_period = pd.Timedelta(seconds=int(nc.sample_period))
+            start = max(0, int(np.ceil((start_of_data - start_time) / sample_period)))
+            end = int(np.floor((end_of_data - start_time) / sample_period)) + 1
+            values = np.asarray(nc[attribute][start:end])
+
+        times = pd.date_range(start=start_time + start * sample_period, periods=len(values), freq=sample_period)
+        return pd.Series(values, index=times)
+
+    def write_sites(self, sites_df):
+        """ function to write site catalog
+
+        Required Args:
+            sites_df - (pd.DataFrame) sites indexed by site id, with columns lon, lat, capacity
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        sites_df[["lon", "lat", "capacity"]].rename_axis("site_id").to_csv(os.path.join(self.data_dir, "sites.csv"))
+
+    def write_site(self, site_id, power, nc_dir="met", attribute="power"):
+        """ function to write power of one site as .npz
+
+        Required Args:
+            site_id - (int) site id
+            power - (pd.Series) indexed by UTC timestamps
+        """
+        os.makedirs(os.path.join(self.data_dir, nc_dir), exist_ok=True)
+        np.savez(
+            os.path.join(self.data_dir, nc_dir, "{}.npz".format(site_id)),
+            # ns whatever unit the index has (pandas 2+ keeps e.g. us)
+            times=np.asarray(power.index.values, dtype="datetime64[ns]").view(np.int64),
+            **{attribute: power.values}
+        )
+
+
+class SyntheticSource(WTKSource):
+    """ made up WTK-like data, deterministic (same seed gives same sites and power for any time window)
+        sites are spread uniformly over a lon/lat box (16 MW each, as most WTK sites),
+        wind speed is a persistent random process (AR(1), about 8 hours correlation) with a daily cycle
+        around a mean speed of each site, power comes out of a generic turbine power curve (so there are
+        calm periods with zero power and windy ones at capacity, as in WTK data)
+
+    Optional Args:
+        n_sites - (int) number of sites
+        seed - (int) random seed
+        bounds - (tuple) (lon_min, lon_max, lat_min, lat_max), default continental US
+    """
+
+    ORIGIN = pd.Timestamp("2007-01-01 00:00:00", tz="utc")
+    TIME_STEP = pd.Timedelta("5min")
+    CAPACITY = 16.0
+    # power curve [m/s]
+    CUT_IN_SPEED = 3.0
+    RATED_SPEED = 12.0
+    CUT_OUT_SPEED = 25.0
+
+    def __init__(self, n_sites=10000, seed=0, bounds=(-125.0, -67.0, 25.0, 49.0)):
+        self.n_sites = n_sites
+        self.seed = seed
+        self.bounds = bounds
+
+    def sites(self):
+        rng = np.random.RandomState(self.seed)
+        lon_min, lon_max, lat_min, lat_max = self.bounds
+        sites_df = pd.DataFrame(
+            {
+                "lon": rng.uniform(lon_min, lon_max, self.n_sites),
+                "lat": rng.uniform(lat_min, lat_max, self.n_sites),
+                "capacity": np.full(self.n_sites, self.CAPACITY),
+            },
+            index=pd.RangeIndex(self.n_sites, name="site_id"),
+        )
+
+        return sites_df
+
+    def get_power(self, site_id, start_of_data, end_of_data, nc_dir="met", attribute="power"):
+        from scipy.signal import lfilter
+
+        # series starts at ORIGIN for every window, so that windows of the same site agree
+        start = max(0, int(np.ceil((start_of_data - self.ORIGIN) / self.TIME_STEP)))
+        end = int(np.floor((end_of_data - self.ORIGIN) / self.TIME_STEP)) + 1
+        if end <= start:
+            return pd.Series([], index=pd.DatetimeIndex([], tz="utc"), dtype=np.float32)
+
+        rng = np.random.RandomState([self.seed, int(site_id), 0 if nc_dir == "met" else 1])
+        mean_speed = rng.uniform(5.0, 9.0)
+        phase = rng.uniform(0.0, 2 * np.pi)
+        steps = np.arange(end)
+        # AR(1) with about 8 hours (96 steps) correlation time
+        phi = np.exp(-1.0 / 96)
+        noise = lfilter([np.sqrt(1 - phi ** 2)], [1.0, -phi], rng.standard_normal(end))
+        daily = np.sin(2 * np.pi * steps / 288 + phase)
+        speed = np.maximum(mean_speed * (1.0 + 0.15 * daily + 0.4 * noise), 0.0)[start:end]
+
+        power_curve = np.clip(
+            (speed ** 3 - self.CUT_IN_SPEED ** 3) / (self.RATED_SPEED ** 3 - self.CUT_IN_SPEED ** 3), 0.0, 1.0
+        )
+        power_curve[speed >= self.CUT_OUT_SPEED] = 0.0
+        times = pd.date_range(start=self.ORIGIN + start * self.TIME_STEP, periods=end - start, freq=self.TIME_STEP)
+
+        return pd.Series((self.CAPACITY * power_curve).astype(np.float32), index=times)
+
+    def write(self, data_dir, site_ids, start_of_data, end_of_data, nc_dir="met"):
+        """ function to write catalog and power of site_ids as LocalSource directory
+            (e.g. to benchmark file reads without WTK data)
+
+        Required Args:
+            data_dir - (str) LocalSource data directory
+            site_ids - (list of int) sites to write power of
+            start_of_data - (pd.Timestamp) start of power data
+            end_of_data - (pd.Timestamp) end of power data
+        Returns:
+            LocalSource
+        """
+        local_source = LocalSource(data_dir)
+        local_source.write_sites(self.sites())
+        for site_id in site_ids:
+            local_source.write_site(site_id, self.get_power(site_id, start_of_data, end_of_data, nc_dir), nc_dir)
+
+        return local_source
@@ -5,6 +5,7 @@ Main script to generate scenarios
 # System
 import os
 import sys
+import json
 import argparse
 import logging
 
@@ -17,6 +18,8 @@ import pandas as pd
 # Locals
 from powerscenarios.parser import Parser
 from powerscenarios.grid import Grid
+from powerscenarios.wtk_source import LocalSource, PywtkSource
+from powerscenarios import prefetch
 
 
 def parse_args():
@@ -26,6 +29,11 @@ def parse_args():
     add_arg("config", nargs="?", default="config.yaml")
     # add_arg('-d', '--distributed', action='store_true')
     add_arg("-v", "--verbose", action="store_true")
+    add_arg(
+        "--prefetch-only",
+        action="store_true",
+        help="only fetch WTK files of wind sites into PYWTK_CACHE_DIR (run as a separate job step before the real run)",
+    )
     # parameters which override the YAML file, if needed
     #
     return parser.parse_args()
@@ -58,6 +66,89 @@ def load_config(args):
     return config
 
 
+def make_wtk_source(config):
+    """ WTK source of config: local WTK data (wtk_local_dir, sites.csv and per-site files) or pywtk (default) """
+    if config.get("wtk_local_dir") is not None:
+        return LocalSource(os.path.expandvars(config["wtk_local_dir"]))
+    return PywtkSource()
+
+
+def tables_mismatches(tables_dir, config, grid):
+    """ function to compare meta.json of saved tables (see Grid.save_tables) with config and grid
+        (after wind penetration change)
+
+    Returns:
+        mismatches - (list of str) e.g. ['scenarios_end: 2013-12-31 23:55:00+00:00 != 2012-12-31 23:55:00+00:00'],
+            empty if saved tables can be used
+    """
+    with open(os.path.join(tables_dir, "meta.json")) as f:
+        meta = json.load(f)
+
+    mismatches = []
+    if meta.get("name") != grid.name:
+        mismatches.append("name: {} != {}".format(meta.get("name"), grid.name))
+    for name in ["actuals_start", "actuals_end", "scenarios_start", "scenarios_end"]:
+        timestamp = pd.Timestamp(config["tables"][name], tz="utc")
+        if meta.get(name) is None or pd.Timestamp(meta[name]) != timestamp:
+            mismatches.append("{}: {} != {}".format(name, meta.get(name), timestamp))
+    wind_penetration = grid.wind_penetration()
+    if (meta.get("wind_penetration") is None) != (wind_penetration is None) or (
+        wind_penetration is not None and not np.isclose(meta["wind_penetration"], wind_penetration)
+    ):
+        mismatches.append("wind_penetration: {} != {}".format(meta.get("wind_penetration"), wind_penetration))
+    dtype = str(np.dtype(config["tables"].get("dtype", "float64")))
+    if meta.get("dtype") != dtype:
+        mismatches.append("dtype: {} != {}".format(meta.get("dtype"), dtype))
+    # where power data came from (and for wtk, which WTK source and how wind sites were picked)
+    source = config["tables"].get("source", "wtk")
+    if meta.get("source") != source:
+        mismatches.append("source: {} != {}".format(meta.get("source"), source))
+    if source == "wtk":
+        wtk_source = repr(make_wtk_source(config))
+        if meta.get("wtk_source") != wtk_source:
+            mismatches.append("wtk_source: {} != {}".format(meta.get("wtk_source"), wtk_source))
+        wind_sites_config = config.get("wind_sites", {})
+        method = wind_sites_config.get("method", "simple proximity")
+        wind_sites = {
+            "method": method,
+            "radius": wind_sites_config.get("radius", 0.5) if method == "capacity factor" else None,
+            "wtk_source": wtk_source,
+        }
+        if meta.get("wind_sites") != wind_sites:
+            mismatches.append("wind_sites: {} != {}".format(meta.get("wind_sites"), wind_sites))
+
+    return mismatches
+
+
+def prefetch_wtk(config, grid, logger):
+    """ fetch WTK files of grid.wind_sites into PYWTK_CACHE_DIR, with bounded concurrency, retries and resume """
+    prefetch_config = config.get("prefetch", {})
+    cache_dir = os.path.expandvars(prefetch_config.get("cache_dir", os.environ.get("PYWTK_CACHE_DIR", "")))
+    if not cache_dir:
+        raise ValueError("set PYWTK_CACHE_DIR (or prefetch: cache_dir) for --prefetch-only")
+
+    # files come from a local copy (source_dir) or from AWS S3
+    if prefetch_config.get("source_dir") is not None:
+        store = prefetch.DirectoryStore(os.path.expandvars(prefetch_config["source_dir"]))
+    else:
+        store = prefetch.S3Store(
+            bucket=prefetch_config.get("bucket", "nrel-pds-wtk"), prefix=prefetch_config.get("prefix", "")
+        )
+    keys = prefetch.site_file_keys(grid.wind_sites["SiteID"].values, nc_dirs=prefetch_config.get("nc_dirs", ["met"]))
+    logger.info("prefetching {} WTK files into {}".format(len(keys), cache_dir))
+    counts = prefetch.prefetch(
+        store,
+        keys,
+        cache_dir,
+        workers=prefetch_config.get("workers", 8),
+        retries=prefetch_config.get("retries", 3),
+    )
+    logger.info("prefetch: {cached} cached, {fetched} fetched, {failed} failed".format(**counts))
+    if counts["failed"] > 0:
+        # non-zero exit, so that the job step fails (run it again to resume)
+        sys.exit("failed to fetch {} WTK files: {}".format(counts["failed"], counts["failed_keys"][:10]))
+
+
 def main():
     """ Main function """
     # Initialization
@@ -75,6 +166,11 @@ def main():
     data_dir = os.path.expandvars(config["data_dir"])
     grid_name = config["grid"]["name"]
 
+    # (optional) parse cache, parsed grid tables are reused as long as grid files do not change
+    cache_dir = config.get("cache_dir")
+    if cache_dir is not None:
+        cache_dir = os.path.expandvars(cache_dir)
+
     # load TAMU grid data
     # path to .aux file (TAMU grids) obtained from e.g.
     # https://electricgrids.engr.tamu.edu/electric-grid-test-cases/activsg200/
@@ -83,14 +179,14 @@ def main():
         aux_file_name = os.path.join(data_dir, grid_name, grid_name + ".aux")
         # parse original .aux file and return dataframes for buses, generators, and wind generators
         # here, we need .aux files because those are the only ones with Latitute/Longitude information
-        parser = Parser()
+        parser = Parser(cache_dir=cache_dir)
         bus_df, gen_df, wind_gen_df = parser.parse_tamu_aux(aux_file_name)
 
     elif grid_name == 'RTS':
         bus_csv_filename = os.path.join(data_dir, grid_name, "bus.csv")
         gen_csv_filename = os.path.join(data_dir, grid_name, "gen.csv")
 
-        parser = Parser()
+        parser = Parser(cache_dir=cache_dir)
         # if solar2wind, will replace all solar with wind
         bus_df, gen_df, wind_gen_df = parser.parse_rts_csvs(
             bus_csv_filename, gen_csv_filename, solar2wind=config["RTS_solar2wind"]
@@ -111,22 +207,101 @@ def main():
         logger.info(grid.info())
 
 
-    logger.info("retrieving wind sites")
-    # retrieve wind sites (wind_sites are initially set to empty df )
-    grid.retrieve_wind_sites(method="simple proximity")
+    # WTK files are prefetched only for wtk tables (rts tables read local RTS-GMLC time series)
+    if args.prefetch_only and config["tables"].get("source", "wtk") != "wtk":
+        sys.exit("--prefetch-only needs tables: source wtk, not {}".format(config["tables"]["source"]))
 
+    # (optional) tables made once and saved, later runs load them (memory-mapped) instead of making them again
+    tables_dir = config["tables"].get("tables_dir")
+    if tables_dir is not None:
+        tables_dir = os.path.expandvars(tables_dir)
 
-    logger.info("making tables")
-    # sampling tables
-    grid.make_tables(
-        actuals_start=pd.Timestamp(config["tables"]["actuals_start"], tz="utc"),
-        actuals_end=pd.Timestamp(config["tables"]["actuals_end"], tz="utc"),
-        scenarios_start=pd.Timestamp(config["tables"]["scenarios_start"], tz="utc"),
-        scenarios_end=pd.Timestamp(config["tables"]["scenarios_end"], tz="utc"),
-    )
-    
+    # saved tables are used only if they were made for this grid, time windows, wind penetration, dtype,
+    # source and wind sites
+    load_tables = False
+    if tables_dir is not None and os.path.isdir(tables_dir) and not args.prefetch_only:
+        mismatches = tables_mismatches(tables_dir, config, grid)
+        if mismatches:
+            logger.info(
+                "tables in {} do not match config ({}), making them again".format(tables_dir, ", ".join(mismatches))
+            )
+        else:
+            load_tables = True
+
+    if load_tables:
+        logger.info("loading tables from {} (they match config)".format(tables_dir))
+        grid = Grid.load_tables(tables_dir)
+    else:
+        # where power data for tables comes from: wtk (WIND Toolkit) or rts (local RTS-GMLC time series, RTS grid only)
+        tables_source = config["tables"].get("source", "wtk")
+        rts_timeseries_files = None
+        # (optional) local WTK data (sites.csv and per-site files), default is pywtk
+        wtk_source = make_wtk_source(config)
+        if tables_source == "wtk":
+            logger.info("retrieving wind sites")
+            # retrieve wind sites (wind_sites are initially set to empty df )
+            # (optional) KD-tree index of WTK sites is built once and reused from site_index_file
+            site_index_file = config.get("site_index_file")
+            if site_index_file is not None:
+                site_index_file = os.path.expandvars(site_index_file)
+            wind_sites_config = config.get("wind_sites", {})
+            grid.retrieve_wind_sites(
+                method=wind_sites_config.get("method", "simple proximity"),
+                site_index_file=site_index_file,
+                cache_dir=cache_dir,
+                wtk_source=wtk_source,
+                radius=wind_sites_config.get("radius", 0.5),
+            )
 
+            if args.prefetch_only:
+                prefetch_wtk(config, grid, logger)
+                return
 
+        elif tables_source == "rts":
+            # RTS-GMLC timeseries_data_files directory, by default next to bus.csv and gen.csv
+            rts_timeseries_dir = os.path.expandvars(
+                config.get("RTS_timeseries_dir", os.path.join(data_dir, grid_name, "timeseries_data_files"))
+            )
+            rts_timeseries_files = [os.path.join(rts_timeseries_dir, "WIND", "REAL_TIME_wind.csv")]
+            if config["RTS_solar2wind"]:
+                rts_timeseries_files += [
+                    os.path.join(rts_timeseries_dir, "PV", "REAL_TIME_pv.csv"),
+                    os.path.join(rts_timeseries_dir, "RTPV", "REAL_TIME_rtpv.csv"),
+                    os.path.join(rts_timeseries_dir, "CSP", "REAL_TIME_Natural_Inflow.csv"),
+                ]
+
+
+        # (optional) consolidated site x time power store, built once and shared by grids
+        power_store_dir = config["tables"].get("power_store_dir")
+        if power_store_dir is not None:
+            power_store_dir = os.path.expandvars(power_store_dir)
+
+        # (optional) out of core: tables are made block_days at a time straight into tables_dir (for very large grids)
+        block_days = config["tables"].get("block_days")
+        if block_days is not None and tables_dir is None:
+            raise ValueError("tables: block_days needs tables_dir")
+
+        logger.info("making tables")
+        # sampling tables
+        grid.make_tables(
+            actuals_start=pd.Timestamp(config["tables"]["actuals_start"], tz="utc"),
+            actuals_end=pd.Timestamp(config["tables"]["actuals_end"], tz="utc"),
+            scenarios_start=pd.Timestamp(config["tables"]["scenarios_start"], tz="utc"),
+            scenarios_end=pd.Timestamp(config["tables"]["scenarios_end"], tz="utc"),
+            source=tables_source,
+            rts_timeseries_files=rts_timeseries_files,
+            cache_dir=cache_dir,
+            workers=config["tables"].get("workers", 1),
+            power_store_dir=power_store_dir,
+            dtype=config["tables"].get("dtype", "float64"),
+            wtk_source=wtk_source,
+            tables_dir=tables_dir if block_days is not None else None,
+            block_days=block_days or 30,
+        )
+
+        if tables_dir is not None and block_days is None:
+            logger.info("saving tables to {}".format(tables_dir))
+            grid.save_tables(tables_dir)
 
     logger.info("generating scenarios")
     # timespan for wanted scenarios
@@ -145,48 +320,19 @@ def main():
 
     ########################################################
 
-    all_weights_df = pd.DataFrame(index=sim_timestamps,columns=range(1,n_scenarios+1))
-
-    # create multiindex df for all generated scenarios
-    # three arrays for multiindex:
-    a1 = [x for x in sim_timestamps for k in range(n_scenarios * n_periods)]
-    a2 = [x for x in range(1, n_scenarios + 1) for k in range(n_periods)] * len(
-        sim_timestamps
+    # all sim_timestamps at once (bins, draws and running sums are array operations over all of them)
+    logger.info("{} sim_timestamps, {} to {}".format(len(sim_timestamps), sim_timestamps[0], sim_timestamps[-1]))
+    random_seed = np.random.randint(2 ** 31 - 1)
+    all_scenarios_df, all_weights_df = grid.generate_wind_scenarios_batch(
+        sim_timestamps,
+        power_quantiles=[0.0, 0.1, 0.9, 1.0],
+        sampling_method=sampling_method,
+        n_scenarios=n_scenarios,
+        n_periods=n_periods,
+        random_seed=random_seed,
     )
-    a3 = [
-        t + pd.Timedelta("5min") * k
-        for t in sim_timestamps
-        for k in list(range(n_periods)) * n_scenarios
-    ]
-
-    index = pd.MultiIndex.from_arrays([a1,a2,a3],names=['sim_timestamp','scenario_nr','period_timestamp'])
-    all_scenarios_df = pd.DataFrame(index=index,columns=grid.wind_generators["GenUID"].values)
-
-
-
-    for sim_timestamp in sim_timestamps:
-        logger.info("sim_timestamp = {}".format(sim_timestamp))
-        random_seed = np.random.randint(2 ** 31 - 1)
-        #random_seed = 594081473
-        #print("random_seed = {}".format(random_seed))
-        scenarios_df, weights_df = grid.generate_wind_scenarios(
-            sim_timestamp,
-            power_quantiles=[0.0, 0.1, 0.9, 1.0],
-            sampling_method=sampling_method,
-            n_scenarios=n_scenarios,
-            n_periods=n_periods,
-            #random_seed=6,
-            random_seed=random_seed,
-            output_format=0,
-        )
-        #all_scenarios_df=pd.concat([all_scenarios_df,scenarios_df])
-        all_scenarios_df.loc[sim_timestamp]=scenarios_df
-
-        #all_weights_df=pd.concat([all_weights_df,weights_df])
-        all_weights_df.loc[sim_timestamp]=weights_df.loc[sim_timestamp]
-
-
-
+    # columns in order of wind generators
+    all_scenarios_df = all_scenarios_df.reindex(columns=grid.wind_generators["GenUID"].values)
 
     all_actuals_df=grid.actuals.loc[sim_timestamps].drop("TotalPower", axis=1).copy()
 
@@ -0,0 +1,39 @@
+"""
+Tests of atomic directory writes (shared by cache entries, tables and power store)
+"""
+
+import os
+
+import pytest
+
+from powerscenarios import cache
+
+
+def write_file(name, text):
+    def write(tmp_dir):
+        with open(os.path.join(tmp_dir, name), "w") as f:
+            f.write(text)
+
+    return write
+
+
+def test_atomic_write_dir_replaces_or_keeps_existing(tmp_path):
+    dir_name = str(tmp_path / "entry")
+    assert cache.atomic_write_dir(dir_name, write_file("a.txt", "first"))
+
+    # kept (as a cache entry saved by another job first)
+    assert not cache.atomic_write_dir(dir_name, write_file("a.txt", "second"), replace=False)
+    assert open(os.path.join(dir_name, "a.txt")).read() == "first"
+
+    # replaced as a whole (old files do not stay)
+    assert cache.atomic_write_dir(dir_name, write_file("b.txt", "third"))
+    assert os.listdir(dir_name) == ["b.txt"]
+
+    # failed write leaves existing directory and no temporary directories
+    def fail(tmp_dir):
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        cache.atomic_write_dir(dir_name, fail)
+    assert os.listdir(dir_name) == ["b.txt"]
+    assert os.listdir(str(tmp_path)) == ["entry"]
@@ -0,0 +1,26 @@
+"""
+Tests of Parser.read_aux_table on the ACTIVSg200 .aux file shipped in data/
+"""
+
+import os
+
+import pytest
+
+from powerscenarios.parser import Parser
+
+AUX_FILE_NAME = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "grid-data", "ACTIVSg200", "ACTIVSg200.aux"
+)
+
+
+@pytest.mark.parametrize("use_index", [True, False])
+def test_branch_nr_applies_to_branch_tables_only(use_index):
+    parser = Parser()
+    bus_df = parser.read_aux_table(AUX_FILE_NAME, "Bus", use_index=use_index)
+    assert not bus_df.empty
+    assert parser.read_aux_table(AUX_FILE_NAME, "Bus", branch_nr=2, use_index=use_index).equals(bus_df)
+
+    lines_df = parser.read_aux_table(AUX_FILE_NAME, "Branch", branch_nr=1, use_index=use_index)
+    transformers_df = parser.read_aux_table(AUX_FILE_NAME, "Branch", branch_nr=2, use_index=use_index)
+    assert not lines_df.empty and not transformers_df.empty
+    assert not lines_df.equals(transformers_df)
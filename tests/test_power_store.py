@@ -0,0 +1,36 @@
+"""
+Tests of PowerStore (build, extend and read round trip) on SyntheticSource power (offline)
+"""
+
+import numpy as np
+import pandas as pd
+
+from powerscenarios.grid import get_sites_power
+from powerscenarios.power_store import PowerStore
+from powerscenarios.wtk_source import SyntheticSource
+
+
+def test_build_read_round_trip(tmp_path):
+    wtk_source = SyntheticSource(n_sites=100)
+    store_dir = str(tmp_path / "store")
+    start_of_data = pd.Timestamp("2007-01-01 00:00:00", tz="utc")
+    end_of_data = pd.Timestamp("2007-01-02 23:55:00", tz="utc")
+
+    def read_sites_power(site_ids, start_of_data, end_of_data):
+        return get_sites_power(wtk_source, site_ids, start_of_data, end_of_data)
+
+    store = PowerStore.build(store_dir, [5, 3, 9], start_of_data, end_of_data, read_sites_power)
+    assert store.times[0] == start_of_data and store.times[-1] == end_of_data
+    assert store.covers([3, 5, 9], start_of_data, end_of_data)
+
+    # only missing sites are added, existing store covers the window
+    store = PowerStore.build(store_dir, [9, 1], start_of_data, end_of_data, read_sites_power)
+    np.testing.assert_array_equal(store.site_ids, [1, 3, 5, 9])
+
+    window_start = start_of_data + pd.Timedelta("6h")
+    window_end = start_of_data + pd.Timedelta("12h")
+    times, power = PowerStore.load(store_dir).read([9, 1, 5], window_start, window_end)
+    for site_id, site_power in zip([9, 1, 5], power):
+        expected = wtk_source.get_power(site_id, window_start, window_end)
+        np.testing.assert_array_equal(times.values, expected.index.values)
+        np.testing.assert_array_equal(site_power, expected.values)
@@ -0,0 +1,212 @@
+"""
+Tests of scenario sampling (SamplingIndex, Grid.generate_wind_scenarios) against the baseline computation
+(pd.qcut power bins and DataFrame.sample), on tables made from SyntheticSource (offline, no WTK data needed)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from powerscenarios.grid import Grid
+from powerscenarios.sampling_index import SamplingIndex
+from powerscenarios.wtk_source import SyntheticSource
+
+POWER_QUANTILES = [0.0, 0.1, 0.9, 1.0]
+LOSS_OF_LOAD_COST = 10000 / 12.0
+SPILLED_WIND_COST = 0.001
+
+
+@pytest.fixture(scope="module")
+def grid():
+    wtk_source = SyntheticSource(n_sites=2000)
+    rng = np.random.RandomState(0)
+    n_generators = 8
+    wind_gen_df = pd.DataFrame(
+        {
+            "BusNum": np.arange(1, n_generators + 1),
+            "GenUID": ["{}_Wind_1".format(bus_num) for bus_num in range(1, n_generators + 1)],
+            "Latitude": rng.uniform(30.0, 45.0, n_generators),
+            "Longitude": rng.uniform(-120.0, -75.0, n_generators),
+            # small capacities, so that scenarios are clipped at GenMWMax as well
+            "GenMWMax": rng.uniform(10.0, 60.0, n_generators),
+        }
+    )
+    grid = Grid("synthetic", pd.DataFrame(), pd.DataFrame(), wind_gen_df)
+    grid.retrieve_wind_sites(wtk_source=wtk_source)
+    grid.make_tables(
+        actuals_start=pd.Timestamp("2007-01-01 00:00:00", tz="utc"),
+        actuals_end=pd.Timestamp("2007-01-07 23:55:00", tz="utc"),
+        scenarios_start=pd.Timestamp("2007-01-08 00:00:00", tz="utc"),
+        scenarios_end=pd.Timestamp("2007-01-28 23:55:00", tz="utc"),
+        wtk_source=wtk_source,
+    )
+
+    return grid
+
+
+def baseline_sample(grid, total_power_t0, sampling_method, n_scenarios, n_periods, random_seed):
+    """ power conditioning and sampling as generate_wind_scenarios did it before SamplingIndex """
+    scenarios_df = grid.scenarios
+    power_bins = pd.qcut(scenarios_df["TotalPower"].iloc[:-n_periods], q=POWER_QUANTILES)
+    for power_bin in power_bins.cat.categories:
+        if total_power_t0 in power_bin:
+            break
+    p_bin = power_bins.loc[power_bins == power_bin]
+
+    if sampling_method == "monte carlo":
+        return p_bin.sample(n_scenarios, random_state=random_seed).index, np.ones(n_scenarios)
+
+    cost_1 = scenarios_df["Deviation"].apply(
+        lambda dev: np.abs(LOSS_OF_LOAD_COST * dev) if dev < 0 else np.abs(SPILLED_WIND_COST * dev)
+    )
+    cost_n = cost_1.rolling(n_periods).sum().shift(-(n_periods - 1)).round(grid.WTK_DATA_PRECISION)
+    importance_probs = cost_n.loc[p_bin.index] / cost_n.loc[p_bin.index].sum()
+    sample_timestamps = p_bin.sample(n_scenarios, random_state=random_seed, weights=importance_probs).index
+    weights = (1 / p_bin.size) / importance_probs.loc[sample_timestamps]
+
+    return sample_timestamps, weights.values
+
+
+def baseline_scenarios(grid, sim_timestamp, sample_timestamps, n_periods):
+    """ running sums of deviations from actual at t0 and clipping as generate_wind_scenarios did it (one sample at a time) """
+    timestamps = pd.date_range(start=sim_timestamp - pd.Timedelta("5min"), periods=n_periods + 1, freq="5min")
+    gen_capacity = grid.wind_generators.set_index("GenUID")["GenMWMax"]
+    scenarios = []
+    for sample_timestamp in sample_timestamps:
+        deviation = grid.scenarios.loc[pd.date_range(start=sample_timestamp, periods=n_periods, freq="5min")]
+        running_sum = grid.actuals.loc[timestamps[0]].drop("TotalPower").astype(np.float64)
+        for period in range(n_periods):
+            running_sum = running_sum + deviation.iloc[period].drop(["TotalPower", "Deviation"])
+            scenario = running_sum.where(running_sum >= 0.0, other=0.0)
+            scenario = scenario.where(scenario <= gen_capacity.reindex(scenario.index), other=gen_capacity)
+            scenarios.append(scenario.values.astype(np.float64))
+
+    return np.array(scenarios)
+
+
+def sim_timestamps(grid, n):
+    """ sim timestamps spread over actuals, with total power at t0 inside the power bins of scenarios """
+    rng = np.random.RandomState(1)
+    timestamps = grid.actuals.index[1:][rng.choice(len(grid.actuals) - 1, size=4 * n, replace=False)]
+    total_power = grid.actuals["TotalPower"].reindex(timestamps - grid.WTK_TIME_STEP).values
+    inside = (total_power > grid.scenarios["TotalPower"].min()) & (total_power <= grid.scenarios["TotalPower"].max())
+    return timestamps[inside][:n]
+
+
+@pytest.mark.parametrize("sampling_method", ["monte carlo", "importance"])
+@pytest.mark.parametrize("n_periods", [1, 4])
+def test_draw_matches_qcut_and_sample(grid, sampling_method, n_periods):
+    sampling_index = SamplingIndex(grid.scenarios, POWER_QUANTILES, n_periods, precision=grid.WTK_DATA_PRECISION)
+    for i, sim_timestamp in enumerate(sim_timestamps(grid, 10)):
+        total_power_t0 = grid.actuals.loc[sim_timestamp - grid.WTK_TIME_STEP, "TotalPower"]
+        expected_timestamps, expected_weights = baseline_sample(
+            grid, total_power_t0, sampling_method, 5, n_periods, random_seed=i
+        )
+        positions, weights = sampling_index.draw(total_power_t0, 5, random_seed=i, sampling_method=sampling_method)
+
+        assert grid.scenarios.index[positions].equals(expected_timestamps)
+        np.testing.assert_allclose(weights, expected_weights, rtol=1e-12)
+
+
+def test_find_bin_matches_qcut_and_clips_below_range(grid):
+    n_periods = 1
+    sampling_index = SamplingIndex(grid.scenarios, POWER_QUANTILES, n_periods)
+    power_bins = pd.qcut(grid.scenarios["TotalPower"].iloc[:-n_periods], q=POWER_QUANTILES)
+    categories = power_bins.cat.categories
+
+    def baseline_bin(total_power):
+        for i, power_bin in enumerate(categories):
+            if total_power in power_bin:
+                break
+        return i
+
+    # within the bins (edges included) and above the highest bin, same bin as before
+    bin_edges = sampling_index.bin_edges
+    bin_middles = (bin_edges[:-1] + bin_edges[1:]) / 2
+    for total_power in np.concatenate([bin_edges[1:], bin_middles, [bin_edges[-1] + 1.0]]):
+        assert sampling_index.find_bin(total_power) == baseline_bin(total_power)
+    # below the lowest bin (its left edge is open), lowest bin instead of the highest one the bin loop fell through to
+    for total_power in [bin_edges[0], bin_edges[0] - 1.0]:
+        assert baseline_bin(total_power) == len(categories) - 1
+        assert sampling_index.find_bin(total_power) == 0
+
+
+@pytest.mark.parametrize("sampling_method", ["monte carlo", "importance"])
+def test_generate_wind_scenarios_matches_baseline(grid, sampling_method):
+    n_scenarios, n_periods = 4, 3
+    for i, sim_timestamp in enumerate(sim_timestamps(grid, 5)):
+        scenarios_df, weights_df = grid.generate_wind_scenarios(
+            sim_timestamp,
+            power_quantiles=POWER_QUANTILES,
+            sampling_method=sampling_method,
+            n_scenarios=n_scenarios,
+            n_periods=n_periods,
+            random_seed=i,
+        )
+        total_power_t0 = grid.actuals.loc[sim_timestamp - grid.WTK_TIME_STEP, "TotalPower"]
+        sample_timestamps, expected_weights = baseline_sample(
+            grid, total_power_t0, sampling_method, n_scenarios, n_periods, random_seed=i
+        )
+
+        np.testing.assert_array_equal(
+            scenarios_df.values.astype(np.float64), baseline_scenarios(grid, sim_timestamp, sample_timestamps, n_periods)
+        )
+        np.testing.assert_allclose(weights_df.values[0].astype(np.float64), expected_weights, rtol=1e-12)
+
+
+@pytest.mark.parametrize("sampling_method", ["monte carlo", "importance"])
+def test_generate_wind_scenarios_batch_matches_baseline(grid, sampling_method):
+    n_scenarios, n_periods, random_seed = 4, 3, 7
+    timestamps = sim_timestamps(grid, 20)
+    scenarios_df, weights_df = grid.generate_wind_scenarios_batch(
+        timestamps,
+        power_quantiles=POWER_QUANTILES,
+        sampling_method=sampling_method,
+        n_scenarios=n_scenarios,
+        n_periods=n_periods,
+        random_seed=random_seed,
+        # a few timestamps per chunk
+        chunk_size=n_scenarios * n_periods * grid.actuals.shape[1] * 3,
+    )
+    # draws of the batch (first use of its random stream)
+    sampling_index = grid.get_sampling_index(POWER_QUANTILES, n_periods)
+    total_power = grid.actuals["TotalPower"].reindex(timestamps - grid.WTK_TIME_STEP).values
+    positions, weights = sampling_index.draw_batch(
+        total_power, n_scenarios, np.random.RandomState(random_seed), sampling_method=sampling_method
+    )
+
+    assert scenarios_df.shape == (len(timestamps) * n_scenarios * n_periods, grid.actuals.shape[1] - 1)
+    for i, sim_timestamp in enumerate(timestamps):
+        # rows of every timestamp come from the power bin of its total power at t0, without repeats
+        power_bin = sampling_index.find_bin(total_power[i])
+        assert np.isin(positions[i], sampling_index.bin_positions[power_bin]).all()
+        assert len(np.unique(positions[i])) == n_scenarios
+
+        expected = baseline_scenarios(grid, sim_timestamp, grid.scenarios.index[positions[i]], n_periods)
+        np.testing.assert_array_equal(scenarios_df.loc[sim_timestamp].values, expected)
+        period_timestamps = scenarios_df.loc[sim_timestamp].index.get_level_values("period_timestamp")
+        assert (period_timestamps == np.tile(sim_timestamp + np.arange(n_periods) * grid.WTK_TIME_STEP, n_scenarios)).all()
+    np.testing.assert_array_equal(weights_df.values, weights)
+
+
+def test_draw_batch_importance_distribution():
+    # inclusion probabilities of successive sampling without replacement (as RandomState.choice with p)
+    probs = np.array([0.5, 0.2, 0.1, 0.1, 0.05, 0.05])
+    sampling_index = SamplingIndex.__new__(SamplingIndex)
+    sampling_index.bin_edges = np.array([-np.inf, np.inf])
+    sampling_index.bin_positions = [np.arange(len(probs))]
+    sampling_index.importance_probs = [probs]
+    sampling_index.importance_log_probs = [np.log(probs)]
+
+    positions, weights = sampling_index.draw_batch(
+        np.zeros(100000), 3, np.random.RandomState(0), sampling_method="importance"
+    )
+    rng = np.random.RandomState(1)
+    choice_positions = np.array([rng.choice(len(probs), size=3, replace=False, p=probs) for i in range(100000)])
+
+    np.testing.assert_allclose(
+        [(positions == row).any(axis=1).mean() for row in range(len(probs))],
+        [(choice_positions == row).any(axis=1).mean() for row in range(len(probs))],
+        atol=0.01,
+    )
+    np.testing.assert_allclose(weights, (1 / len(probs)) / probs[positions])
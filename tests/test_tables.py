@@ -0,0 +1,103 @@
+"""
+Tests of actuals and scenarios tables (save_tables / load_tables round trip),
+on tables made from SyntheticSource (offline, no WTK data needed)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from powerscenarios.grid import Grid
+from powerscenarios.wtk_source import SyntheticSource
+
+ACTUALS_START = pd.Timestamp("2007-01-01 00:00:00", tz="utc")
+ACTUALS_END = pd.Timestamp("2007-01-03 23:55:00", tz="utc")
+SCENARIOS_START = pd.Timestamp("2007-01-04 00:00:00", tz="utc")
+SCENARIOS_END = pd.Timestamp("2007-01-10 23:55:00", tz="utc")
+
+
+@pytest.fixture(scope="module")
+def wtk_source():
+    return SyntheticSource(n_sites=2000)
+
+
+def make_grid(wtk_source):
+    rng = np.random.RandomState(0)
+    n_generators = 6
+    wind_gen_df = pd.DataFrame(
+        {
+            "BusNum": np.arange(1, n_generators + 1),
+            "GenUID": ["{}_Wind_1".format(bus_num) for bus_num in range(1, n_generators + 1)],
+            "Latitude": rng.uniform(30.0, 45.0, n_generators),
+            "Longitude": rng.uniform(-120.0, -75.0, n_generators),
+            "GenMWMax": rng.uniform(10.0, 60.0, n_generators),
+        }
+    )
+    grid = Grid("synthetic", pd.DataFrame(), pd.DataFrame(), wind_gen_df)
+    grid.retrieve_wind_sites(wtk_source=wtk_source)
+
+    return grid
+
+
+def make_tables(grid, wtk_source, **kwargs):
+    grid.make_tables(
+        actuals_start=ACTUALS_START,
+        actuals_end=ACTUALS_END,
+        scenarios_start=SCENARIOS_START,
+        scenarios_end=SCENARIOS_END,
+        wtk_source=wtk_source,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_tables_round_trip(tmp_path, wtk_source, mmap):
+    grid = make_grid(wtk_source)
+    make_tables(grid, wtk_source)
+    tables_dir = str(tmp_path / "tables")
+    grid.save_tables(tables_dir)
+
+    loaded_grid = Grid.load_tables(tables_dir, mmap=mmap)
+
+    for name in ["actuals", "scenarios"]:
+        table_df, loaded_df = getattr(grid, name), getattr(loaded_grid, name)
+        np.testing.assert_array_equal(loaded_df.index.values, table_df.index.values)
+        assert list(loaded_df.columns) == list(table_df.columns)
+        np.testing.assert_array_equal(loaded_df.values, table_df.values)
+    assert loaded_grid.tables_meta["scenarios_end"] == str(SCENARIOS_END)
+    assert loaded_grid.tables_meta["source"] == "wtk"
+    assert loaded_grid.tables_meta["wtk_source"] == repr(wtk_source)
+    assert loaded_grid.tables_meta["wind_sites"] == {
+        "method": "simple proximity",
+        "radius": None,
+        "wtk_source": repr(wtk_source),
+    }
+    pd.testing.assert_frame_equal(loaded_grid.wind_sites, grid.wind_sites.reset_index(drop=True))
+
+    # loaded tables are usable (actuals at t0 are found by timestamp)
+    scenarios_df, weights_df = loaded_grid.generate_wind_scenarios_batch(
+        pd.date_range(ACTUALS_START + pd.Timedelta("1h"), periods=3, freq="5min"), n_scenarios=2, n_periods=2
+    )
+    assert len(scenarios_df) == 3 * 2 * 2
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_out_of_core_tables_equal_in_memory_tables(tmp_path, wtk_source, dtype):
+    grid = make_grid(wtk_source)
+    make_tables(grid, wtk_source, dtype=dtype)
+
+    out_of_core_grid = make_grid(wtk_source)
+    tables_dir = str(tmp_path / "tables")
+    # 0.7 days per block does not divide the windows, so there are partial blocks and seams inside both tables
+    make_tables(out_of_core_grid, wtk_source, dtype=dtype, tables_dir=tables_dir, block_days=0.7)
+
+    for name in ["actuals", "scenarios"]:
+        table_df, out_of_core_df = getattr(grid, name), getattr(out_of_core_grid, name)
+        assert out_of_core_df.dtypes.iloc[0] == dtype
+        np.testing.assert_array_equal(out_of_core_df.index.values, table_df.index.values)
+        assert list(out_of_core_df.columns) == list(table_df.columns)
+        np.testing.assert_array_equal(out_of_core_df.values, table_df.values)
+
+    # tables_dir is a saved tables directory
+    loaded_grid = Grid.load_tables(tables_dir)
+    np.testing.assert_array_equal(loaded_grid.scenarios.values, grid.scenarios.values)
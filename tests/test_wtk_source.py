@@ -0,0 +1,58 @@
+"""
+Tests of WTK data sources (SyntheticSource written as LocalSource directory and read back, offline)
+and of the site index persisted for them
+"""
+
+import numpy as np
+import pandas as pd
+
+from powerscenarios.site_index import SiteIndex
+from powerscenarios.wtk_source import LocalSource, SyntheticSource
+
+
+def test_synthetic_source_written_as_local_source(tmp_path):
+    synthetic_source = SyntheticSource(n_sites=50)
+    start_of_data = pd.Timestamp("2007-01-01 00:00:00", tz="utc")
+    end_of_data = pd.Timestamp("2007-01-02 23:55:00", tz="utc")
+    local_source = synthetic_source.write(str(tmp_path / "wtk"), [4, 17], start_of_data, end_of_data)
+
+    pd.testing.assert_frame_equal(
+        LocalSource(str(tmp_path / "wtk")).sites(), synthetic_source.sites(), check_index_type=False
+    )
+    window_start = start_of_data + pd.Timedelta("1h")
+    window_end = end_of_data - pd.Timedelta("1h")
+    for site_id in [4, 17]:
+        power = local_source.get_power(site_id, window_start, window_end)
+        expected = synthetic_source.get_power(site_id, window_start, window_end)
+        assert len(power) == len(expected) > 0
+        np.testing.assert_array_equal(power.index.values, expected.index.values)
+        np.testing.assert_array_equal(power.values, expected.values)
+
+
+def test_site_index_file_rebuilt_for_other_source_and_window(tmp_path):
+    site_index_file = str(tmp_path / "site_index.npz")
+    start_of_data = pd.Timestamp("2007-01-01 00:00:00", tz="utc")
+    end_of_data = pd.Timestamp("2007-01-01 23:55:00", tz="utc")
+
+    synthetic_source = SyntheticSource(n_sites=50)
+    site_index = SiteIndex.from_source(synthetic_source, site_index_file)
+    site_index.compute_capacity_factors([0, 1], start_of_data, end_of_data, wtk_source=synthetic_source)
+    site_index.save(site_index_file)
+    first_factors = site_index.capacity_factor[:2].copy()
+
+    # same source, index and capacity factors of the window are loaded back
+    site_index = SiteIndex.from_source(synthetic_source, site_index_file)
+    np.testing.assert_array_equal(site_index.capacity_factor[:2], first_factors)
+    site_index.use_capacity_factor_window(start_of_data, end_of_data)
+    np.testing.assert_array_equal(site_index.capacity_factor[:2], first_factors)
+
+    # other window, capacity factors are dropped
+    site_index.use_capacity_factor_window(start_of_data, end_of_data + pd.Timedelta("1D"))
+    assert np.isnan(site_index.capacity_factor).all()
+
+    # other source, index is rebuilt from its catalog
+    other_source = SyntheticSource(n_sites=50, seed=1)
+    site_index = SiteIndex.from_source(other_source, site_index_file)
+    assert site_index.source == repr(other_source)
+    np.testing.assert_allclose(site_index.longitude, other_source.sites()["lon"].values, rtol=1e-6)
+    assert np.isnan(site_index.capacity_factor).all()